@@ -1,25 +1,266 @@
 import sqlite3
 import os
+import calendar
 import csv
-from datetime import datetime
-import matplotlib.pyplot as plt
+import gzip
+import json
+import math
+import random
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+from queue import Queue
 from colorama import init, Fore, Style
-from tabulate import tabulate
 
 # Inicializar colorama
 init(autoreset=True)
 
+# Tiempo máximo de arranque en frío (proceso nuevo hasta mostrar el menú) para --profile-startup
+PRESUPUESTO_ARRANQUE_MS = 500
+
+# Ajustes de la conexión: WAL permite leer mientras se escribe y synchronous=NORMAL es seguro con WAL;
+# caché de páginas de ~32 MB, lecturas por mmap de hasta 256 MB y tablas temporales en memoria
+PRAGMAS_CONEXION = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -32000,
+    "mmap_size": 256 * 1024 * 1024,
+    "temp_store": "MEMORY",
+}
+
+# Acceso concurrente: segundos que SQLite espera un bloqueo antes de fallar y, si aun así
+# la base de datos sigue bloqueada, reintentos con espera exponencial a partir de 50 ms
+TIEMPO_ESPERA_BLOQUEO = 5.0
+REINTENTOS_BLOQUEO = 5
+ESPERA_INICIAL_REINTENTO = 0.05
+
+# Sentencias preparadas que conserva cada conexión (todas las consultas de la aplicación caben)
+SENTENCIAS_EN_CACHE = 256
+
+# Módulos que se cargan bajo demanda; --profile-startup reporta su costo de primer uso
+MODULOS_DIFERIDOS = ("tabulate", "matplotlib.pyplot")
+
+# Filas por página en los listados paginados
+TAMANO_PAGINA = 20
+
+# Columnas aceptadas por la importación masiva, en el orden de inserción
+COLUMNAS_IMPORTACION = {
+    "articulos": ("nombre", "categoria", "cantidad", "precio_unitario", "descripcion", "actualizado_en"),
+    "gastos": ("descripcion", "monto", "categoria", "fecha", "fecha_unix"),
+}
+
+# Formatos strftime de SQLite para agrupar gastos por periodo
+FORMATOS_PERIODO = {
+    "dia": "%Y-%m-%d",
+    "semana": "%Y-%W",
+    "mes": "%Y-%m",
+}
+
+# Puntos máximos que se dibujan en la gráfica de gastos a lo largo del tiempo
+MAX_PUNTOS_GRAFICO = 1000
+
+
+# Expresión del valor que cada tabla suma en el resumen por categoría;
+# {fila} se reemplaza por new/old en los triggers o por el nombre de la tabla
+VALOR_RESUMEN = {
+    "articulos": "{fila}.cantidad * {fila}.precio_unitario",
+    "gastos": "{fila}.monto",
+}
+
+# Consultas y encabezados de la exportación a CSV; la columna de fecha se usa para filtrar rangos
+CONSULTAS_EXPORTACION = {
+    "articulos": (
+        "SELECT id, nombre, categoria, cantidad, precio_unitario, descripcion FROM articulos",
+        "creado_en",
+        ['ID', 'Nombre', 'Categoría', 'Cantidad', 'Precio Unitario', 'Total', 'Descripción'],
+    ),
+    "gastos": (
+        "SELECT id, descripcion, monto, categoria, fecha FROM gastos",
+        "fecha_unix",
+        ['ID', 'Descripción', 'Monto', 'Categoría', 'Fecha'],
+    ),
+}
+
+
+def tabulate(datos, **opciones):
+    """Dibuja una tabla con tabulate, que se importa la primera vez que se muestra una tabla"""
+    from tabulate import tabulate as dibujar_tabla
+    return dibujar_tabla(datos, **opciones)
+
+
+def ahora_utc():
+    """Fecha y hora actuales en UTC sin zona, en la misma escala que CURRENT_TIMESTAMP de SQLite"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def marca_unix(fecha):
+    """Convierte una fecha a segundos desde 1970, igual que strftime('%s') de SQLite"""
+    return calendar.timegm(fecha.timetuple())
+
+
+def reducir_min_max(xs, ys, max_puntos=MAX_PUNTOS_GRAFICO):
+    """Reduce una serie a max_puntos conservando el mínimo y el máximo de cada tramo"""
+    if len(xs) <= max_puntos:
+        return list(xs), list(ys)
+
+    tramos = max(1, max_puntos // 2)
+    tamano_tramo = math.ceil(len(xs) / tramos)
+    xs_reducidos, ys_reducidos = [], []
+    for inicio in range(0, len(xs), tamano_tramo):
+        indices = range(inicio, min(inicio + tamano_tramo, len(xs)))
+        minimo = min(indices, key=ys.__getitem__)
+        maximo = max(indices, key=ys.__getitem__)
+        # Conservar el orden temporal de los dos puntos del tramo
+        for indice in sorted({minimo, maximo}):
+            xs_reducidos.append(xs[indice])
+            ys_reducidos.append(ys[indice])
+    return xs_reducidos, ys_reducidos
+
+
+def dibujar_graficos_gastos(figura, periodos, categorias, periodo):
+    """Dibuja en la figura los gastos por periodo (línea) y su distribución por categoría (pastel)"""
+    fechas = [datetime.fromtimestamp(fila[1], timezone.utc) for fila in periodos]
+    totales = [fila[3] for fila in periodos]
+    fechas, totales = reducir_min_max(fechas, totales)
+
+    ax1, ax2 = figura.subplots(1, 2)
+
+    # Gráfico de línea: total de gastos por periodo
+    ax1.plot(fechas, totales, marker='o' if len(fechas) <= 100 else None, color='blue')
+    ax1.set_title(f'Gastos por {"día" if periodo == "dia" else periodo}', fontsize=14)
+    ax1.set_xlabel('Fecha', fontsize=12)
+    ax1.set_ylabel('Monto ($)', fontsize=12)
+    ax1.grid(True)
+
+    # Gráfico de pastel: distribución por categoría
+    labels = [fila[0] for fila in categorias]
+    sizes = [fila[2] for fila in categorias]
+    ax2.pie(sizes, labels=labels, autopct='%1.1f%%', startangle=90)
+    ax2.axis('equal')
+    ax2.set_title('Distribución de gastos por categoría', fontsize=14)
+
+    figura.tight_layout()
+
+
+def leer_filas_archivo(ruta_archivo):
+    """Lee un archivo CSV o JSON Lines fila por fila, sin cargarlo completo en memoria"""
+    with open(ruta_archivo, newline='', encoding='utf-8') as archivo:
+        if ruta_archivo.lower().endswith((".jsonl", ".ndjson")):
+            for linea in archivo:
+                if linea.strip():
+                    yield json.loads(linea)
+        else:
+            yield from csv.DictReader(archivo)
+
+
+def convertir_fila_importacion(tabla, fila):
+    """Valida una fila importada y la convierte en la tupla a insertar; lanza ValueError si es inválida"""
+    def texto(campo, obligatorio=True):
+        valor = str(fila.get(campo) or "").strip()
+        if obligatorio and not valor:
+            raise ValueError(f"el campo '{campo}' no puede estar vacío")
+        return valor
+
+    def positivo(campo):
+        try:
+            valor = float(fila.get(campo))
+        except (TypeError, ValueError):
+            raise ValueError(f"el campo '{campo}' debe ser numérico")
+        if valor <= 0:
+            raise ValueError(f"el campo '{campo}' debe ser positivo")
+        return valor
+
+    if tabla == "articulos":
+        return (texto("nombre"), texto("categoria"), positivo("cantidad"),
+                positivo("precio_unitario"), texto("descripcion", obligatorio=False), ahora_utc())
+
+    fecha = texto("fecha", obligatorio=False)
+    try:
+        fecha = datetime.fromisoformat(fecha) if fecha else datetime.now()
+    except ValueError:
+        raise ValueError(f"fecha inválida '{fecha}' (se espera AAAA-MM-DD [HH:MM:SS])")
+    return texto("descripcion"), positivo("monto"), texto("categoria"), fecha, marca_unix(fecha)
+
 class BaseDeDatos:
-    def __init__(self, nombre_db="presupuesto.db"):
-        """Inicializa la conexión a la base de datos y crea tablas si es necesario"""
+    def __init__(self, nombre_db="presupuesto.db", optimizar=True, compartida=False):
+        """
+        Inicializa la conexión a la base de datos y crea tablas si es necesario.
+        compartida permite usar la conexión desde otros hilos (uno a la vez, como en PoolConexiones).
+        """
+        self.nivel_transaccion = 0
         try:
-            self.conexion = sqlite3.connect(nombre_db)
+            # El módulo sqlite3 reutiliza la sentencia preparada cuando se ejecuta el mismo texto SQL
+            self.conexion = sqlite3.connect(nombre_db, timeout=TIEMPO_ESPERA_BLOQUEO,
+                                            cached_statements=SENTENCIAS_EN_CACHE,
+                                            check_same_thread=not compartida)
             self.cursor = self.conexion.cursor()
+            if optimizar:
+                self.configurar_conexion()
             self.crear_tablas()
+            self.fts_disponible = self.crear_indice_texto()
+            self.crear_tabla_resumen()
+            self.crear_version_datos()
         except sqlite3.Error as e:
             print(f"{Fore.RED}Error al conectar con la base de datos: {e}")
             raise
 
+    def configurar_conexion(self):
+        """Aplica los PRAGMA de rendimiento de la conexión (WAL, caché, mmap, temporales en memoria)"""
+        for pragma, valor in PRAGMAS_CONEXION.items():
+            self.cursor.execute(f"PRAGMA {pragma} = {valor}")
+
+    @contextmanager
+    def transaccion(self):
+        """
+        Agrupa varias escrituras en una sola transacción:
+            with bd.transaccion():
+                bd.insertar_articulo(...)
+                bd.registrar_gasto(...)
+        Confirma al salir del bloque y revierte todo si ocurre un error.
+        """
+        self.nivel_transaccion += 1
+        try:
+            yield self
+        except BaseException:
+            self.nivel_transaccion -= 1
+            if not self.nivel_transaccion:
+                self.conexion.rollback()
+            raise
+        else:
+            self.nivel_transaccion -= 1
+            if not self.nivel_transaccion:
+                self.conexion.commit()
+
+    def con_reintentos(self, operacion):
+        """Ejecuta la operación y la reintenta con espera exponencial mientras la base de datos esté bloqueada"""
+        for intento in range(REINTENTOS_BLOQUEO + 1):
+            try:
+                return operacion()
+            except sqlite3.OperationalError as e:
+                mensaje = str(e).lower()
+                if intento == REINTENTOS_BLOQUEO or not ("locked" in mensaje or "busy" in mensaje):
+                    raise
+                time.sleep(ESPERA_INICIAL_REINTENTO * 2 ** intento * random.uniform(0.5, 1.5))
+
+    def ejecutar_escritura(self, consulta, parametros=()):
+        """Ejecuta una sentencia de escritura con reintentos si otro usuario tiene bloqueada la base de datos"""
+        return self.con_reintentos(lambda: self.cursor.execute(consulta, parametros))
+
+    def confirmar(self):
+        """Confirma los cambios, salvo dentro de transaccion(), que confirma al final del bloque"""
+        if not self.nivel_transaccion:
+            self.con_reintentos(self.conexion.commit)
+
+    def revertir(self):
+        """Revierte los cambios; dentro de transaccion() relanza el error en curso para abortar el bloque"""
+        self.conexion.rollback()
+        if self.nivel_transaccion:
+            raise
+
     def crear_tablas(self):
         """Crea las tablas necesarias si no existen"""
         try:
@@ -42,19 +283,214 @@ class BaseDeDatos:
                     descripcion TEXT NOT NULL,
                     monto REAL NOT NULL,
                     categoria TEXT NOT NULL,
-                    fecha TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    fecha TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    fecha_unix INTEGER
                 )
             ''')
 
+            # Bases de datos anteriores: agregar la fecha numérica y calcularla para los gastos existentes
+            columnas_gastos = [columna[1] for columna in self.cursor.execute('PRAGMA table_info(gastos)')]
+            if "fecha_unix" not in columnas_gastos:
+                self.cursor.execute('ALTER TABLE gastos ADD COLUMN fecha_unix INTEGER')
+                self.cursor.execute("UPDATE gastos SET fecha_unix = CAST(strftime('%s', fecha) AS INTEGER)")
+
+            # Los gastos insertados sin fecha numérica (p. ej. desde otra herramienta) la calculan aquí
+            self.cursor.execute('''
+                CREATE TRIGGER IF NOT EXISTS gastos_fecha_unix_insertar AFTER INSERT ON gastos
+                WHEN new.fecha_unix IS NULL BEGIN
+                    UPDATE gastos SET fecha_unix = CAST(strftime('%s', new.fecha) AS INTEGER) WHERE id = new.id;
+                END
+            ''')
+            self.cursor.execute('''
+                CREATE TRIGGER IF NOT EXISTS gastos_fecha_unix_actualizar AFTER UPDATE OF fecha ON gastos BEGIN
+                    UPDATE gastos SET fecha_unix = CAST(strftime('%s', new.fecha) AS INTEGER) WHERE id = new.id;
+                END
+            ''')
+
+            # Índices B-tree para filtros por categoría y para la paginación por llave
+            self.cursor.execute('CREATE INDEX IF NOT EXISTS idx_articulos_categoria_nombre ON articulos (categoria, nombre)')
+            self.cursor.execute('CREATE INDEX IF NOT EXISTS idx_gastos_categoria_fecha ON gastos (categoria, fecha)')
+            self.cursor.execute('CREATE INDEX IF NOT EXISTS idx_gastos_fecha_unix ON gastos (fecha_unix)')
+
             self.conexion.commit()
         except sqlite3.Error as e:
             print(f"{Fore.RED}Error al crear tablas: {e}")
             raise
 
+    def crear_indice_texto(self):
+        """Crea el índice de texto completo (FTS5) de artículos; regresa False si FTS5 no está disponible"""
+        try:
+            existia = self.cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'articulos_fts'"
+            ).fetchone()
+
+            self.cursor.execute('''
+                CREATE VIRTUAL TABLE IF NOT EXISTS articulos_fts USING fts5(
+                    nombre,
+                    categoria,
+                    descripcion,
+                    content='articulos',
+                    content_rowid='id'
+                )
+            ''')
+
+            # Triggers que mantienen el índice sincronizado con la tabla de artículos
+            self.cursor.execute('''
+                CREATE TRIGGER IF NOT EXISTS articulos_fts_insertar AFTER INSERT ON articulos BEGIN
+                    INSERT INTO articulos_fts (rowid, nombre, categoria, descripcion)
+                    VALUES (new.id, new.nombre, new.categoria, new.descripcion);
+                END
+            ''')
+            self.cursor.execute('''
+                CREATE TRIGGER IF NOT EXISTS articulos_fts_eliminar AFTER DELETE ON articulos BEGIN
+                    INSERT INTO articulos_fts (articulos_fts, rowid, nombre, categoria, descripcion)
+                    VALUES ('delete', old.id, old.nombre, old.categoria, old.descripcion);
+                END
+            ''')
+            self.cursor.execute('''
+                CREATE TRIGGER IF NOT EXISTS articulos_fts_actualizar AFTER UPDATE ON articulos BEGIN
+                    INSERT INTO articulos_fts (articulos_fts, rowid, nombre, categoria, descripcion)
+                    VALUES ('delete', old.id, old.nombre, old.categoria, old.descripcion);
+                    INSERT INTO articulos_fts (rowid, nombre, categoria, descripcion)
+                    VALUES (new.id, new.nombre, new.categoria, new.descripcion);
+                END
+            ''')
+
+            # Indexar los artículos que existían antes de crear la tabla FTS5
+            if not existia:
+                self.cursor.execute("INSERT INTO articulos_fts (articulos_fts) VALUES ('rebuild')")
+
+            self.conexion.commit()
+            return True
+        except sqlite3.OperationalError:
+            # SQLite compilado sin FTS5: las búsquedas usan LIKE
+            self.conexion.rollback()
+            return False
+
+    def crear_tabla_resumen(self):
+        """Crea la tabla de resumen por categoría y los triggers que la mantienen al día"""
+        try:
+            existia = self.cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'resumen_categorias'"
+            ).fetchone()
+
+            self.cursor.execute('''
+                CREATE TABLE IF NOT EXISTS resumen_categorias (
+                    tipo TEXT NOT NULL,
+                    categoria TEXT NOT NULL,
+                    elementos INTEGER NOT NULL,
+                    total REAL NOT NULL,
+                    PRIMARY KEY (tipo, categoria)
+                )
+            ''')
+
+            for tabla, valor in VALOR_RESUMEN.items():
+                sumar = f'''
+                    INSERT OR IGNORE INTO resumen_categorias (tipo, categoria, elementos, total)
+                    VALUES ('{tabla}', new.categoria, 0, 0);
+                    UPDATE resumen_categorias
+                    SET elementos = elementos + 1, total = total + ({valor.format(fila="new")})
+                    WHERE tipo = '{tabla}' AND categoria = new.categoria;
+                '''
+                restar = f'''
+                    UPDATE resumen_categorias
+                    SET elementos = elementos - 1, total = total - ({valor.format(fila="old")})
+                    WHERE tipo = '{tabla}' AND categoria = old.categoria;
+                    DELETE FROM resumen_categorias
+                    WHERE tipo = '{tabla}' AND categoria = old.categoria AND elementos <= 0;
+                '''
+                self.cursor.execute(f"CREATE TRIGGER IF NOT EXISTS resumen_{tabla}_insertar AFTER INSERT ON {tabla} BEGIN {sumar} END")
+                self.cursor.execute(f"CREATE TRIGGER IF NOT EXISTS resumen_{tabla}_eliminar AFTER DELETE ON {tabla} BEGIN {restar} END")
+                self.cursor.execute(f"CREATE TRIGGER IF NOT EXISTS resumen_{tabla}_actualizar AFTER UPDATE ON {tabla} BEGIN {restar} {sumar} END")
+
+            self.conexion.commit()
+
+            # Calcular el resumen de los datos que existían antes de crear la tabla
+            if not existia:
+                self.reconstruir_resumen()
+        except sqlite3.Error as e:
+            print(f"{Fore.RED}Error al crear la tabla de resumen: {e}")
+            raise
+
+    def reconstruir_resumen(self):
+        """Recalcula desde cero la tabla de resumen a partir de artículos y gastos"""
+        try:
+            self.cursor.execute('DELETE FROM resumen_categorias')
+            for tabla, valor in VALOR_RESUMEN.items():
+                self.cursor.execute(f'''
+                    INSERT INTO resumen_categorias (tipo, categoria, elementos, total)
+                    SELECT '{tabla}', categoria, COUNT(*), SUM({valor.format(fila=tabla)})
+                    FROM {tabla}
+                    GROUP BY categoria
+                ''')
+            self.conexion.commit()
+        except sqlite3.Error as e:
+            print(f"{Fore.RED}Error al reconstruir la tabla de resumen: {e}")
+            self.conexion.rollback()
+            raise
+
+    def verificar_resumen(self, reconstruir=True, tolerancia=0.005):
+        """
+        Compara la tabla de resumen con los totales calculados desde cero.
+        Regresa una lista de (tipo, categoría, guardado, calculado) con las diferencias encontradas
+        y reconstruye la tabla si hay alguna y reconstruir es True.
+        """
+        calculado = {}
+        for tabla, valor in VALOR_RESUMEN.items():
+            self.cursor.execute(f'SELECT categoria, COUNT(*), SUM({valor.format(fila=tabla)}) FROM {tabla} GROUP BY categoria')
+            for categoria, elementos, total in self.cursor.fetchall():
+                calculado[(tabla, categoria)] = (elementos, total)
+
+        self.cursor.execute('SELECT tipo, categoria, elementos, total FROM resumen_categorias')
+        guardado = {(tipo, categoria): (elementos, total) for tipo, categoria, elementos, total in self.cursor.fetchall()}
+
+        diferencias = []
+        for llave in sorted(set(calculado) | set(guardado)):
+            esperado = calculado.get(llave, (0, 0))
+            actual = guardado.get(llave, (0, 0))
+            if esperado[0] != actual[0] or abs(esperado[1] - actual[1]) > tolerancia:
+                diferencias.append((*llave, actual, esperado))
+
+        if diferencias and reconstruir:
+            self.reconstruir_resumen()
+        return diferencias
+
+    def crear_version_datos(self):
+        """Crea los contadores de versión de artículos y gastos, incrementados por triggers en cada cambio"""
+        try:
+            self.cursor.execute('''
+                CREATE TABLE IF NOT EXISTS version_datos (
+                    tabla TEXT PRIMARY KEY,
+                    version INTEGER NOT NULL
+                )
+            ''')
+            for tabla in VALOR_RESUMEN:
+                self.cursor.execute("INSERT OR IGNORE INTO version_datos (tabla, version) VALUES (?, 0)", (tabla,))
+                for evento in ("INSERT", "UPDATE", "DELETE"):
+                    self.cursor.execute(f'''
+                        CREATE TRIGGER IF NOT EXISTS version_{tabla}_{evento.lower()} AFTER {evento} ON {tabla} BEGIN
+                            UPDATE version_datos SET version = version + 1 WHERE tabla = '{tabla}';
+                        END
+                    ''')
+            self.conexion.commit()
+        except sqlite3.Error as e:
+            print(f"{Fore.RED}Error al crear la versión de los datos: {e}")
+            raise
+
+    def obtener_version_datos(self, tabla):
+        """Obtiene el número de versión de una tabla; cambia cada vez que se modifica alguna fila"""
+        try:
+            self.cursor.execute('SELECT version FROM version_datos WHERE tabla = ?', (tabla,))
+            fila = self.cursor.fetchone()
+            return fila[0] if fila else 0
+        except sqlite3.Error as e:
+            print(f"{Fore.RED}Error al obtener la versión de {tabla}: {e}")
+            return None
+
     def insertar_articulo(self, nombre, categoria, cantidad, precio_unitario, descripcion):
         """Inserta un nuevo artículo en la base de datos"""
         try:
-            self.cursor.execute('''
+            self.ejecutar_escritura('''
                 INSERT INTO articulos (
                     nombre,
                     categoria,
@@ -64,42 +500,101 @@ class BaseDeDatos:
                     actualizado_en
                 )
                 VALUES (?, ?, ?, ?, ?, ?)
-            ''', (nombre, categoria, cantidad, precio_unitario, descripcion, datetime.now()))
-            self.conexion.commit()
+            ''', (nombre, categoria, cantidad, precio_unitario, descripcion, ahora_utc()))
+            self.confirmar()
             return self.cursor.lastrowid
         except sqlite3.Error as e:
             print(f"{Fore.RED}Error al insertar artículo: {e}")
-            self.conexion.rollback()
+            self.revertir()
             return None
 
-    def buscar_articulos_por_nombre(self, nombre):
-        """Busca artículos por nombre (coincidencia parcial)"""
+    def consulta_fts(self, texto, campo=None):
+        """Arma la consulta MATCH de FTS5, o regresa None si hay que usar LIKE"""
+        if campo not in (None, "nombre", "categoria"):
+            raise ValueError(f"Campo de búsqueda no válido: {campo}")
+
+        terminos = re.findall(r'\w+', texto)
+        if not self.fts_disponible or not terminos:
+            return None
+
+        # Cada término se busca como prefijo y todos deben aparecer
+        prefijo_campo = f"{campo} : " if campo else ""
+        return " AND ".join(f'{prefijo_campo}"{termino}"*' for termino in terminos)
+
+    def buscar_articulos(self, texto, campo=None, limite=TAMANO_PAGINA, despues_de=None):
+        """
+        Busca artículos ordenados por relevancia (BM25) en nombre, categoría o ambos campos.
+        Cada fila termina con su relevancia; despues_de es la llave (relevancia, id) de la
+        última fila de la página anterior. limite=None regresa todos los resultados.
+        """
+        consulta = self.consulta_fts(texto, campo)
+        if consulta is None:
+            return self.buscar_articulos_con_like(texto, campo, limite, despues_de)
+
         try:
-            self.cursor.execute('''
-                    SELECT *
-                    FROM articulos
-                    WHERE nombre LIKE ?
-            ''', (f'%{nombre}%',))
-            
+            filtro_pagina = "AND (articulos_fts.rank, articulos_fts.rowid) > (?, ?)" if despues_de else ""
+            self.cursor.execute(f'''
+                    SELECT articulos.*, articulos_fts.rank
+                    FROM articulos_fts
+                    JOIN articulos ON articulos.id = articulos_fts.rowid
+                    WHERE articulos_fts MATCH ? {filtro_pagina}
+                    ORDER BY articulos_fts.rank, articulos_fts.rowid
+                    LIMIT ?
+            ''', (consulta, *(despues_de or ()), -1 if limite is None else limite))
+
             return self.cursor.fetchall()
         except sqlite3.Error as e:
-            print(f"{Fore.RED}Error al buscar artículos por nombre: {e}")
-            return []
-
-    def buscar_articulos_por_categoria(self, categoria):
-        """Busca artículos por categoría (coincidencia parcial)"""
+            print(f"{Fore.RED}Error en la búsqueda de texto completo: {e}")
+            return self.buscar_articulos_con_like(texto, campo, limite, despues_de)
+
+    def buscar_articulos_con_like(self, texto, campo=None, limite=TAMANO_PAGINA, despues_de=None):
+        """
+        Busca artículos con LIKE (coincidencia parcial); respaldo cuando FTS5 no está disponible.
+        Las filas terminan con relevancia 0 y se ordenan por id, con la misma llave que buscar_articulos.
+        """
         try:
-            self.cursor.execute('''
-                    SELECT *
+            condicion = "(nombre LIKE ? OR categoria LIKE ?)" if campo is None else f"{campo} LIKE ?"
+            parametros = [f'%{texto}%'] * (2 if campo is None else 1)
+            if despues_de:
+                condicion += " AND id > ?"
+                parametros.append(despues_de[1])
+            self.cursor.execute(f'''
+                    SELECT *, 0.0
                     FROM articulos
-                    WHERE categoria LIKE ?
-            ''', (f'%{categoria}%',))
-            
+                    WHERE {condicion}
+                    ORDER BY id
+                    LIMIT ?
+            ''', (*parametros, -1 if limite is None else limite))
+
             return self.cursor.fetchall()
         except sqlite3.Error as e:
-            print(f"{Fore.RED}Error al buscar artículos por categoría: {e}")
+            print(f"{Fore.RED}Error al buscar artículos: {e}")
             return []
 
+    def contar_articulos_encontrados(self, texto, campo=None):
+        """Cuenta los artículos que coinciden con la búsqueda, sin ordenarlos por relevancia"""
+        consulta = self.consulta_fts(texto, campo)
+        try:
+            if consulta is not None:
+                self.cursor.execute('SELECT COUNT(*) FROM articulos_fts WHERE articulos_fts MATCH ?', (consulta,))
+            elif campo is None:
+                self.cursor.execute('SELECT COUNT(*) FROM articulos WHERE nombre LIKE ? OR categoria LIKE ?',
+                                    (f'%{texto}%', f'%{texto}%'))
+            else:
+                self.cursor.execute(f'SELECT COUNT(*) FROM articulos WHERE {campo} LIKE ?', (f'%{texto}%',))
+            return self.cursor.fetchone()[0]
+        except sqlite3.Error as e:
+            print(f"{Fore.RED}Error al contar los artículos encontrados: {e}")
+            return 0
+
+    def buscar_articulos_por_nombre(self, nombre, despues_de=None, tamano_pagina=TAMANO_PAGINA):
+        """Obtiene una página de artículos por nombre ordenados por relevancia"""
+        return self.buscar_articulos(nombre, "nombre", tamano_pagina, despues_de)
+
+    def buscar_articulos_por_categoria(self, categoria, despues_de=None, tamano_pagina=TAMANO_PAGINA):
+        """Obtiene una página de artículos por categoría ordenados por relevancia"""
+        return self.buscar_articulos(categoria, "categoria", tamano_pagina, despues_de)
+
     def obtener_todos_articulos(self):
         """Obtiene todos los artículos de la base de datos"""
         try:
@@ -121,7 +616,7 @@ class BaseDeDatos:
     def actualizar_articulo(self, id_articulo, nombre, categoria, cantidad, precio_unitario, descripcion):
         """Actualiza un artículo existente"""
         try:
-            self.cursor.execute('''
+            self.ejecutar_escritura('''
                 UPDATE articulos
                 SET nombre          = ?,
                 categoria       = ?,
@@ -130,37 +625,38 @@ class BaseDeDatos:
                 descripcion     = ?,
                 actualizado_en  = ?
                 WHERE id = ?
-            ''', (nombre, categoria, cantidad, precio_unitario, descripcion, datetime.now(), id_articulo))
-            self.conexion.commit()
+            ''', (nombre, categoria, cantidad, precio_unitario, descripcion, ahora_utc(), id_articulo))
+            self.confirmar()
             return self.cursor.rowcount > 0
         except sqlite3.Error as e:
             print(f"{Fore.RED}Error al actualizar artículo: {e}")
-            self.conexion.rollback()
+            self.revertir()
             return False
 
     def eliminar_articulo(self, id_articulo):
         """Elimina un artículo por su ID"""
         try:
-            self.cursor.execute('DELETE FROM articulos WHERE id = ?', (id_articulo,))
-            self.conexion.commit()
+            self.ejecutar_escritura('DELETE FROM articulos WHERE id = ?', (id_articulo,))
+            self.confirmar()
             return self.cursor.rowcount > 0
         except sqlite3.Error as e:
             print(f"{Fore.RED}Error al eliminar artículo: {e}")
-            self.conexion.rollback()
+            self.revertir()
             return False
 
     def registrar_gasto(self, descripcion, monto, categoria):
         """Registra un nuevo gasto con categoría"""
+        fecha = datetime.now()
         try:
-            self.cursor.execute('''
-                INSERT INTO gastos (descripcion, monto, categoria, fecha)
-                VALUES (?, ?, ?, ?)
-            ''', (descripcion, monto, categoria, datetime.now()))
-            self.conexion.commit()
+            self.ejecutar_escritura('''
+                INSERT INTO gastos (descripcion, monto, categoria, fecha, fecha_unix)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (descripcion, monto, categoria, fecha, marca_unix(fecha)))
+            self.confirmar()
             return self.cursor.lastrowid
         except sqlite3.Error as e:
             print(f"{Fore.RED}Error al registrar gasto: {e}")
-            self.conexion.rollback()
+            self.revertir()
             return None
 
     def obtener_gastos(self):
@@ -181,6 +677,231 @@ class BaseDeDatos:
             print(f"{Fore.RED}Error al obtener gastos por categoría: {e}")
             return []
 
+    def obtener_pagina_articulos(self, despues_de=None, tamano_pagina=TAMANO_PAGINA):
+        """
+        Obtiene una página de artículos ordenada por (categoría, nombre, id) con paginación por llave.
+        despues_de es la llave (categoria, nombre, id) de la última fila de la página anterior.
+        """
+        try:
+            if despues_de is None:
+                self.cursor.execute('''
+                    SELECT * FROM articulos
+                    ORDER BY categoria, nombre, id
+                    LIMIT ?
+                ''', (tamano_pagina,))
+            else:
+                self.cursor.execute('''
+                    SELECT * FROM articulos
+                    WHERE (categoria, nombre, id) > (?, ?, ?)
+                    ORDER BY categoria, nombre, id
+                    LIMIT ?
+                ''', (*despues_de, tamano_pagina))
+            return self.cursor.fetchall()
+        except sqlite3.Error as e:
+            print(f"{Fore.RED}Error al obtener la página de artículos: {e}")
+            return []
+
+    def obtener_pagina_gastos(self, despues_de=None, tamano_pagina=TAMANO_PAGINA):
+        """
+        Obtiene una página de gastos del más reciente al más antiguo con paginación por llave.
+        despues_de es la llave (fecha_unix, id) de la última fila de la página anterior.
+        """
+        try:
+            if despues_de is None:
+                self.cursor.execute('''
+                    SELECT * FROM gastos
+                    ORDER BY fecha_unix DESC, id DESC
+                    LIMIT ?
+                ''', (tamano_pagina,))
+            else:
+                self.cursor.execute('''
+                    SELECT * FROM gastos
+                    WHERE (fecha_unix, id) < (?, ?)
+                    ORDER BY fecha_unix DESC, id DESC
+                    LIMIT ?
+                ''', (*despues_de, tamano_pagina))
+            return self.cursor.fetchall()
+        except sqlite3.Error as e:
+            print(f"{Fore.RED}Error al obtener la página de gastos: {e}")
+            return []
+
+    def obtener_gastos_por_periodo(self, periodo="dia", desde=None, hasta=None):
+        """
+        Agrupa los gastos por día, semana o mes con strftime en SQLite.
+        Regresa filas (periodo, inicio_unix, gastos, total, mínimo, máximo) en orden cronológico.
+        """
+        formato = FORMATOS_PERIODO[periodo]
+        condiciones = []
+        parametros = [formato]
+        if desde:
+            condiciones.append("fecha_unix >= ?")
+            parametros.append(marca_unix(desde))
+        if hasta:
+            condiciones.append("fecha_unix < ?")
+            parametros.append(marca_unix(hasta + timedelta(days=1)))
+        filtro = f"WHERE {' AND '.join(condiciones)}" if condiciones else ""
+
+        try:
+            self.cursor.execute(f'''
+                SELECT strftime(?, fecha_unix, 'unixepoch') AS periodo,
+                       MIN(fecha_unix),
+                       COUNT(*),
+                       SUM(monto),
+                       MIN(monto),
+                       MAX(monto)
+                FROM gastos
+                {filtro}
+                GROUP BY periodo
+                ORDER BY periodo
+            ''', parametros)
+            return self.cursor.fetchall()
+        except sqlite3.Error as e:
+            print(f"{Fore.RED}Error al agrupar gastos por {periodo}: {e}")
+            return []
+
+    def obtener_resumen(self, tipo):
+        """Obtiene (elementos, total) de artículos o gastos desde la tabla de resumen, en O(categorías)"""
+        try:
+            self.cursor.execute('''
+                SELECT COALESCE(SUM(elementos), 0), COALESCE(SUM(total), 0)
+                FROM resumen_categorias
+                WHERE tipo = ?
+            ''', (tipo,))
+            return self.cursor.fetchone()
+        except sqlite3.Error as e:
+            print(f"{Fore.RED}Error al obtener el resumen de {tipo}: {e}")
+            return (0, 0)
+
+    def obtener_resumen_articulos(self):
+        """Obtiene el número de artículos y el valor total del presupuesto"""
+        return self.obtener_resumen("articulos")
+
+    def obtener_resumen_gastos(self):
+        """Obtiene el número de gastos y su monto total"""
+        return self.obtener_resumen("gastos")
+
+    def obtener_agrupados_por_categoria(self, tipo):
+        """Obtiene (categoría, elementos, total, porcentaje) desde la tabla de resumen"""
+        try:
+            self.cursor.execute('''
+                SELECT categoria,
+                       elementos,
+                       total,
+                       COALESCE(total * 100.0 / NULLIF((SELECT SUM(total) FROM resumen_categorias WHERE tipo = ?), 0), 0)
+                FROM resumen_categorias
+                WHERE tipo = ?
+                ORDER BY categoria
+            ''', (tipo, tipo))
+            return self.cursor.fetchall()
+        except sqlite3.Error as e:
+            print(f"{Fore.RED}Error al agrupar {tipo} por categoría: {e}")
+            return []
+
+    def obtener_articulos_agrupados_por_categoria(self):
+        """Obtiene (categoría, artículos, total, porcentaje) por categoría"""
+        return self.obtener_agrupados_por_categoria("articulos")
+
+    def obtener_gastos_agrupados_por_categoria(self):
+        """Obtiene (categoría, gastos, total, porcentaje) por categoría"""
+        return self.obtener_agrupados_por_categoria("gastos")
+
+    def iterar_lotes(self, consulta, parametros=(), tamano_lote=5_000):
+        """Genera lotes de filas con fetchmany usando un cursor propio, sin cargar toda la consulta"""
+        cursor = self.conexion.cursor()
+        try:
+            cursor.execute(consulta, parametros)
+            while True:
+                lote = cursor.fetchmany(tamano_lote)
+                if not lote:
+                    break
+                yield lote
+        finally:
+            cursor.close()
+
+    def exportar_csv(self, tabla, ruta_archivo, desde=None, hasta=None, comprimir=False, tamano_lote=5_000):
+        """
+        Exporta artículos o gastos a CSV por lotes, con memoria constante.
+        desde/hasta (fechas, inclusivas) filtran por creado_en o fecha_unix; comprimir escribe gzip.
+        Regresa el número de filas escritas.
+        """
+        consulta, columna_fecha, encabezados = CONSULTAS_EXPORTACION[tabla]
+        condiciones = []
+        parametros = []
+        convertir = marca_unix if columna_fecha == "fecha_unix" else (lambda fecha: fecha.strftime('%Y-%m-%d'))
+        if desde:
+            condiciones.append(f"{columna_fecha} >= ?")
+            parametros.append(convertir(desde))
+        if hasta:
+            condiciones.append(f"{columna_fecha} < ?")
+            parametros.append(convertir(hasta + timedelta(days=1)))
+        if condiciones:
+            consulta += " WHERE " + " AND ".join(condiciones)
+        consulta += " ORDER BY id"
+
+        abrir = gzip.open if comprimir else open
+        filas_escritas = 0
+        with abrir(ruta_archivo, 'wt', newline='', encoding='utf-8') as archivo_csv:
+            escritor_csv = csv.writer(archivo_csv)
+            escritor_csv.writerow(encabezados)
+
+            for lote in self.iterar_lotes(consulta, parametros, tamano_lote):
+                if tabla == "articulos":
+                    # El total se calcula por lote, antes de escribirlo
+                    lote = [
+                        (id_articulo, nombre, categoria, cantidad, precio_unitario,
+                         cantidad * precio_unitario, descripcion or "")
+                        for id_articulo, nombre, categoria, cantidad, precio_unitario, descripcion in lote
+                    ]
+                escritor_csv.writerows(lote)
+                filas_escritas += len(lote)
+
+        return filas_escritas
+
+    def importar_filas(self, tabla, filas, tamano_lote=10_000):
+        """
+        Importa filas (diccionarios) en lotes con executemany, una transacción por lote.
+        Usa synchronous=NORMAL solo durante la importación; la base ya está en modo WAL.
+        Regresa (importadas, errores, segundos); errores es una lista de (número de fila, mensaje).
+        """
+        columnas = COLUMNAS_IMPORTACION[tabla]
+        sentencia = f"INSERT INTO {tabla} ({', '.join(columnas)}) VALUES ({', '.join('?' * len(columnas))})"
+        importadas = 0
+        errores = []
+        numero_fila = 0
+        inicio = time.perf_counter()
+
+        sincronizacion_anterior = self.cursor.execute('PRAGMA synchronous').fetchone()[0]
+        self.cursor.execute('PRAGMA synchronous = NORMAL')
+        try:
+            filas = iter(filas)
+            while True:
+                lote = []
+                leidas = 0
+                for fila in islice(filas, tamano_lote):
+                    numero_fila += 1
+                    leidas += 1
+                    try:
+                        lote.append(convertir_fila_importacion(tabla, fila))
+                    except ValueError as e:
+                        errores.append((numero_fila, str(e)))
+                if not leidas:
+                    break
+                if not lote:
+                    continue  # Todas las filas del lote son inválidas; las siguientes se siguen importando
+
+                try:
+                    self.con_reintentos(lambda: self.cursor.executemany(sentencia, lote))
+                    self.con_reintentos(self.conexion.commit)
+                    importadas += len(lote)
+                except sqlite3.Error as e:
+                    print(f"{Fore.RED}Error al importar el lote que termina en la fila {numero_fila}: {e}")
+                    self.conexion.rollback()
+                    raise
+        finally:
+            self.cursor.execute(f'PRAGMA synchronous = {sincronizacion_anterior}')
+
+        return importadas, errores, time.perf_counter() - inicio
+
     def cerrar(self):
         """Cierra la conexión a la base de datos"""
         if hasattr(self, 'conexion'):
@@ -190,26 +911,130 @@ class BaseDeDatos:
                 print(f"{Fore.RED}Error al cerrar la base de datos: {e}")
 
 
+class PoolConexiones:
+    """
+    Pool de conexiones seguro entre hilos para uso concurrente de la misma base de datos:
+    varias conexiones de lectura simultáneas y una sola conexión de escritura a la vez.
+    """
+
+    def __init__(self, nombre_db="presupuesto.db", lectores=4):
+        self.escritor = BaseDeDatos(nombre_db, compartida=True)
+        self.candado_escritura = threading.Lock()
+        self.lectores = Queue()
+        for _ in range(lectores):
+            self.lectores.put(BaseDeDatos(nombre_db, compartida=True))
+
+    @contextmanager
+    def lectura(self):
+        """Presta una conexión de lectura; espera si todas están ocupadas"""
+        bd = self.lectores.get()
+        try:
+            yield bd
+        finally:
+            self.lectores.put(bd)
+
+    @contextmanager
+    def escritura(self):
+        """Presta la conexión de escritura dentro de una transacción; un escritor a la vez"""
+        with self.candado_escritura:
+            with self.escritor.transaccion():
+                yield self.escritor
+
+    def cerrar(self):
+        """Cierra todas las conexiones del pool"""
+        with self.candado_escritura:
+            self.escritor.cerrar()
+        while not self.lectores.empty():
+            self.lectores.get().cerrar()
+
+
+class RenderizadorGraficos:
+    """Genera gráficos como archivos PNG/SVG en un hilo de fondo, sin ventana y sin bloquear el menú"""
+
+    def __init__(self, directorio="graficos"):
+        self.directorio = directorio
+        # El hilo de fondo se crea con el primer gráfico
+        self.ejecutor = None
+        # Clave (incluye la versión de los datos) -> Future con la ruta del archivo generado
+        self.cache = {}
+
+    def renderizar(self, clave, formato, preparar_dibujo):
+        """
+        Regresa un Future con la ruta de la imagen para la clave dada.
+        preparar_dibujo se llama en el hilo actual (acceso a la base de datos) solo si la clave
+        no está en caché, y debe regresar una función que dibuje sobre una Figure de matplotlib.
+        """
+        clave = (*clave, formato)
+        futuro = self.cache.get(clave)
+        if futuro is not None and not (futuro.done() and futuro.exception()):
+            return futuro
+
+        if self.ejecutor is None:
+            from concurrent.futures import ThreadPoolExecutor
+            self.ejecutor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="graficos")
+
+        nombre_archivo = "_".join(str(parte) for parte in clave[:-1]) + f".{formato}"
+        futuro = self.ejecutor.submit(self.guardar_figura, preparar_dibujo(), os.path.join(self.directorio, nombre_archivo))
+        self.cache[clave] = futuro
+        return futuro
+
+    def guardar_figura(self, dibujar, ruta_archivo):
+        """Dibuja y guarda la figura con el backend Agg; se ejecuta en el hilo de fondo"""
+        # Importación diferida: matplotlib solo se carga la primera vez que se genera un gráfico
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        os.makedirs(self.directorio, exist_ok=True)
+        figura = Figure(figsize=(15, 7))
+        FigureCanvasAgg(figura)
+        dibujar(figura)
+        figura.savefig(ruta_archivo)
+        return ruta_archivo
+
+    def cerrar(self):
+        """Espera a que terminen los gráficos pendientes y libera el hilo de fondo"""
+        if self.ejecutor is not None:
+            self.ejecutor.shutdown(wait=True)
+
+
 class AplicacionPresupuesto:
-    def __init__(self):
-        """Inicializa la aplicación de presupuesto"""
-        self.bd = BaseDeDatos()
+    def __init__(self, nombre_db="presupuesto.db"):
+        """Inicializa la aplicación de presupuesto; la base de datos se abre en el primer uso"""
+        self.nombre_db = nombre_db
+        self.base_de_datos = None
+        self.renderizador = RenderizadorGraficos()
         self.opciones_menu = {
             "1": self.registrar_articulo,
             "2": self.buscar_articulos,
             "3": self.editar_articulo,
             "4": self.eliminar_articulo,
             "5": self.listar_todos_articulos,
-            "6": self.exportar_articulos_csv,
+            "6": self.exportar_datos_csv,
             "7": self.registrar_gasto,
             "8": self.ver_gastos,
             "9": self.ver_gastos_por_categoria,
             "10": self.visualizar_gastos,
             "11": self.generar_reporte_presupuesto,
-            "12": self.salir_aplicacion
+            "12": self.importar_datos,
+            "13": self.verificar_resumen,
+            "14": self.exportar_instantanea,
+            "15": self.salir_aplicacion
         }
         self.ejecutando = True
 
+    @property
+    def bd(self):
+        """Abre la base de datos la primera vez que una opción la necesita"""
+        if self.base_de_datos is None:
+            self.base_de_datos = BaseDeDatos(self.nombre_db)
+        return self.base_de_datos
+
+    def cerrar(self):
+        """Espera los gráficos pendientes y cierra la base de datos si se llegó a abrir"""
+        self.renderizador.cerrar()
+        if self.base_de_datos is not None:
+            self.base_de_datos.cerrar()
+
     def mostrar_menu(self):
         """Muestra las opciones del menú principal"""
         print("\n" + "=" * 50)
@@ -220,13 +1045,16 @@ class AplicacionPresupuesto:
         print(f"{Fore.YELLOW}3. Editar artículo")
         print(f"{Fore.YELLOW}4. Eliminar artículo")
         print(f"{Fore.YELLOW}5. Listar todos los artículos")
-        print(f"{Fore.YELLOW}6. Exportar artículos a CSV")
+        print(f"{Fore.YELLOW}6. Exportar datos a CSV")
         print(f"{Fore.YELLOW}7. Registrar gasto")
         print(f"{Fore.YELLOW}8. Ver gastos")
         print(f"{Fore.YELLOW}9. Ver gastos por categoría")
         print(f"{Fore.YELLOW}10. Visualizar gastos")
         print(f"{Fore.YELLOW}11. Generar reporte de presupuesto")
-        print(f"{Fore.YELLOW}12. Salir")
+        print(f"{Fore.YELLOW}12. Importar datos (CSV/JSONL)")
+        print(f"{Fore.YELLOW}13. Verificar resumen de presupuesto")
+        print(f"{Fore.YELLOW}14. Exportar instantánea columnar para análisis")
+        print(f"{Fore.YELLOW}15. Salir")
         print("=" * 50)
 
     def obtener_entrada_usuario(self, mensaje, funcion_validacion=None, mensaje_error=None):
@@ -301,28 +1129,33 @@ class AplicacionPresupuesto:
             print(f"\n{Fore.RED}❌ Error durante el registro: {e}")
 
     def buscar_articulos(self):
-        """Busca artículos por nombre o categoría"""
+        """Busca artículos por nombre o categoría, una página a la vez"""
         print(f"\n{Fore.GREEN}{Style.BRIGHT}--- BUSCAR ARTÍCULOS ---")
         print(f"{Fore.YELLOW}1. Buscar por nombre")
         print(f"{Fore.YELLOW}2. Buscar por categoría")
 
         try:
             opcion = self.obtener_entrada_usuario("Seleccione una opción (1-2): ", lambda x: x in ["1", "2"], "Opción inválida.")
-            resultados = []
             if opcion == "1":
-                nombre = self.obtener_entrada_usuario("Ingrese el nombre a buscar: ")
-                resultados = self.bd.buscar_articulos_por_nombre(nombre)
+                texto = self.obtener_entrada_usuario("Ingrese el nombre a buscar: ")
+                campo, buscar = "nombre", self.bd.buscar_articulos_por_nombre
             else:
-                categoria = self.obtener_entrada_usuario("Ingrese la categoría a buscar: ")
-                resultados = self.bd.buscar_articulos_por_categoria(categoria)
+                texto = self.obtener_entrada_usuario("Ingrese la categoría a buscar: ")
+                campo, buscar = "categoria", self.bd.buscar_articulos_por_categoria
 
-            if not resultados:
+            total_resultados = self.bd.contar_articulos_encontrados(texto, campo)
+            if not total_resultados:
                 print(f"\n{Fore.YELLOW}No se encontraron artículos que coincidan con la búsqueda.")
-            else:
-                print(f"\n{Fore.GREEN}Se encontraron {len(resultados)} artículos:")
-                datos_tabla = self.formatear_articulos_para_tabla(resultados)
-                headers = ["ID", "Nombre", "Categoría", "Cantidad", "Precio Unit.", "Total"]
-                print(tabulate(datos_tabla, headers=headers, tablefmt="fancy_grid"))
+                return
+
+            print(f"\n{Fore.GREEN}Se encontraron {total_resultados} artículos:")
+            headers = ["ID", "Nombre", "Categoría", "Cantidad", "Precio Unit.", "Total"]
+            self.paginar(
+                lambda despues_de, tamano_pagina: buscar(texto, despues_de, tamano_pagina),
+                lambda articulo: (articulo[-1], articulo[0]),
+                lambda pagina: print(tabulate(self.formatear_articulos_para_tabla(pagina), headers=headers, tablefmt="fancy_grid")),
+                total_resultados
+            )
         except Exception as e:
             print(f"\n{Fore.RED}❌ Error durante la búsqueda: {e}")
 
@@ -392,40 +1225,92 @@ class AplicacionPresupuesto:
         except Exception as e:
             print(f"\n{Fore.RED}❌ Error durante la eliminación: {e}")
 
+    def paginar(self, obtener_pagina, llave_fila, mostrar_pagina, total_filas, tamano_pagina=TAMANO_PAGINA):
+        """Muestra resultados página por página; solo se consulta y dibuja la página actual"""
+        total_paginas = max(1, math.ceil(total_filas / tamano_pagina))
+        # Llave de la última fila anterior a cada página visitada (None para la primera)
+        llaves = [None]
+
+        while True:
+            pagina = obtener_pagina(llaves[-1], tamano_pagina)
+            mostrar_pagina(pagina)
+            numero_pagina = len(llaves)
+            print(f"{Fore.CYAN}Página {numero_pagina} de {total_paginas}")
+
+            opciones = {}
+            if numero_pagina < total_paginas and len(pagina) == tamano_pagina:
+                opciones["s"] = "s = siguiente"
+            if numero_pagina > 1:
+                opciones["a"] = "a = anterior"
+            if not opciones:
+                return
+            opciones["q"] = "q = salir"
+
+            opcion = self.obtener_entrada_usuario(f"{', '.join(opciones.values())}: ", lambda x: x.lower() in opciones, "Opción inválida.").lower()
+            if opcion == "s":
+                llaves.append(llave_fila(pagina[-1]))
+            elif opcion == "a":
+                llaves.pop()
+            else:
+                return
+
     def listar_todos_articulos(self):
-        """Lista todos los artículos registrados"""
+        """Lista todos los artículos registrados, una página a la vez"""
         print(f"\n{Fore.GREEN}{Style.BRIGHT}--- LISTA DE TODOS LOS ARTÍCULOS ---")
 
         try:
-            articulos = self.bd.obtener_todos_articulos()
+            total_articulos, total_presupuesto = self.bd.obtener_resumen_articulos()
 
-            if not articulos:
+            if not total_articulos:
                 print(f"\n{Fore.YELLOW}No hay artículos registrados en el sistema.")
                 return
 
-            datos_tabla = self.formatear_articulos_para_tabla(articulos)
             headers = ["ID", "Nombre", "Categoría", "Cantidad", "Precio Unit.", "Total"]
-            print(tabulate(datos_tabla, headers=headers, tablefmt="fancy_grid"))
-
-            # Calcular y mostrar el total del presupuesto
-            total_presupuesto = sum(articulo[3] * articulo[4] for articulo in articulos)
+            self.paginar(
+                self.bd.obtener_pagina_articulos,
+                lambda articulo: (articulo[2], articulo[1], articulo[0]),
+                lambda pagina: print(tabulate(self.formatear_articulos_para_tabla(pagina), headers=headers, tablefmt="fancy_grid")),
+                total_articulos
+            )
+
+            # El total del presupuesto proviene de la consulta agregada
             print(f"\n{Fore.GREEN}{Style.BRIGHT}TOTAL PRESUPUESTO: ${total_presupuesto:.2f}")
         except Exception as e:
             print(f"\n{Fore.RED}❌ Error al listar los artículos: {e}")
 
-    def exportar_articulos_csv(self):
-        """Exporta los artículos a un archivo CSV"""
-        print(f"\n{Fore.GREEN}{Style.BRIGHT}--- EXPORTAR ARTÍCULOS A CSV ---")
+    def obtener_fecha_opcional(self, mensaje):
+        """Pide una fecha AAAA-MM-DD opcional; regresa None si se deja en blanco"""
+        def validar_fecha(valor):
+            try:
+                datetime.strptime(valor, '%Y-%m-%d')
+                return True
+            except ValueError:
+                return False
+
+        valor = self.obtener_entrada_usuario(mensaje, lambda x: not x or validar_fecha(x), "La fecha debe tener el formato AAAA-MM-DD.")
+        return datetime.strptime(valor, '%Y-%m-%d') if valor else None
+
+    def exportar_datos_csv(self):
+        """Exporta artículos o gastos a un archivo CSV, opcionalmente comprimido con gzip"""
+        print(f"\n{Fore.GREEN}{Style.BRIGHT}--- EXPORTAR DATOS A CSV ---")
+        print(f"{Fore.YELLOW}1. Exportar artículos")
+        print(f"{Fore.YELLOW}2. Exportar gastos")
 
         try:
-            articulos = self.bd.obtener_todos_articulos()
+            opcion = self.obtener_entrada_usuario("Seleccione una opción (1-2): ", lambda x: x in ["1", "2"], "Opción inválida.")
+            tabla = "articulos" if opcion == "1" else "gastos"
 
-            if not articulos:
-                print(f"\n{Fore.YELLOW}No hay artículos para exportar.")
+            total_filas = (self.bd.obtener_resumen_articulos() if tabla == "articulos" else self.bd.obtener_resumen_gastos())[0]
+            if not total_filas:
+                print(f"\n{Fore.YELLOW}No hay {'artículos' if tabla == 'articulos' else 'gastos'} para exportar.")
                 return
 
+            desde = self.obtener_fecha_opcional("Desde (AAAA-MM-DD, en blanco sin límite): ")
+            hasta = self.obtener_fecha_opcional("Hasta (AAAA-MM-DD, en blanco sin límite): ")
+            comprimir = self.obtener_entrada_usuario("¿Comprimir con gzip? (s/n): ", lambda x: x.lower() in ["s", "n"], "Por favor, responda 's' para sí o 'n' para no.").lower() == "s"
+
             nombre_archivo = self.obtener_entrada_usuario("Nombre del archivo (sin extensión): ", self.validar_no_vacio, "El nombre del archivo no puede estar vacío.")
-            ruta_archivo = f"{nombre_archivo}.csv"
+            ruta_archivo = f"{nombre_archivo}.csv.gz" if comprimir else f"{nombre_archivo}.csv"
 
             # Confirmar sobrescritura si el archivo ya existe
             if os.path.exists(ruta_archivo):
@@ -437,27 +1322,8 @@ class AplicacionPresupuesto:
                     print(f"\n{Fore.YELLOW}Exportación cancelada.")
                     return
 
-            with open(ruta_archivo, 'w', newline='', encoding='utf-8') as archivo_csv: 
-                escritor_csv = csv.writer(archivo_csv)
-
-                # Escribir encabezados
-                escritor_csv.writerow(['ID', 'Nombre', 'Categoría', 'Cantidad', 'Precio Unitario', 'Total', 'Descripción'])
-
-                # Escribir datos
-                for articulo in articulos:
-                    id_articulo, nombre, categoria, cantidad, precio_unitario, descripcion = articulo[0:6]
-                    total = cantidad * precio_unitario
-                    escritor_csv.writerow([
-                        id_articulo,
-                        nombre,
-                        categoria,
-                        cantidad,
-                        precio_unitario,
-                        total,
-                        descripcion or ""
-                    ])
-
-            print(f"\n{Fore.GREEN}✅ Artículos exportados exitosamente a '{ruta_archivo}'")
+            filas_escritas = self.bd.exportar_csv(tabla, ruta_archivo, desde, hasta, comprimir)
+            print(f"\n{Fore.GREEN}✅ {filas_escritas} filas exportadas exitosamente a '{ruta_archivo}'")
 
             # Preguntar si desea abrir el archivo
             abrir = self.obtener_entrada_usuario("¿Desea abrir el archivo exportado? (s/n): ",lambda x: x.lower() in ["s", "n"], "Por favor, responda 's' para sí o 'n' para no.")
@@ -486,19 +1352,23 @@ class AplicacionPresupuesto:
             print(f"\n{Fore.RED}❌ Error durante el registro del gasto: {e}")
 
     def ver_gastos(self):
-        """Muestra todos los gastos registrados"""
+        """Muestra los gastos registrados, una página a la vez"""
         print(f"\n{Fore.GREEN}{Style.BRIGHT}--- LISTA DE GASTOS ---")
         try:
-            gastos = self.bd.obtener_gastos()
-            if not gastos:
+            numero_gastos, total_gastos = self.bd.obtener_resumen_gastos()
+            if not numero_gastos:
                 print(f"\n{Fore.YELLOW}No hay gastos registrados.")
                 return
-            datos_tabla = [[gasto[0], gasto[1], f"${gasto[2]:.2f}", gasto[3], gasto[4]] for gasto in gastos]
-            headers = ["ID", "Descripción", "Monto", "Categoría", "Fecha"]
-            print(tabulate(datos_tabla, headers=headers, tablefmt="fancy_grid"))
 
-            # Calcular y mostrar el total de gastos
-            total_gastos = sum(gasto[2] for gasto in gastos)
+            headers = ["ID", "Descripción", "Monto", "Categoría", "Fecha"]
+            self.paginar(
+                self.bd.obtener_pagina_gastos,
+                lambda gasto: (gasto[5], gasto[0]),
+                lambda pagina: print(tabulate([[gasto[0], gasto[1], f"${gasto[2]:.2f}", gasto[3], gasto[4]] for gasto in pagina], headers=headers, tablefmt="fancy_grid")),
+                numero_gastos
+            )
+
+            # El total de gastos proviene de la consulta agregada
             print(f"\n{Fore.GREEN}{Style.BRIGHT}TOTAL GASTOS: ${total_gastos:.2f}")
         except Exception as e:
             print(f"\n{Fore.RED}❌ Error al listar los gastos: {e}")
@@ -523,73 +1393,71 @@ class AplicacionPresupuesto:
             print(f"\n{Fore.RED}❌ Error al listar los gastos por categoría: {e}")
 
     def visualizar_gastos(self):
-        """Visualiza los gastos a lo largo del tiempo"""
+        """Visualiza los gastos agrupados por día, semana o mes en una ventana o en un archivo"""
         print(f"\n{Fore.GREEN}{Style.BRIGHT}--- VISUALIZAR GASTOS ---")
+        print(f"{Fore.YELLOW}1. Por día")
+        print(f"{Fore.YELLOW}2. Por semana")
+        print(f"{Fore.YELLOW}3. Por mes")
         try:
-            gastos = self.bd.obtener_gastos()
-            if not gastos:
-                print(f"\n{Fore.YELLOW}No hay gastos registrados para visualizar.")
-                return
+            opcion = self.obtener_entrada_usuario("Seleccione una opción (1-3): ", lambda x: x in ["1", "2", "3"], "Opción inválida.")
+            periodo = {"1": "dia", "2": "semana", "3": "mes"}[opcion]
 
-            # Preparar datos para el gráfico
-            fechas = []
-            montos = []
-            categorias = {}
+            print(f"{Fore.YELLOW}1. Mostrar en una ventana")
+            print(f"{Fore.YELLOW}2. Guardar como PNG (en segundo plano)")
+            print(f"{Fore.YELLOW}3. Guardar como SVG (en segundo plano)")
+            destino = self.obtener_entrada_usuario("Seleccione una opción (1-3): ", lambda x: x in ["1", "2", "3"], "Opción inválida.")
 
-            for gasto in gastos:
-                fecha_obj = datetime.strptime(gasto[4], '%Y-%m-%d %H:%M:%S.%f' if '.' in gasto[4] else '%Y-%m-%d %H:%M:%S')
-                fechas.append(fecha_obj)
-                montos.append(gasto[2])
-
-                # Agrupar por categoría para el gráfico de pastel
-                categoria = gasto[3]
-                if categoria in categorias:
-                    categorias[categoria] += gasto[2]
-                else:
-                    categorias[categoria] = gasto[2]
+            if self.bd.obtener_resumen_gastos()[0] == 0:
+                print(f"\n{Fore.YELLOW}No hay gastos registrados para visualizar.")
+                return
 
-            # Crear figura con dos subplots
-            fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 7))
+            # Los gastos llegan agrupados desde SQLite: un punto por periodo, no por gasto
+            def preparar_dibujo():
+                periodos = self.bd.obtener_gastos_por_periodo(periodo)
+                categorias = self.bd.obtener_gastos_agrupados_por_categoria()
+                return lambda figura: dibujar_graficos_gastos(figura, periodos, categorias, periodo)
 
-            # Gráfico de línea: gastos a lo largo del tiempo
-            ax1.plot(fechas, montos, marker='o', color='blue')
-            ax1.set_title('Gastos a lo largo del tiempo', fontsize=14)
-            ax1.set_xlabel('Fecha', fontsize=12)
-            ax1.set_ylabel('Monto ($)', fontsize=12)
-            ax1.grid(True)
+            if destino == "1":
+                import matplotlib.pyplot as plt
 
-            # Gráfico de pastel: distribución por categoría
-            labels = list(categorias.keys())
-            sizes = list(categorias.values())
-            ax2.pie(sizes, labels=labels, autopct='%1.1f%%', startangle=90)
-            ax2.axis('equal')
-            ax2.set_title('Distribución de gastos por categoría', fontsize=14)
+                figura = plt.figure(figsize=(15, 7))
+                preparar_dibujo()(figura)
+                plt.show()
+                return
 
-            plt.tight_layout()
-            plt.show()
+            formato = "png" if destino == "2" else "svg"
+            clave = ("gastos", periodo, self.bd.obtener_version_datos("gastos"))
+            futuro = self.renderizador.renderizar(clave, formato, preparar_dibujo)
+            if futuro.done() and not futuro.exception():
+                print(f"\n{Fore.GREEN}✅ Los datos no han cambiado; gráfico disponible en '{futuro.result()}'")
+                return
 
+            print(f"\n{Fore.CYAN}Generando el gráfico en segundo plano; puede seguir usando el menú.")
+            futuro.add_done_callback(self.notificar_grafico)
         except Exception as e:
             print(f"\n{Fore.RED}❌ Error al visualizar los gastos: {e}")
 
+    def notificar_grafico(self, futuro):
+        """Informa el resultado de un gráfico generado en segundo plano"""
+        if futuro.exception():
+            print(f"\n{Fore.RED}❌ Error al generar el gráfico: {futuro.exception()}")
+        else:
+            print(f"\n{Fore.GREEN}✅ Gráfico guardado en '{os.path.abspath(futuro.result())}'")
+
     def generar_reporte_presupuesto(self):
         """Genera un reporte detallado del presupuesto"""
         print(f"\n{Fore.GREEN}{Style.BRIGHT}--- REPORTE DE PRESUPUESTO ---")
         try:
-            # Obtener todos los artículos
-            articulos = self.bd.obtener_todos_articulos()
-            gastos = self.bd.obtener_gastos()
+            # Las agregaciones se calculan en SQLite; solo regresan filas de resumen
+            total_articulos, total_presupuesto = self.bd.obtener_resumen_articulos()
+            numero_gastos, total_gastos = self.bd.obtener_resumen_gastos()
 
-            if not articulos and not gastos:
+            if not total_articulos and not numero_gastos:
                 print(f"\n{Fore.YELLOW}No hay artículos ni gastos registrados en el sistema.")
                 return
 
-            # Calcular estadísticas generales de artículos
-            total_articulos = len(articulos)
-            total_presupuesto = sum(articulo[3] * articulo[4] for articulo in articulos) if articulos else 0
+            # Calcular estadísticas generales
             precio_promedio = total_presupuesto / total_articulos if total_articulos > 0 else 0
-
-            # Calcular estadísticas generales de gastos
-            total_gastos = sum(gasto[2] for gasto in gastos) if gastos else 0
             balance = total_presupuesto - total_gastos
 
             # Mostrar estadísticas generales
@@ -602,49 +1470,25 @@ class AplicacionPresupuesto:
             print(f"{Fore.CYAN}Balance (Presupuesto - Gastos): ${balance:.2f}")
 
             # Análisis de artículos por categoría
-            if articulos:
-                categorias_articulos = {}
-                for articulo in articulos:
-                    categoria = articulo[2]
-                    if categoria not in categorias_articulos:
-                        categorias_articulos[categoria] = []
-                    categorias_articulos[categoria].append(articulo)
-
+            if total_articulos:
                 print(f"\n{Fore.CYAN}{Style.BRIGHT}ANÁLISIS DE ARTÍCULOS POR CATEGORÍA:")
-                datos_categoria = []
-                for categoria, arts in categorias_articulos.items():
-                    total_categoria = sum(art[3] * art[4] for art in arts)
-                    porcentaje = (total_categoria / total_presupuesto * 100) if total_presupuesto > 0 else 0
-                    datos_categoria.append([
-                        categoria,
-                        len(arts),
-                        f"${total_categoria:.2f}",
-                        f"{porcentaje:.2f}%"
-                    ])
+                datos_categoria = [
+                    [categoria, cantidad, f"${total_categoria:.2f}", f"{porcentaje:.2f}%"]
+                    for categoria, cantidad, total_categoria, porcentaje
+                    in self.bd.obtener_articulos_agrupados_por_categoria()
+                ]
 
                 headers_categoria = ["Categoría", "Artículos", "Total", "% del Presupuesto"]
                 print(tabulate(datos_categoria, headers=headers_categoria, tablefmt="fancy_grid"))
 
             # Análisis de gastos por categoría
-            if gastos:
-                categorias_gastos = {}
-                for gasto in gastos:
-                    categoria = gasto[3]
-                    if categoria not in categorias_gastos:
-                        categorias_gastos[categoria] = []
-                    categorias_gastos[categoria].append(gasto)
-
+            if numero_gastos:
                 print(f"\n{Fore.CYAN}{Style.BRIGHT}ANÁLISIS DE GASTOS POR CATEGORÍA:")
-                datos_gastos = []
-                for categoria, gsts in categorias_gastos.items():
-                    total_categoria = sum(g[2] for g in gsts)
-                    porcentaje = (total_categoria / total_gastos * 100) if total_gastos > 0 else 0
-                    datos_gastos.append([
-                        categoria,
-                        len(gsts),
-                        f"${total_categoria:.2f}",
-                        f"{porcentaje:.2f}%"
-                    ])
+                datos_gastos = [
+                    [categoria, cantidad, f"${total_categoria:.2f}", f"{porcentaje:.2f}%"]
+                    for categoria, cantidad, total_categoria, porcentaje
+                    in self.bd.obtener_gastos_agrupados_por_categoria()
+                ]
 
                 headers_gastos = ["Categoría", "Gastos", "Total", "% de Gastos"]
                 print(tabulate(datos_gastos, headers=headers_gastos, tablefmt="fancy_grid"))
@@ -652,10 +1496,80 @@ class AplicacionPresupuesto:
         except Exception as e:
             print(f"\n{Fore.RED}❌ Error al generar el reporte: {e}")
 
+    def importar_datos(self):
+        """Importa artículos o gastos de forma masiva desde un archivo CSV o JSON Lines"""
+        print(f"\n{Fore.GREEN}{Style.BRIGHT}--- IMPORTAR DATOS ---")
+        print(f"{Fore.YELLOW}1. Importar artículos")
+        print(f"{Fore.YELLOW}2. Importar gastos")
+
+        try:
+            opcion = self.obtener_entrada_usuario("Seleccione una opción (1-2): ", lambda x: x in ["1", "2"], "Opción inválida.")
+            tabla = "articulos" if opcion == "1" else "gastos"
+            print(f"{Fore.CYAN}Columnas esperadas: {', '.join(c for c in COLUMNAS_IMPORTACION[tabla] if c != 'actualizado_en')}")
+
+            ruta_archivo = self.obtener_entrada_usuario("Ruta del archivo (.csv o .jsonl): ", os.path.isfile, "El archivo no existe.")
+            importadas, errores, segundos = self.bd.importar_filas(tabla, leer_filas_archivo(ruta_archivo))
+
+            filas_por_segundo = importadas / segundos if segundos > 0 else importadas
+            print(f"\n{Fore.GREEN}✅ {importadas:,} filas importadas en {segundos:.2f}s ({filas_por_segundo:,.0f} filas/s)")
+            if errores:
+                print(f"{Fore.YELLOW}{len(errores):,} filas rechazadas. Primeros errores:")
+                for numero_fila, mensaje in errores[:10]:
+                    print(f"{Fore.YELLOW}  Fila {numero_fila}: {mensaje}")
+        except Exception as e:
+            print(f"\n{Fore.RED}❌ Error durante la importación: {e}")
+
+    def verificar_resumen(self):
+        """Verifica la tabla de resumen contra los datos y la reconstruye si hay diferencias"""
+        print(f"\n{Fore.GREEN}{Style.BRIGHT}--- VERIFICAR RESUMEN DE PRESUPUESTO ---")
+        try:
+            diferencias = self.bd.verificar_resumen()
+            if not diferencias:
+                print(f"\n{Fore.GREEN}✅ El resumen es consistente con los artículos y gastos registrados.")
+                return
+
+            datos_tabla = [
+                [tipo, categoria, guardado[0], f"${guardado[1]:.2f}", calculado[0], f"${calculado[1]:.2f}"]
+                for tipo, categoria, guardado, calculado in diferencias
+            ]
+            headers = ["Tipo", "Categoría", "Elementos (resumen)", "Total (resumen)", "Elementos (real)", "Total (real)"]
+            print(tabulate(datos_tabla, headers=headers, tablefmt="fancy_grid"))
+            print(f"\n{Fore.YELLOW}Se encontraron {len(diferencias)} diferencias; el resumen fue reconstruido.")
+        except Exception as e:
+            print(f"\n{Fore.RED}❌ Error al verificar el resumen: {e}")
+
+    def exportar_instantanea(self):
+        """Agrega a la instantánea columnar las filas nuevas o modificadas y muestra su resumen"""
+        print(f"\n{Fore.GREEN}{Style.BRIGHT}--- EXPORTAR INSTANTÁNEA COLUMNAR ---")
+        try:
+            # Importación diferida: NumPy (y pyarrow si está instalado) solo se cargan aquí
+            import instantanea
+
+            directorio = "instantanea"
+            inicio = time.perf_counter()
+            exportadas = instantanea.exportar_instantanea(self.bd, directorio)
+            segundos = time.perf_counter() - inicio
+
+            formato = instantanea.leer_manifiesto(directorio)["formato"]
+            print(f"\n{Fore.GREEN}✅ Instantánea actualizada en '{os.path.abspath(directorio)}' (formato {formato}) en {segundos:.2f}s")
+            for tabla, filas in exportadas.items():
+                print(f"{Fore.CYAN}  {tabla}: {filas:,} filas nuevas o modificadas")
+
+            # El resumen se calcula sobre la instantánea mapeada en memoria, sin consultar SQLite
+            for tabla, titulo in (("articulos", "ARTÍCULOS"), ("gastos", "GASTOS")):
+                filas = instantanea.resumen_instantanea(directorio, tabla)
+                if filas:
+                    print(f"\n{Fore.CYAN}{Style.BRIGHT}{titulo} POR CATEGORÍA (desde la instantánea):")
+                    datos_tabla = [[categoria, cantidad, f"${total:.2f}", f"{porcentaje:.2f}%"]
+                                   for categoria, cantidad, total, porcentaje in filas]
+                    print(tabulate(datos_tabla, headers=["Categoría", "Elementos", "Total", "%"], tablefmt="fancy_grid"))
+        except Exception as e:
+            print(f"\n{Fore.RED}❌ Error al exportar la instantánea: {e}")
+
     def salir_aplicacion(self):
         """Sale de la aplicación"""
         self.ejecutando = False
-        self.bd.cerrar()
+        self.cerrar()
         print(f"\n{Fore.CYAN}¡Gracias por usar el Sistema de Gestión de Presupuesto!")
 
     def ejecutar(self):
@@ -664,19 +1578,88 @@ class AplicacionPresupuesto:
 
         while self.ejecutando:
             self.mostrar_menu()
-            eleccion = self.obtener_entrada_usuario("Ingrese una opción (1-12): ",lambda x: x in self.opciones_menu.keys(),"Opción inválida. Por favor, ingrese un número del 1 al 12.")
+            eleccion = self.obtener_entrada_usuario("Ingrese una opción (1-15): ",lambda x: x in self.opciones_menu.keys(),"Opción inválida. Por favor, ingrese un número del 1 al 15.")
 
             # Ejecuta la opción seleccionada
             self.opciones_menu[eleccion]()
 
 
+def perfilar_arranque(presupuesto_ms=PRESUPUESTO_ARRANQUE_MS):
+    """
+    Mide el arranque en frío en procesos nuevos y el costo de cada módulo e inicialización.
+    Regresa True si el arranque queda dentro del presupuesto.
+    """
+    import subprocess
+
+    directorio = os.path.dirname(os.path.abspath(__file__))
+    modulo = os.path.splitext(os.path.basename(__file__))[0]
+
+    # Tiempo de importación por módulo (python -X importtime) en un proceso nuevo
+    resultado = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+                               cwd=directorio, capture_output=True, text=True, check=True)
+    importaciones = []
+    pendientes = []
+    for linea in resultado.stderr.splitlines():
+        partes = linea.split("|")
+        if len(partes) != 3 or not partes[1].strip().isdigit():
+            continue
+        nombre = partes[2].rstrip()[1:]
+        profundidad = (len(nombre) - len(nombre.lstrip())) // 2
+        # importtime imprime cada módulo después de sus dependencias: las de primer nivel
+        # que preceden a la línea de la aplicación son sus importaciones directas
+        if profundidad == 1:
+            pendientes.append((nombre.strip(), int(partes[1]) / 1000))
+        elif profundidad == 0:
+            if nombre == modulo:
+                importaciones = sorted(pendientes, key=lambda importacion: importacion[1], reverse=True)
+                importaciones.append((f"{modulo} (total)", int(partes[1]) / 1000))
+            pendientes = []
+
+    # Arranque en frío completo: intérprete, importaciones, aplicación y menú
+    codigo = f"import {modulo}; {modulo}.AplicacionPresupuesto().mostrar_menu()"
+    inicio = time.perf_counter()
+    subprocess.run([sys.executable, "-c", codigo], cwd=directorio, stdout=subprocess.DEVNULL, check=True)
+    arranque_ms = (time.perf_counter() - inicio) * 1000
+
+    # Costos diferidos: se pagan la primera vez que se usa la función correspondiente
+    diferidos = []
+    for nombre in MODULOS_DIFERIDOS:
+        inicio = time.perf_counter()
+        __import__(nombre)
+        diferidos.append((f"import {nombre}", (time.perf_counter() - inicio) * 1000))
+    inicio = time.perf_counter()
+    BaseDeDatos(":memory:").cerrar()
+    diferidos.append(("BaseDeDatos() (esquema, FTS5, triggers)", (time.perf_counter() - inicio) * 1000))
+
+    print(f"{Fore.CYAN}{Style.BRIGHT}IMPORTACIONES AL ARRANCAR (acumulado por módulo):")
+    print(tabulate([[nombre, f"{ms:.1f} ms"] for nombre, ms in importaciones], headers=["Módulo", "Tiempo"], tablefmt="fancy_grid"))
+    print(f"\n{Fore.CYAN}{Style.BRIGHT}DIFERIDO HASTA EL PRIMER USO:")
+    print(tabulate([[nombre, f"{ms:.1f} ms"] for nombre, ms in diferidos], headers=["Paso", "Tiempo"], tablefmt="fancy_grid"))
+
+    dentro = arranque_ms <= presupuesto_ms
+    color = Fore.GREEN if dentro else Fore.RED
+    print(f"\n{color}{Style.BRIGHT}Arranque en frío hasta el menú: {arranque_ms:.1f} ms (presupuesto: {presupuesto_ms} ms)")
+    return dentro
+
+
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Sistema de Gestión de Presupuesto")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="mide el tiempo de arranque por módulo y termina con error si excede el presupuesto")
+    parser.add_argument("--presupuesto-ms", type=int, default=PRESUPUESTO_ARRANQUE_MS,
+                        help=f"presupuesto de arranque en frío en milisegundos (por defecto {PRESUPUESTO_ARRANQUE_MS})")
+    argumentos = parser.parse_args()
+    if argumentos.profile_startup:
+        sys.exit(0 if perfilar_arranque(argumentos.presupuesto_ms) else 1)
+
     app = AplicacionPresupuesto()
     try:
         app.ejecutar()
     except KeyboardInterrupt:
         print(f"\n\n{Fore.YELLOW}Programa interrumpido por el usuario.")
-        app.bd.cerrar()
+        app.cerrar()
     except Exception as e:
         print(f"\n{Fore.RED}❌ Error inesperado: {str(e)}")
-        app.bd.cerrar()
+        app.cerrar()
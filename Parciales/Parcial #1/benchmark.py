@@ -0,0 +1,323 @@
+"""
+Benchmarks del Sistema de Gestión de Presupuesto.
+
+Genera bases de datos temporales con datos sintéticos y compara el
+rendimiento de las distintas rutas de la aplicación.
+
+Uso:
+    python benchmark.py                 # 10k, 100k y 1M filas
+    python benchmark.py 10000 50000     # tamaños personalizados
+    python benchmark.py --concurrencia 8 16 500   # escritores, lectores y operaciones por hilo
+"""
+import csv
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+from app import BaseDeDatos, PoolConexiones, leer_filas_archivo
+
+CATEGORIAS = ["Alimentos", "Transporte", "Servicios", "Electrónica", "Muebles",
+              "Salud", "Educación", "Entretenimiento", "Ropa", "Hogar"]
+TAMANOS_POR_DEFECTO = [10_000, 100_000, 1_000_000]
+
+
+def poblar_base_de_datos(bd, filas):
+    """Inserta `filas` artículos y `filas` gastos sintéticos en una sola transacción"""
+    aleatorio = random.Random(42)
+    inicio = datetime(2020, 1, 1)
+    articulos = (
+        (f"Artículo {i}", aleatorio.choice(CATEGORIAS), aleatorio.randint(1, 20),
+         round(aleatorio.uniform(1, 500), 2), "", inicio)
+        for i in range(filas)
+    )
+    gastos = (
+        (f"Gasto {i}", round(aleatorio.uniform(1, 300), 2), aleatorio.choice(CATEGORIAS),
+         inicio + timedelta(minutes=i))
+        for i in range(filas)
+    )
+    bd.cursor.executemany('''
+        INSERT INTO articulos (nombre, categoria, cantidad, precio_unitario, descripcion, actualizado_en)
+        VALUES (?, ?, ?, ?, ?, ?)
+    ''', articulos)
+    bd.cursor.executemany('INSERT INTO gastos (descripcion, monto, categoria, fecha) VALUES (?, ?, ?, ?)', gastos)
+    bd.conexion.commit()
+
+
+def medir(funcion, *args):
+    """Ejecuta la función y regresa (segundos, resultado)"""
+    inicio = time.perf_counter()
+    resultado = funcion(*args)
+    return time.perf_counter() - inicio, resultado
+
+
+# --------------------- REPORTE ---------------------
+def reporte_en_python(bd):
+    """Ruta original: trae todas las filas y agrupa con diccionarios de listas"""
+    articulos = bd.obtener_todos_articulos()
+    gastos = bd.obtener_gastos()
+    total_presupuesto = sum(articulo[3] * articulo[4] for articulo in articulos)
+    total_gastos = sum(gasto[2] for gasto in gastos)
+
+    categorias_articulos = {}
+    for articulo in articulos:
+        categorias_articulos.setdefault(articulo[2], []).append(articulo)
+    por_categoria_articulos = {
+        categoria: sum(art[3] * art[4] for art in arts)
+        for categoria, arts in categorias_articulos.items()
+    }
+
+    categorias_gastos = {}
+    for gasto in gastos:
+        categorias_gastos.setdefault(gasto[3], []).append(gasto)
+    por_categoria_gastos = {
+        categoria: sum(g[2] for g in gsts)
+        for categoria, gsts in categorias_gastos.items()
+    }
+    return total_presupuesto, total_gastos, por_categoria_articulos, por_categoria_gastos
+
+
+def reporte_en_sql(bd):
+    """Ruta nueva: lee la tabla de resumen por categoría mantenida por triggers"""
+    _, total_presupuesto = bd.obtener_resumen_articulos()
+    _, total_gastos = bd.obtener_resumen_gastos()
+    por_categoria_articulos = {fila[0]: fila[2] for fila in bd.obtener_articulos_agrupados_por_categoria()}
+    por_categoria_gastos = {fila[0]: fila[2] for fila in bd.obtener_gastos_agrupados_por_categoria()}
+    return total_presupuesto, total_gastos, por_categoria_articulos, por_categoria_gastos
+
+
+def benchmark_reporte(bd, filas):
+    """Compara el reporte agregado en Python contra el resumen en SQLite"""
+    tiempo_python, resultado_python = medir(reporte_en_python, bd)
+    tiempo_sql, resultado_sql = medir(reporte_en_sql, bd)
+    assert abs(resultado_python[0] - resultado_sql[0]) < 1e-3 * max(1, resultado_sql[0])
+    assert abs(resultado_python[1] - resultado_sql[1]) < 1e-3 * max(1, resultado_sql[1])
+    print(f"[reporte] {filas:>9,} filas | Python: {tiempo_python:8.3f}s | "
+          f"SQL: {tiempo_sql:8.3f}s | x{tiempo_python / max(tiempo_sql, 1e-9):.1f}")
+
+
+# --------------------- BÚSQUEDA ---------------------
+def benchmark_busqueda(bd, filas, repeticiones=50):
+    """Compara la latencia de búsqueda con FTS5 contra LIKE '%x%'"""
+    terminos = [str(numero) for numero in random.Random(7).sample(range(filas), repeticiones)]
+    tiempo_like, _ = medir(lambda: [bd.buscar_articulos_con_like(t, "nombre", limite=None) for t in terminos])
+    tiempo_fts, _ = medir(lambda: [bd.buscar_articulos(t, "nombre", limite=20) for t in terminos])
+    print(f"[búsqueda] {filas:>9,} filas | LIKE: {tiempo_like / repeticiones * 1000:8.2f}ms | "
+          f"FTS5: {tiempo_fts / repeticiones * 1000:8.2f}ms | FTS5 disponible: {bd.fts_disponible}")
+
+    # Término que coincide con todas las filas: el menú cuenta y trae solo la primera página
+    tiempo_like, _ = medir(bd.buscar_articulos_con_like, "Artículo", "nombre", None)
+    tiempo_menu, _ = medir(lambda: (bd.contar_articulos_encontrados("Artículo", "nombre"),
+                                    bd.buscar_articulos_por_nombre("Artículo")))
+    print(f"[búsqueda] {filas:>9,} filas | 'Artículo' LIKE completo: {tiempo_like * 1000:8.2f}ms | "
+          f"menú (conteo + 1 página): {tiempo_menu * 1000:8.2f}ms")
+
+
+# --------------------- GRÁFICA DE GASTOS ---------------------
+def serie_en_python(bd):
+    """Ruta original: un punto por gasto, parseando cada fecha con strptime"""
+    fechas, montos = [], []
+    for gasto in bd.obtener_gastos():
+        fechas.append(datetime.strptime(gasto[4], '%Y-%m-%d %H:%M:%S.%f' if '.' in gasto[4] else '%Y-%m-%d %H:%M:%S'))
+        montos.append(gasto[2])
+    return fechas, montos
+
+
+def benchmark_grafica(bd, filas):
+    """Compara la preparación de la serie por gasto contra el agrupado diario en SQLite"""
+    tiempo_python, (fechas, _) = medir(serie_en_python, bd)
+    tiempo_sql, periodos = medir(bd.obtener_gastos_por_periodo, "dia")
+    print(f"[gráfica] {filas:>9,} filas | por gasto: {tiempo_python:8.3f}s ({len(fechas):,} puntos) | "
+          f"por día: {tiempo_sql:8.3f}s ({len(periodos):,} puntos)")
+
+
+# --------------------- IMPORTACIÓN ---------------------
+def benchmark_importacion(directorio, filas):
+    """Mide la importación masiva de un CSV de gastos con `filas` filas"""
+    ruta_csv = os.path.join(directorio, "gastos.csv")
+    aleatorio = random.Random(3)
+    with open(ruta_csv, "w", newline="", encoding="utf-8") as archivo:
+        escritor = csv.writer(archivo)
+        escritor.writerow(["descripcion", "monto", "categoria", "fecha"])
+        for i in range(filas):
+            escritor.writerow([f"Gasto {i}", round(aleatorio.uniform(1, 300), 2),
+                               aleatorio.choice(CATEGORIAS), f"2024-01-{i % 28 + 1:02d} 12:00:00"])
+
+    bd = BaseDeDatos(os.path.join(directorio, "importacion.db"))
+    try:
+        importadas, errores, segundos = bd.importar_filas("gastos", leer_filas_archivo(ruta_csv))
+    finally:
+        bd.cerrar()
+    print(f"[importación] {filas:>9,} filas | {segundos:8.3f}s | "
+          f"{importadas / max(segundos, 1e-9):,.0f} filas/s | rechazadas: {len(errores)}")
+
+    # Un lote sin filas válidas no debe cortar la importación de los lotes siguientes
+    invalidas = [{"descripcion": "", "monto": "1", "categoria": "Hogar"}] * 5
+    validas = [{"descripcion": f"Gasto {i}", "monto": "1", "categoria": "Hogar"} for i in range(5)]
+    bd = BaseDeDatos(os.path.join(directorio, "importacion_errores.db"))
+    try:
+        importadas, errores, _ = bd.importar_filas("gastos", invalidas + validas, tamano_lote=3)
+    finally:
+        bd.cerrar()
+    assert (importadas, len(errores)) == (5, 5), (importadas, errores)
+
+
+# --------------------- OPERACIONES CRUD ---------------------
+def medir_en_bloque(bloque, funcion):
+    """Como medir, pero el tiempo incluye la salida del bloque (el COMMIT de la transacción agrupada)"""
+    inicio = time.perf_counter()
+    with bloque():
+        resultado = funcion()
+    return time.perf_counter() - inicio, resultado
+
+
+def medir_operaciones(bd, operaciones, agrupar):
+    """Mide operaciones/s de inserción, búsqueda por ID, actualización y eliminación de artículos"""
+    from contextlib import nullcontext
+
+    resultados = {}
+    bloque = bd.transaccion if agrupar else nullcontext
+
+    tiempo, ids = medir_en_bloque(bloque, lambda: [
+        bd.insertar_articulo(f"Artículo {i}", CATEGORIAS[i % len(CATEGORIAS)], 1, 10.0, "")
+        for i in range(operaciones)
+    ])
+    resultados["inserción"] = tiempo
+
+    tiempo, _ = medir(lambda: [bd.obtener_articulo_por_id(id_articulo) for id_articulo in ids])
+    resultados["búsqueda"] = tiempo
+
+    tiempo, _ = medir_en_bloque(bloque, lambda: [bd.actualizar_articulo(id_articulo, "Editado", "Hogar", 2, 20.0, "")
+                                                 for id_articulo in ids])
+    resultados["actualización"] = tiempo
+
+    tiempo, _ = medir_en_bloque(bloque, lambda: [bd.eliminar_articulo(id_articulo) for id_articulo in ids])
+    resultados["eliminación"] = tiempo
+
+    return {operacion: operaciones / max(segundos, 1e-9) for operacion, segundos in resultados.items()}
+
+
+def benchmark_operaciones(directorio, operaciones):
+    """Compara el throughput CRUD sin ajustes, con PRAGMA de rendimiento y con transacciones agrupadas"""
+    configuraciones = [
+        ("sin ajustes, commit por operación", False, False),
+        ("WAL + PRAGMA, commit por operación", True, False),
+        ("WAL + PRAGMA, transacción agrupada", True, True),
+    ]
+    for nombre, optimizar, agrupar in configuraciones:
+        bd = BaseDeDatos(os.path.join(directorio, f"operaciones_{optimizar}_{agrupar}.db"), optimizar=optimizar)
+        try:
+            resultado = medir_operaciones(bd, operaciones, agrupar)
+        finally:
+            bd.cerrar()
+        detalle = " | ".join(f"{operacion}: {valor:>10,.0f}/s" for operacion, valor in resultado.items())
+        print(f"[operaciones] {operaciones:>7,} ops | {nombre:<36} | {detalle}")
+
+
+# --------------------- CONCURRENCIA ---------------------
+def percentiles(latencias):
+    """Regresa (p50, p95, p99) en milisegundos"""
+    if len(latencias) < 2:
+        return (latencias[0] * 1000,) * 3 if latencias else (0, 0, 0)
+    cortes = statistics.quantiles(latencias, n=100)
+    return cortes[49] * 1000, cortes[94] * 1000, cortes[98] * 1000
+
+
+def ejecutar_hilos(escritor, lector, escritores, lectores, operaciones):
+    """Lanza los hilos escritores y lectores y regresa sus latencias y errores"""
+    latencias = {"escritura": [], "lectura": []}
+    errores = []
+    candado = threading.Lock()
+
+    def trabajar(tipo, operacion):
+        propias = []
+        try:
+            for i in range(operaciones):
+                inicio = time.perf_counter()
+                if operacion(i) is None:
+                    errores.append(tipo)
+                propias.append(time.perf_counter() - inicio)
+        except Exception as e:
+            errores.append(f"{tipo}: {e}")
+        with candado:
+            latencias[tipo].extend(propias)
+
+    hilos = [threading.Thread(target=trabajar, args=("escritura", escritor)) for _ in range(escritores)]
+    hilos += [threading.Thread(target=trabajar, args=("lectura", lector)) for _ in range(lectores)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    return latencias, errores
+
+
+def benchmark_concurrencia(directorio, escritores=4, lectores=8, operaciones=200):
+    """Prueba de estrés: escritores y lectores simultáneos sobre la misma base de datos"""
+    ruta = os.path.join(directorio, "concurrencia.db")
+    BaseDeDatos(ruta).cerrar()
+
+    # Conexiones independientes por hilo, como varios usuarios con la aplicación abierta
+    conexiones = threading.local()
+
+    def conexion_propia():
+        if not hasattr(conexiones, "bd"):
+            conexiones.bd = BaseDeDatos(ruta)
+        return conexiones.bd
+
+    independientes = ejecutar_hilos(
+        lambda i: conexion_propia().registrar_gasto(f"Gasto {i}", 10.0, CATEGORIAS[i % len(CATEGORIAS)]),
+        lambda i: conexion_propia().obtener_pagina_gastos(),
+        escritores, lectores, operaciones
+    )
+
+    # Pool de conexiones: lectores en paralelo y un solo escritor a la vez
+    pool = PoolConexiones(ruta, lectores=lectores)
+
+    def escribir_con_pool(i):
+        with pool.escritura() as bd:
+            return bd.registrar_gasto(f"Gasto {i}", 10.0, CATEGORIAS[i % len(CATEGORIAS)])
+
+    def leer_con_pool(i):
+        with pool.lectura() as bd:
+            return bd.obtener_pagina_gastos()
+
+    try:
+        con_pool = ejecutar_hilos(escribir_con_pool, leer_con_pool, escritores, lectores, operaciones)
+    finally:
+        pool.cerrar()
+
+    for nombre, (latencias, errores) in (("conexiones independientes", independientes), ("pool", con_pool)):
+        for tipo, valores in latencias.items():
+            p50, p95, p99 = percentiles(valores)
+            print(f"[concurrencia] {nombre:<25} | {tipo:<9} x{len(valores):>5} | "
+                  f"p50: {p50:7.2f}ms | p95: {p95:7.2f}ms | p99: {p99:7.2f}ms")
+        print(f"[concurrencia] {nombre:<25} | errores: {len(errores)}")
+
+
+def ejecutar(tamanos):
+    """Ejecuta todos los benchmarks para cada tamaño de tabla"""
+    for filas in tamanos:
+        with tempfile.TemporaryDirectory() as directorio:
+            bd = BaseDeDatos(os.path.join(directorio, "benchmark.db"))
+            try:
+                poblar_base_de_datos(bd, filas)
+                benchmark_reporte(bd, filas)
+                benchmark_busqueda(bd, filas)
+                benchmark_grafica(bd, filas)
+            finally:
+                bd.cerrar()
+            benchmark_importacion(directorio, filas)
+            benchmark_operaciones(directorio, min(filas, 5_000))
+            benchmark_concurrencia(directorio)
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--concurrencia"]:
+        with tempfile.TemporaryDirectory() as directorio:
+            benchmark_concurrencia(directorio, *[int(valor) for valor in sys.argv[2:5]])
+    else:
+        ejecutar([int(valor) for valor in sys.argv[1:]] or TAMANOS_POR_DEFECTO)
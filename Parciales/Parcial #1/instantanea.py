@@ -0,0 +1,256 @@
+"""
+Instantáneas columnares de artículos y gastos para análisis.
+
+Con pyarrow cada exportación escribe un archivo Arrow IPC (.arrow); sin pyarrow,
+un directorio por exportación con un archivo .npy por columna numérica y, por
+columna de texto, sus bytes UTF-8 seguidos (.utf8) con la posición de inicio de
+cada valor (.offsets.npy), el mismo esquema que usa Arrow para el texto. Ambos
+formatos se abren con memory mapping, sin pasar por SQLite. Sin copia a memoria
+quedan las columnas numéricas, solo cuando la tabla tiene una sola parte; el
+texto se decodifica a arreglos de str y, con varias partes, las columnas se
+combinan en arreglos nuevos.
+
+La exportación es incremental: cada ejecución agrega una parte nueva solo con las
+filas nuevas o modificadas desde la anterior (artículos por (actualizado_en, id),
+gastos por id). Las eliminaciones no se reflejan; para una instantánea exacta,
+borre el directorio y exporte de nuevo.
+"""
+import json
+import os
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+# Columnas de cada tabla con su tipo NumPy ("U" = texto)
+COLUMNAS_INSTANTANEA = {
+    "articulos": (("id", "i8"), ("nombre", "U"), ("categoria", "U"), ("cantidad", "f8"),
+                  ("precio_unitario", "f8"), ("descripcion", "U"), ("actualizado_en", "U")),
+    "gastos": (("id", "i8"), ("descripcion", "U"), ("monto", "f8"), ("categoria", "U"),
+               ("fecha_unix", "i8")),
+}
+
+# Columnas que marcan hasta dónde llegó la última exportación de cada tabla
+LLAVES_INCREMENTALES = {
+    "articulos": ("actualizado_en", "id"),
+    "gastos": ("id",),
+}
+
+# Valor que se suma por fila en el resumen por categoría
+VALORES_RESUMEN = {
+    "articulos": lambda columnas: columnas["cantidad"] * columnas["precio_unitario"],
+    "gastos": lambda columnas: columnas["monto"],
+}
+
+TIPOS_ARROW = {"i8": "int64", "f8": "float64", "U": "string"}
+
+
+def leer_manifiesto(directorio):
+    """Lee el manifiesto de la instantánea o crea uno vacío"""
+    ruta = os.path.join(directorio, "manifiesto.json")
+    if os.path.exists(ruta):
+        with open(ruta, encoding="utf-8") as archivo:
+            return json.load(archivo)
+    return {"formato": "arrow" if pa is not None else "npy", "tablas": {}}
+
+
+def guardar_manifiesto(directorio, manifiesto):
+    """Guarda el manifiesto de forma atómica para no dejar una instantánea a medias"""
+    ruta = os.path.join(directorio, "manifiesto.json")
+    with open(ruta + ".tmp", "w", encoding="utf-8") as archivo:
+        json.dump(manifiesto, archivo, ensure_ascii=False, indent=2)
+    os.replace(ruta + ".tmp", ruta)
+
+
+def convertir_lote(lote, columnas):
+    """Convierte un lote de filas de SQLite en listas por columna, con texto vacío en lugar de NULL"""
+    valores = list(zip(*lote))
+    return [
+        [str(valor) if valor is not None else "" for valor in valores[i]] if tipo == "U" else list(valores[i])
+        for i, (_, tipo) in enumerate(columnas)
+    ]
+
+
+def escribir_parte_arrow(ruta, columnas, lotes):
+    """
+    Escribe la parte como un solo record batch de un archivo Arrow IPC, para que sus columnas
+    numéricas se puedan leer sin copia. Los lotes se convierten a Arrow uno por uno y se
+    combinan al final, así que la parte ocupa memoria una vez en formato columnar.
+    """
+    esquema = pa.schema([(nombre, getattr(pa, TIPOS_ARROW[tipo])()) for nombre, tipo in columnas])
+    tabla = pa.Table.from_batches(
+        [pa.record_batch(convertir_lote(lote, columnas), schema=esquema) for lote in lotes], schema=esquema
+    ).combine_chunks()
+    with pa.OSFile(ruta, "wb") as destino, pa.ipc.new_file(destino, esquema) as escritor:
+        escritor.write_table(tabla, max_chunksize=max(tabla.num_rows, 1))
+
+
+def columna_arrow_a_numpy(columna):
+    """Regresa la columna sin copia si es numérica y de un solo bloque; si no, como una copia"""
+    if columna.num_chunks == 1 and pa.types.is_primitive(columna.type) and not columna.null_count:
+        return columna.chunk(0).to_numpy(zero_copy_only=True)
+    return columna.to_numpy()
+
+
+def escribir_parte_npy(ruta, columnas, lotes, total_filas):
+    """
+    Escribe cada columna numérica como un .npy preasignado que se llena lote por lote. El texto
+    se agrega lote por lote a {nombre}.utf8 y su .offsets.npy guarda total_filas + 1 posiciones:
+    el valor i ocupa los bytes offsets[i]:offsets[i + 1].
+    """
+    os.makedirs(ruta, exist_ok=True)
+    arreglos = []
+    archivos_texto = {}
+    for nombre, tipo in columnas:
+        if tipo == "U":
+            arreglo = np.lib.format.open_memmap(os.path.join(ruta, f"{nombre}.offsets.npy"), mode="w+",
+                                                dtype="i8", shape=(total_filas + 1,))
+            arreglo[0] = 0
+            archivos_texto[nombre] = open(os.path.join(ruta, f"{nombre}.utf8"), "wb")
+        else:
+            arreglo = np.lib.format.open_memmap(os.path.join(ruta, f"{nombre}.npy"), mode="w+",
+                                                dtype=tipo, shape=(total_filas,))
+        arreglos.append(arreglo)
+
+    posicion = 0
+    try:
+        for lote in lotes:
+            for (nombre, tipo), arreglo, valores in zip(columnas, arreglos, convertir_lote(lote, columnas)):
+                if tipo == "U":
+                    codificados = [valor.encode("utf-8") for valor in valores]
+                    arreglo[posicion + 1:posicion + len(lote) + 1] = (
+                        arreglo[posicion] + np.cumsum([len(valor) for valor in codificados])
+                    )
+                    archivos_texto[nombre].write(b"".join(codificados))
+                else:
+                    arreglo[posicion:posicion + len(lote)] = valores
+            posicion += len(lote)
+    finally:
+        for archivo in archivos_texto.values():
+            archivo.close()
+    for arreglo in arreglos:
+        arreglo.flush()
+
+
+def leer_columna_npy(ruta, nombre, tipo):
+    """Abre una columna numérica con memory mapping o decodifica una de texto en un arreglo de str"""
+    if tipo != "U":
+        return np.load(os.path.join(ruta, f"{nombre}.npy"), mmap_mode="r")
+    ruta_offsets = os.path.join(ruta, f"{nombre}.offsets.npy")
+    if not os.path.exists(ruta_offsets):
+        # Partes exportadas antes del formato UTF-8: texto de ancho fijo en un .npy
+        return np.load(os.path.join(ruta, f"{nombre}.npy"), mmap_mode="r")
+    offsets = np.load(ruta_offsets).tolist()
+    with open(os.path.join(ruta, f"{nombre}.utf8"), "rb") as archivo:
+        contenido = archivo.read()
+    valores = np.empty(len(offsets) - 1, dtype=object)
+    valores[:] = [contenido[inicio:fin].decode("utf-8") for inicio, fin in zip(offsets, offsets[1:])]
+    return valores
+
+
+def exportar_instantanea(bd, directorio="instantanea", tamano_lote=50_000):
+    """
+    Agrega a la instantánea las filas nuevas o modificadas de artículos y gastos.
+    Regresa un diccionario tabla -> filas exportadas en esta ejecución.
+    """
+    os.makedirs(directorio, exist_ok=True)
+    manifiesto = leer_manifiesto(directorio)
+    exportadas = {}
+
+    for tabla, columnas in COLUMNAS_INSTANTANEA.items():
+        estado = manifiesto["tablas"].setdefault(tabla, {"marca": None, "partes": []})
+        llaves = LLAVES_INCREMENTALES[tabla]
+        nombres = [nombre for nombre, _ in columnas]
+
+        filtro = ""
+        parametros = ()
+        if estado["marca"] is not None:
+            filtro = f"WHERE ({', '.join(llaves)}) > ({', '.join('?' * len(llaves))})"
+            parametros = tuple(estado["marca"])
+
+        # Cantidad de filas para preasignar las columnas
+        total_filas = bd.cursor.execute(f"SELECT COUNT(*) FROM {tabla} {filtro}", parametros).fetchone()[0]
+        exportadas[tabla] = total_filas
+        if not total_filas:
+            continue
+
+        indices_llave = [nombres.index(llave) for llave in llaves]
+        ultima_fila = []
+
+        def lotes():
+            for lote in bd.iterar_lotes(
+                f"SELECT {', '.join(nombres)} FROM {tabla} {filtro} ORDER BY {', '.join(llaves)} LIMIT {total_filas}",
+                parametros, tamano_lote
+            ):
+                ultima_fila[:] = lote[-1]
+                yield lote
+
+        nombre_parte = f"{tabla}_{len(estado['partes']) + 1:04d}"
+        if manifiesto["formato"] == "arrow":
+            nombre_parte += ".arrow"
+            escribir_parte_arrow(os.path.join(directorio, nombre_parte), columnas, lotes())
+        else:
+            escribir_parte_npy(os.path.join(directorio, nombre_parte), columnas, lotes(), total_filas)
+
+        estado["marca"] = [ultima_fila[i] for i in indices_llave]
+        estado["partes"].append(nombre_parte)
+        guardar_manifiesto(directorio, manifiesto)
+
+    return exportadas
+
+
+def cargar_instantanea(directorio, tabla):
+    """
+    Carga las columnas de una tabla como arreglos NumPy. Con una sola parte, las columnas
+    numéricas quedan respaldadas por memory mapping; el texto se decodifica a arreglos de str.
+    Con varias partes se combinan en arreglos nuevos y, en artículos, se conserva la versión
+    más reciente de cada id.
+    """
+    manifiesto = leer_manifiesto(directorio)
+    estado = manifiesto["tablas"].get(tabla)
+    if not estado or not estado["partes"]:
+        return None
+
+    partes = []
+    for nombre_parte in estado["partes"]:
+        ruta = os.path.join(directorio, nombre_parte)
+        if manifiesto["formato"] == "arrow":
+            if pa is None:
+                raise ImportError("La instantánea está en formato Arrow; instale pyarrow para cargarla")
+            datos = pa.ipc.open_file(pa.memory_map(ruta)).read_all()
+            partes.append({nombre: columna_arrow_a_numpy(datos.column(nombre)) for nombre in datos.column_names})
+        else:
+            partes.append({
+                nombre: leer_columna_npy(ruta, nombre, tipo) for nombre, tipo in COLUMNAS_INSTANTANEA[tabla]
+            })
+
+    if len(partes) == 1:
+        return partes[0]
+
+    columnas = {nombre: np.concatenate([parte[nombre] for parte in partes]) for nombre in partes[0]}
+    if tabla == "articulos":
+        # Las partes están en orden cronológico: la última aparición de cada id es la vigente
+        ids = columnas["id"]
+        _, primeras_invertidas = np.unique(ids[::-1], return_index=True)
+        vigentes = np.sort(len(ids) - 1 - primeras_invertidas)
+        columnas = {nombre: valores[vigentes] for nombre, valores in columnas.items()}
+    return columnas
+
+
+def resumen_instantanea(directorio, tabla):
+    """Calcula (categoría, elementos, total, porcentaje) por categoría a partir de la instantánea"""
+    columnas = cargar_instantanea(directorio, tabla)
+    if columnas is None or not len(columnas["id"]):
+        return []
+
+    categorias, inversas = np.unique(columnas["categoria"], return_inverse=True)
+    totales = np.bincount(inversas, weights=VALORES_RESUMEN[tabla](columnas))
+    elementos = np.bincount(inversas)
+    gran_total = totales.sum()
+    return [
+        (str(categoria), int(cantidad), float(total), float(total * 100.0 / gran_total) if gran_total else 0.0)
+        for categoria, cantidad, total in zip(categorias, elementos, totales)
+    ]
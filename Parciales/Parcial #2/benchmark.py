@@ -0,0 +1,447 @@
+"""
+Benchmarks de carga de la API de vacunación.
+
+Levanta la API con uvicorn en un proceso aparte y la consulta con varios
+clientes httpx locales (conexiones keep-alive) durante unos segundos.
+
+Uso:
+    python benchmark.py                 # 8 clientes, 5 segundos por escenario
+    python benchmark.py 16 10           # clientes y segundos personalizados
+    python benchmark.py --memoria 266 64   # almacén de NumPy vs modelos de pydantic (países, años)
+    python benchmark.py --lote 200         # un GET por año vs POST /vacunas/batch (repeticiones)
+    python benchmark.py --serializacion    # costo de serializar respuestas de 1 a 10k registros
+    python benchmark.py --trabajadores 1 2 4   # rendimiento del perfil de producción según trabajadores
+    python benchmark.py --metricas         # sobrecosto del middleware de métricas por petición
+    python benchmark.py --compresion       # tamaño y costo de gzip/brotli por petición vs precalculado
+    python benchmark.py --exportacion      # memoria de /exportar (flujo) vs una lista JSON completa
+"""
+import asyncio
+import csv
+import gzip
+import json
+import multiprocessing
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from typing import List
+
+import httpx
+from fastapi import FastAPI, HTTPException, Path
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from datos import ConjuntoVacunacion
+import main
+from main import (RegistroVacunacion, RegistroVacunacionPais, RespuestaSerializada, app, brotli,
+                  datos_vacunacion, orjson, serializar)
+from metricas import MiddlewareMetricas, RegistroMetricas
+
+# --------------------- APP ORIGINAL ---------------------
+# Réplica de los endpoints antes de precalcular las respuestas: construyen,
+# ordenan y validan los modelos de pydantic en cada petición.
+app_original = FastAPI()
+
+@app_original.get("/vacunas", response_model=List[RegistroVacunacion])
+async def obtener_todos_original():
+    return sorted([
+        RegistroVacunacion(anio=anio, cobertura=cobertura)
+        for anio, cobertura in datos_vacunacion.items()
+    ], key=lambda x: x.anio)
+
+@app_original.get("/vacunas/{anio}", response_model=RegistroVacunacion)
+async def obtener_por_anio_original(anio: int = Path(..., ge=1983, le=2018)):
+    if anio not in datos_vacunacion:
+        raise HTTPException(status_code=404, detail=f"No hay datos disponibles para el año {anio}")
+    return RegistroVacunacion(anio=anio, cobertura=datos_vacunacion[anio])
+
+
+# --------------------- DATOS SINTÉTICOS ---------------------
+def generar_csv_banco_mundial(ruta, paises, anios, anio_inicial=1960):
+    """Escribe un CSV con el formato de descarga masiva del Banco Mundial"""
+    aleatorio = random.Random(42)
+    columnas = [str(anio_inicial + i) for i in range(anios)]
+    with open(ruta, "w", encoding="utf-8", newline="") as archivo:
+        escritor = csv.writer(archivo, quoting=csv.QUOTE_ALL)
+        escritor.writerow(["Data Source", "World Development Indicators"])
+        escritor.writerow([])
+        escritor.writerow(["Last Updated Date", "2024-01-01"])
+        escritor.writerow([])
+        escritor.writerow(["Country Name", "Country Code", "Indicator Name", "Indicator Code"] + columnas + [""])
+        for i in range(paises):
+            # Los primeros años suelen venir vacíos, como en los datos reales
+            valores = ["" if j < aleatorio.randint(0, 25) else f"{aleatorio.uniform(40, 99):.0f}" for j in range(anios)]
+            codigo = chr(65 + i // 676 % 26) + chr(65 + i // 26 % 26) + chr(65 + i % 26)
+            escritor.writerow([f"País {i}", codigo, "Immunization, measles (% of children ages 12-23 months)",
+                               "SH.IMM.MEAS"] + valores + [""])
+
+
+# --------------------- SERVIDOR ---------------------
+def puerto_libre():
+    """Pide al sistema operativo un puerto TCP libre"""
+    with socket.socket() as conexion:
+        conexion.bind(("127.0.0.1", 0))
+        return conexion.getsockname()[1]
+
+
+def iniciar_servidor(aplicacion, puerto, trabajadores=None):
+    """
+    Lanza uvicorn en un proceso aparte y espera a que acepte conexiones.
+    Con `trabajadores`, lanza main.py con el perfil de producción en lugar de uvicorn directo.
+    """
+    if trabajadores is None:
+        comando = [sys.executable, "-m", "uvicorn", aplicacion, "--host", "127.0.0.1", "--port", str(puerto),
+                   "--log-level", "warning", "--no-access-log"]
+    else:
+        comando = [sys.executable, "main.py", "--produccion", "--puerto", str(puerto),
+                   "--trabajadores", str(trabajadores)]
+    proceso = subprocess.Popen(comando, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    limite = time.monotonic() + 15
+    while time.monotonic() < limite:
+        try:
+            httpx.get(f"http://127.0.0.1:{puerto}/vacunas/2018", timeout=1)
+            return proceso
+        except httpx.TransportError:
+            time.sleep(0.1)
+    proceso.terminate()
+    raise RuntimeError(f"El servidor {aplicacion} no respondió a tiempo")
+
+
+# --------------------- CARGA ---------------------
+def generar_carga(url_base, rutas, clientes, segundos, encabezados=None):
+    """Consulta las rutas en ciclo desde varios hilos y regresa (peticiones/s, errores)"""
+    completadas = [0] * clientes
+    errores = [0] * clientes
+    fin = time.monotonic() + segundos
+
+    def cliente(indice):
+        with httpx.Client(base_url=url_base, headers=encabezados) as sesion:
+            i = indice
+            while time.monotonic() < fin:
+                respuesta = sesion.get(rutas[i % len(rutas)])
+                if respuesta.status_code not in (200, 304):
+                    errores[indice] += 1
+                completadas[indice] += 1
+                i += 1
+
+    hilos = [threading.Thread(target=cliente, args=(i,)) for i in range(clientes)]
+    inicio = time.monotonic()
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    return sum(completadas) / (time.monotonic() - inicio), sum(errores)
+
+
+def generar_carga_procesos(url_base, rutas, procesos, clientes, segundos):
+    """Reparte la carga en varios procesos para que el cliente no sea el cuello de botella"""
+    with multiprocessing.Pool(procesos) as grupo:
+        resultados = grupo.starmap(generar_carga, [(url_base, rutas, clientes, segundos)] * procesos)
+    return sum(rps for rps, _ in resultados), sum(errores for _, errores in resultados)
+
+
+def benchmark_trabajadores(cantidades, clientes=4, segundos=5):
+    """Mide peticiones/s del perfil de producción con distintas cantidades de trabajadores"""
+    procesos_cliente = os.cpu_count() or 1
+    rutas = ["/vacunas"] + [f"/vacunas/{anio}" for anio in sorted(datos_vacunacion)]
+    base = None
+    print(f"[trabajadores] {os.cpu_count()} núcleos; {procesos_cliente} procesos cliente x {clientes} conexiones")
+    for trabajadores in cantidades:
+        puerto = puerto_libre()
+        servidor = iniciar_servidor(None, puerto, trabajadores)
+        try:
+            rps, errores = generar_carga_procesos(f"http://127.0.0.1:{puerto}", rutas, procesos_cliente,
+                                                  clientes, segundos)
+        finally:
+            servidor.terminate()
+            servidor.wait()
+        base = base or rps
+        print(f"[trabajadores] {trabajadores:>3} trabajadores | {rps:9.0f} peticiones/s | "
+              f"{rps / base:5.2f}x | errores: {errores}")
+
+
+def benchmark_respuestas_precalculadas(clientes, segundos):
+    """Compara la app original contra las respuestas precalculadas y la revalidación con ETag"""
+    rutas_anio = [f"/vacunas/{anio}" for anio in sorted(datos_vacunacion)]
+    resultados = {}
+
+    for nombre, aplicacion in (("original", "benchmark:app_original"), ("precalculada", "main:app")):
+        puerto = puerto_libre()
+        servidor = iniciar_servidor(aplicacion, puerto)
+        url_base = f"http://127.0.0.1:{puerto}"
+        try:
+            escenarios = [("/vacunas", ["/vacunas"], None), ("/vacunas/{anio}", rutas_anio, None)]
+            if nombre == "precalculada":
+                etag = httpx.get(f"{url_base}/vacunas").headers["etag"]
+                escenarios.append(("/vacunas (304)", ["/vacunas"], {"If-None-Match": etag}))
+            for escenario, rutas, encabezados in escenarios:
+                rps, errores = generar_carga(url_base, rutas, clientes, segundos, encabezados)
+                resultados[(nombre, escenario)] = rps
+                print(f"[respuestas] {nombre:<12} | {escenario:<16} | {rps:9.0f} peticiones/s | errores: {errores}")
+        finally:
+            servidor.terminate()
+            servidor.wait()
+
+    for escenario in ("/vacunas", "/vacunas/{anio}"):
+        mejora = resultados[("precalculada", escenario)] / resultados[("original", escenario)]
+        print(f"[respuestas] mejora en {escenario}: {mejora:.2f}x")
+
+
+def benchmark_lote(repeticiones):
+    """Compara pedir todos los años uno por uno contra una sola petición a /vacunas/batch"""
+    anios = sorted(datos_vacunacion)
+    puerto = puerto_libre()
+    servidor = iniciar_servidor("main:app", puerto)
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{puerto}") as sesion:
+            inicio = time.perf_counter()
+            for _ in range(repeticiones):
+                registros = [sesion.get(f"/vacunas/{anio}").json() for anio in anios]
+            uno_por_uno = (time.perf_counter() - inicio) / repeticiones
+
+            inicio = time.perf_counter()
+            for _ in range(repeticiones):
+                lote = sesion.post("/vacunas/batch", json={"anios": anios}).json()
+            por_lote = (time.perf_counter() - inicio) / repeticiones
+    finally:
+        servidor.terminate()
+        servidor.wait()
+
+    assert registros == lote["registros"]
+    print(f"[lote] {len(anios)} años, uno por uno: {uno_por_uno * 1000:8.2f}ms")
+    print(f"[lote] {len(anios)} años, /vacunas/batch: {por_lote * 1000:8.2f}ms ({uno_por_uno / por_lote:.1f}x)")
+
+
+def medir_por_respuesta(funcion, minimo_segundos=0.3):
+    """Repite la función hasta juntar `minimo_segundos` y regresa los segundos por llamada"""
+    repeticiones = 0
+    inicio = time.perf_counter()
+    while time.perf_counter() - inicio < minimo_segundos:
+        funcion()
+        repeticiones += 1
+    return (time.perf_counter() - inicio) / repeticiones
+
+
+def benchmark_serializacion(tamanos=(1, 36, 1_000, 10_000)):
+    """Compara el costo por respuesta de la ruta por defecto de FastAPI contra la serialización directa"""
+    registros = registros_sinteticos()
+
+    rutas = {
+        # Lo que hace FastAPI con response_model: validar con pydantic, convertir y serializar con json
+        "pydantic + JSONResponse": lambda datos: JSONResponse(
+            jsonable_encoder([RegistroVacunacionPais(**registro) for registro in datos])).body,
+        "dict + json": lambda datos: json.dumps(datos, ensure_ascii=False, separators=(",", ":")).encode("utf-8"),
+    }
+    if orjson is not None:
+        rutas["dict + orjson"] = orjson.dumps
+    else:
+        print("[serializacion] orjson no está instalado; se omite su medición")
+
+    for tamano in tamanos:
+        datos = registros[:tamano]
+        tiempos = {nombre: medir_por_respuesta(lambda: funcion(datos)) for nombre, funcion in rutas.items()}
+        base = tiempos["pydantic + JSONResponse"]
+        for nombre, segundos in tiempos.items():
+            print(f"[serializacion] {len(datos):>6} registros | {nombre:<24} | {segundos * 1e6:10.1f} µs/respuesta | {base / segundos:6.1f}x")
+
+
+def registros_sinteticos(paises=266, anios=64):
+    """Registros por país y año (como dicts) de un conjunto sintético del Banco Mundial"""
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, "API_SH.IMM.MEAS.csv")
+        generar_csv_banco_mundial(ruta, paises, anios)
+        conjunto = ConjuntoVacunacion.cargar(ruta)
+    return [
+        {"anio": anio, "cobertura": cobertura, "fuente": conjunto.fuente, "pais": str(codigo), "nombre_pais": str(nombre)}
+        for codigo, nombre in zip(conjunto.codigos, conjunto.nombres)
+        for anio, cobertura in conjunto.serie(str(codigo)).items()
+    ]
+
+
+def benchmark_compresion(tamanos=(36, 1_000, 10_000)):
+    """Compara el tamaño de cada codificación y el costo de comprimir en cada petición contra precalcular"""
+    registros = registros_sinteticos()
+    compresores = {"gzip (nivel 9)": lambda cuerpo: gzip.compress(cuerpo, compresslevel=9)}
+    if brotli is not None:
+        compresores["br (calidad 11)"] = lambda cuerpo: brotli.compress(cuerpo, quality=11)
+        compresores["br (calidad 4)"] = lambda cuerpo: brotli.compress(cuerpo, quality=4)
+    else:
+        print("[compresion] brotli no está instalado; se omite su medición")
+
+    for tamano in tamanos:
+        cuerpo = serializar(registros[:tamano])
+        print(f"[compresion] {tamano:>6} registros | sin comprimir     | {len(cuerpo):>9,} bytes")
+        for nombre, compresor in compresores.items():
+            comprimido = compresor(cuerpo)
+            segundos = medir_por_respuesta(lambda: compresor(cuerpo))
+            print(f"[compresion] {tamano:>6} registros | {nombre:<17} | {len(comprimido):>9,} bytes | "
+                  f"{segundos * 1e6:10.1f} µs por petición si se comprime al responder")
+        inicio = time.perf_counter()
+        RespuestaSerializada(cuerpo)
+        print(f"[compresion] {tamano:>6} registros | precalculado: {(time.perf_counter() - inicio) * 1000:.1f}ms "
+              f"una sola vez al cargar, 0 µs por petición")
+        # Las respuestas por petición solo comprimen si el cliente acepta alguna codificación
+        segundos = medir_por_respuesta(lambda: RespuestaSerializada(cuerpo, precalculada=False))
+        print(f"[compresion] {tamano:>6} registros | por petición sin Accept-Encoding o con 304: "
+              f"{segundos * 1e6:10.1f} µs (solo el ETag)")
+
+
+async def llamar_asgi(aplicacion, ruta, consulta=b""):
+    """Llama a la aplicación ASGI en proceso, descarta el cuerpo y regresa (estado, bytes recibidos)"""
+    resultado = {"estado": None, "bytes": 0}
+    scope = {"type": "http", "method": "GET", "path": ruta, "raw_path": ruta.encode(), "root_path": "",
+             "query_string": consulta, "headers": [], "http_version": "1.1", "scheme": "http",
+             "server": ("127.0.0.1", 80), "client": ("127.0.0.1", 1234)}
+    peticion_entregada = False
+    nunca = asyncio.Event()
+
+    async def recibir():
+        nonlocal peticion_entregada
+        if not peticion_entregada:
+            peticion_entregada = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await nunca.wait()  # El cliente nunca se desconecta
+
+    async def enviar(mensaje):
+        if mensaje["type"] == "http.response.start":
+            resultado["estado"] = mensaje["status"]
+        elif mensaje["type"] == "http.response.body":
+            resultado["bytes"] += len(mensaje.get("body", b""))
+
+    await aplicacion(scope, recibir, enviar)
+    return resultado["estado"], resultado["bytes"]
+
+
+def benchmark_exportacion(tamanos=(266, 2_660, 13_300)):
+    """Mide el pico de memoria de /exportar contra serializar la lista completa, para varios tamaños"""
+    version_original = main.version_datos
+    try:
+        for paises in tamanos:
+            with tempfile.TemporaryDirectory() as directorio:
+                ruta = os.path.join(directorio, "API_SH.IMM.MEAS.csv")
+                generar_csv_banco_mundial(ruta, paises, 64)
+                main.version_datos = main.VersionDatos(0, ConjuntoVacunacion.cargar(ruta), ruta)
+
+            for formato in ("ndjson", "csv"):
+                tracemalloc.start()
+                inicio = time.perf_counter()
+                estado, enviados = asyncio.run(llamar_asgi(app, "/exportar", f"formato={formato}".encode()))
+                segundos = time.perf_counter() - inicio
+                pico = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                print(f"[exportacion] {paises:>6} países | flujo {formato:<6} | {enviados / 1e6:7.1f} MB enviados | "
+                      f"pico {pico / 1e6:6.2f} MB | {segundos:.2f}s | estado {estado}")
+
+            tracemalloc.start()
+            cuerpo = serializar([
+                {"pais": codigo, "nombre_pais": nombre, "anio": anio, "cobertura": cobertura}
+                for codigo, nombre, anios, coberturas in main.version_datos.conjunto.iterar_paises()
+                for anio, cobertura in zip(anios, coberturas)
+            ])
+            pico = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"[exportacion] {paises:>6} países | lista JSON   | {len(cuerpo) / 1e6:7.1f} MB en memoria | "
+                  f"pico {pico / 1e6:6.2f} MB")
+    finally:
+        main.version_datos = version_original
+
+
+def crear_aplicacion(registro=None):
+    """Aplicación completa con las rutas de main.app; con `registro` agrega el middleware de métricas"""
+    aplicacion = FastAPI(default_response_class=app.router.default_response_class)
+    aplicacion.include_router(app.router)
+    if registro is not None:
+        aplicacion.add_middleware(MiddlewareMetricas, registro=registro)
+    return aplicacion
+
+
+def benchmark_metricas(peticiones=5_000, rondas=7):
+    """Mide en proceso el costo por petición de la aplicación completa con y sin el middleware de métricas"""
+    scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+             "scheme": "http", "path": "/vacunas/2018", "raw_path": b"/vacunas/2018", "root_path": "",
+             "query_string": b"", "headers": [], "server": ("127.0.0.1", 8000), "client": ("127.0.0.1", 50000)}
+
+    async def recibir():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def enviar(mensaje):
+        if mensaje["type"] == "http.response.start":
+            assert mensaje["status"] == 200, mensaje
+
+    async def medir_aplicacion(aplicacion):
+        inicio = time.perf_counter()
+        for _ in range(peticiones):
+            await aplicacion(dict(scope), recibir, enviar)
+        return (time.perf_counter() - inicio) / peticiones
+
+    # Cada variante pasa por toda la pila de middleware de FastAPI, como en producción
+    variantes = {
+        "sin métricas": crear_aplicacion(),
+        "métricas (100 %)": crear_aplicacion(RegistroMetricas(1.0)),
+        "métricas (10 %)": crear_aplicacion(RegistroMetricas(0.1)),
+    }
+    # Rondas intercaladas; se conserva el mejor tiempo de cada variante para reducir el ruido
+    mejores = dict.fromkeys(variantes, float("inf"))
+    for _ in range(rondas):
+        for nombre, aplicacion in variantes.items():
+            mejores[nombre] = min(mejores[nombre], asyncio.run(medir_aplicacion(aplicacion)))
+    base = mejores["sin métricas"]
+    for nombre, segundos in mejores.items():
+        print(f"[metricas] {nombre:<18} | {segundos * 1e6:7.2f} µs/petición | +{(segundos - base) * 1e6:5.2f} µs")
+
+
+def benchmark_memoria(paises, anios):
+    """Compara la memoria y el tiempo de consulta del almacén de NumPy contra un dict de modelos"""
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, "API_SH.IMM.MEAS.csv")
+        generar_csv_banco_mundial(ruta, paises, anios)
+        inicio = time.perf_counter()
+        conjunto = ConjuntoVacunacion.cargar(ruta)
+        print(f"[memoria] carga del CSV ({paises} países x {anios} años): {time.perf_counter() - inicio:.3f}s")
+
+    tracemalloc.start()
+    modelos = {
+        (str(codigo), anio): RegistroVacunacionPais(anio=anio, cobertura=cobertura, pais=str(codigo),
+                                                   nombre_pais=str(nombre))
+        for codigo, nombre in zip(conjunto.codigos, conjunto.nombres)
+        for anio, cobertura in conjunto.serie(str(codigo)).items()
+    }
+    memoria_modelos = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    print(f"[memoria] arreglos de NumPy: {conjunto.bytes_en_memoria / 1024:10.1f} KiB")
+    print(f"[memoria] dict de pydantic:  {memoria_modelos / 1024:10.1f} KiB ({len(modelos):,} registros)")
+
+    consultas = [(str(random.choice(conjunto.codigos)), random.randint(conjunto.anio_inicial, conjunto.anio_final))
+                 for _ in range(100_000)]
+    inicio = time.perf_counter()
+    for pais, anio in consultas:
+        conjunto.obtener(pais, anio)
+    segundos = time.perf_counter() - inicio
+    print(f"[memoria] consulta (país, año): {segundos / len(consultas) * 1e6:.2f} µs por consulta")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--exportacion"]:
+        benchmark_exportacion()
+    elif sys.argv[1:2] == ["--compresion"]:
+        benchmark_compresion()
+    elif sys.argv[1:2] == ["--metricas"]:
+        benchmark_metricas()
+    elif sys.argv[1:2] == ["--trabajadores"]:
+        benchmark_trabajadores([int(valor) for valor in sys.argv[2:]] or [1, 2, 4])
+    elif sys.argv[1:2] == ["--serializacion"]:
+        benchmark_serializacion()
+    elif sys.argv[1:2] == ["--lote"]:
+        benchmark_lote(int(sys.argv[2]) if len(sys.argv) > 2 else 200)
+    elif sys.argv[1:2] == ["--memoria"]:
+        argumentos = [int(valor) for valor in sys.argv[2:4]]
+        benchmark_memoria(*(argumentos + [266, 64][len(argumentos):]))
+    else:
+        argumentos = [int(valor) for valor in sys.argv[1:3]]
+        benchmark_respuestas_precalculadas(*(argumentos + [8, 5][len(argumentos):]))
@@ -0,0 +1,229 @@
+"""
+Almacén de datos de vacunación respaldado por arreglos de NumPy.
+
+Carga el indicador SH.IMM.MEAS del Banco Mundial para todos los países, desde el
+CSV de descarga masiva o desde el JSON de la API v2, en una matriz países x años.
+Cada consulta (país, año) es un acceso directo a la matriz: O(1), y las sumas
+acumuladas por país permiten obtener el promedio de cualquier rango también en O(1).
+"""
+import csv
+import json
+import os
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+INDICADOR_PREDETERMINADO = "SH.IMM.MEAS"
+
+
+class ConjuntoVacunacion:
+    """Coberturas de vacunación por país y año en una matriz de NumPy (NaN = sin dato)"""
+
+    def __init__(self, codigos, nombres, anio_inicial, coberturas, indicador=INDICADOR_PREDETERMINADO):
+        self.codigos = np.asarray(codigos)
+        self.nombres = np.asarray(nombres)
+        self.anio_inicial = int(anio_inicial)
+        self.coberturas = np.asarray(coberturas, dtype=np.float64)
+        self.indicador = indicador
+        # Único diccionario del almacén: código ISO3 -> fila de la matriz
+        self.indice_paises = {str(codigo): fila for fila, codigo in enumerate(self.codigos)}
+
+        # Sumas y conteos acumulados por país (columna 0 = antes del primer año)
+        presentes = ~np.isnan(self.coberturas)
+        filas, anios = self.coberturas.shape
+        self.sumas_acumuladas = np.zeros((filas, anios + 1))
+        self.sumas_acumuladas[:, 1:] = np.cumsum(np.where(presentes, self.coberturas, 0.0), axis=1)
+        self.conteos_acumulados = np.zeros((filas, anios + 1), dtype=np.int64)
+        self.conteos_acumulados[:, 1:] = np.cumsum(presentes, axis=1)
+
+    @property
+    def anio_final(self) -> int:
+        return self.anio_inicial + self.coberturas.shape[1] - 1
+
+    @property
+    def fuente(self) -> str:
+        return f"Banco Mundial - {self.indicador}"
+
+    @property
+    def bytes_en_memoria(self) -> int:
+        """Memoria ocupada por los arreglos del almacén"""
+        return (self.codigos.nbytes + self.nombres.nbytes + self.coberturas.nbytes
+                + self.sumas_acumuladas.nbytes + self.conteos_acumulados.nbytes)
+
+    def fila_pais(self, pais: str) -> Optional[int]:
+        """Regresa la fila del país (código ISO3, sin distinguir mayúsculas) o None"""
+        return self.indice_paises.get(pais.upper())
+
+    def obtener(self, pais: str, anio: int) -> Optional[float]:
+        """Regresa la cobertura del país en el año, o None si no hay dato"""
+        fila = self.fila_pais(pais)
+        columna = anio - self.anio_inicial
+        if fila is None or not 0 <= columna < self.coberturas.shape[1]:
+            return None
+        valor = self.coberturas[fila, columna]
+        return None if np.isnan(valor) else float(valor)
+
+    def serie(self, pais: str) -> Dict[int, float]:
+        """Regresa los años con dato del país como diccionario anio -> cobertura"""
+        fila = self.fila_pais(pais)
+        if fila is None:
+            return {}
+        valores = self.coberturas[fila]
+        columnas = np.flatnonzero(~np.isnan(valores))
+        return {self.anio_inicial + int(columna): float(valores[columna]) for columna in columnas}
+
+    # --------------------- RANGOS Y ESTADÍSTICAS ---------------------
+    def columnas_rango(self, desde: Optional[int] = None, hasta: Optional[int] = None) -> Tuple[int, int]:
+        """Convierte un rango de años inclusivo en columnas [inicio, fin) recortadas a la matriz"""
+        total = self.coberturas.shape[1]
+        inicio = 0 if desde is None else min(max(desde - self.anio_inicial, 0), total)
+        fin = total if hasta is None else min(max(hasta - self.anio_inicial + 1, 0), total)
+        return inicio, max(fin, inicio)
+
+    def rango(self, pais: str, desde: Optional[int] = None, hasta: Optional[int] = None):
+        """Regresa (años, coberturas) como arreglos, solo para los años del rango con dato"""
+        fila = self.fila_pais(pais)
+        inicio, fin = self.columnas_rango(desde, hasta)
+        valores = self.coberturas[fila, inicio:fin]
+        columnas = np.flatnonzero(~np.isnan(valores))
+        return columnas + self.anio_inicial + inicio, valores[columnas]
+
+    def promedio_rango(self, pais: str, desde: Optional[int] = None, hasta: Optional[int] = None) -> Optional[float]:
+        """Promedio de los años con dato del rango en O(1) con las sumas acumuladas"""
+        fila = self.fila_pais(pais)
+        inicio, fin = self.columnas_rango(desde, hasta)
+        conteo = self.conteos_acumulados[fila, fin] - self.conteos_acumulados[fila, inicio]
+        if not conteo:
+            return None
+        return float((self.sumas_acumuladas[fila, fin] - self.sumas_acumuladas[fila, inicio]) / conteo)
+
+    def estadisticas(self, pais: str, desde: Optional[int] = None, hasta: Optional[int] = None) -> Optional[dict]:
+        """Mínimo, máximo, promedio y desviación estándar del rango, o None si no hay datos"""
+        anios, valores = self.rango(pais, desde, hasta)
+        if not len(valores):
+            return None
+        posicion_minimo, posicion_maximo = int(np.argmin(valores)), int(np.argmax(valores))
+        return {
+            "anios_con_datos": len(valores),
+            "minimo": float(valores[posicion_minimo]),
+            "anio_minimo": int(anios[posicion_minimo]),
+            "maximo": float(valores[posicion_maximo]),
+            "anio_maximo": int(anios[posicion_maximo]),
+            "promedio": self.promedio_rango(pais, desde, hasta),
+            "desviacion_estandar": float(valores.std()),
+        }
+
+    def promedio_movil(self, pais: str, ventana: int, desde: Optional[int] = None, hasta: Optional[int] = None):
+        """
+        Regresa (años, promedios) del promedio de los últimos `ventana` años para cada año con dato.
+        La ventana puede incluir años anteriores al rango; los años sin dato no cuentan.
+        """
+        fila = self.fila_pais(pais)
+        inicio, fin = self.columnas_rango(desde, hasta)
+        columnas = np.arange(inicio, fin)[~np.isnan(self.coberturas[fila, inicio:fin])]
+        inicio_ventana = np.maximum(columnas + 1 - ventana, 0)
+        sumas = self.sumas_acumuladas[fila, columnas + 1] - self.sumas_acumuladas[fila, inicio_ventana]
+        conteos = self.conteos_acumulados[fila, columnas + 1] - self.conteos_acumulados[fila, inicio_ventana]
+        return columnas + self.anio_inicial, sumas / conteos
+
+    def variaciones(self, pais: str, desde: Optional[int] = None, hasta: Optional[int] = None):
+        """Regresa (años, diferencias) contra el año anterior, donde ambos años tienen dato"""
+        fila = self.fila_pais(pais)
+        inicio, fin = self.columnas_rango(desde, hasta)
+        inicio_previo = max(inicio - 1, 0)
+        diferencias = np.diff(self.coberturas[fila, inicio_previo:fin])
+        columnas = np.arange(inicio_previo + 1, max(fin, inicio_previo + 1))
+        validas = ~np.isnan(diferencias)
+        return columnas[validas] + self.anio_inicial, diferencias[validas]
+
+    def iterar_paises(self, paises: Optional[Iterable[str]] = None, desde: Optional[int] = None,
+                      hasta: Optional[int] = None):
+        """
+        Genera (código, nombre, años, coberturas) por país con los años del rango que tienen dato.
+        Recorre la matriz fila por fila, sin copiarla completa.
+        """
+        filas = range(len(self.codigos)) if paises is None else (self.fila_pais(pais) for pais in paises)
+        inicio, fin = self.columnas_rango(desde, hasta)
+        for fila in filas:
+            valores = self.coberturas[fila, inicio:fin]
+            columnas = np.flatnonzero(~np.isnan(valores))
+            if len(columnas):
+                yield (str(self.codigos[fila]), str(self.nombres[fila]),
+                       (columnas + self.anio_inicial + inicio).tolist(), valores[columnas].tolist())
+
+    # --------------------- CARGA ---------------------
+    @classmethod
+    def desde_registros(cls, registros: Iterable[Tuple[str, str, int, float]], indicador=INDICADOR_PREDETERMINADO):
+        """Construye el almacén a partir de tuplas (código, nombre, año, cobertura)"""
+        registros = list(registros)
+        if not registros:
+            raise ValueError("El archivo no contiene registros de vacunación")
+        paises = {}
+        for codigo, nombre, _, _ in registros:
+            paises.setdefault(codigo.upper(), nombre)
+        anios = [anio for _, _, anio, _ in registros]
+        anio_inicial = min(anios)
+
+        codigos = list(paises)
+        filas = {codigo: fila for fila, codigo in enumerate(codigos)}
+        coberturas = np.full((len(codigos), max(anios) - anio_inicial + 1), np.nan)
+        for codigo, _, anio, cobertura in registros:
+            coberturas[filas[codigo.upper()], anio - anio_inicial] = cobertura
+        return cls(codigos, list(paises.values()), anio_inicial, coberturas, indicador)
+
+    @classmethod
+    def desde_csv(cls, ruta: str):
+        """Carga el CSV de descarga masiva del Banco Mundial (una fila por país, una columna por año)"""
+        with open(ruta, encoding="utf-8-sig", newline="") as archivo:
+            lector = csv.reader(archivo)
+            # El archivo trae unas líneas de metadatos antes del encabezado
+            for encabezado in lector:
+                if encabezado and encabezado[0] == "Country Name":
+                    break
+            else:
+                raise ValueError("No se encontró el encabezado 'Country Name' en el CSV")
+
+            columnas_anio = [(i, int(nombre)) for i, nombre in enumerate(encabezado) if nombre.strip().isdigit()]
+            indicador = INDICADOR_PREDETERMINADO
+            registros = []
+            for fila in lector:
+                if len(fila) < 4:
+                    continue
+                indicador = fila[3] or indicador
+                for i, anio in columnas_anio:
+                    if i < len(fila) and fila[i].strip():
+                        registros.append((fila[1], fila[0], anio, float(fila[i])))
+        return cls.desde_registros(registros, indicador)
+
+    @classmethod
+    def desde_json(cls, ruta: str):
+        """Carga la respuesta JSON de la API v2 del Banco Mundial ([metadatos, registros] o solo registros)"""
+        with open(ruta, encoding="utf-8") as archivo:
+            contenido = json.load(archivo)
+        if len(contenido) == 2 and isinstance(contenido[0], dict) and "page" in contenido[0]:
+            contenido = contenido[1] or []
+
+        indicador = INDICADOR_PREDETERMINADO
+        registros = []
+        for registro in contenido:
+            if registro.get("value") is None:
+                continue
+            indicador = registro.get("indicator", {}).get("id", indicador)
+            codigo = registro.get("countryiso3code") or registro["country"]["id"]
+            registros.append((codigo, registro["country"]["value"], int(registro["date"]), float(registro["value"])))
+        return cls.desde_registros(registros, indicador)
+
+    @classmethod
+    def cargar(cls, ruta: str):
+        """Carga un archivo del Banco Mundial eligiendo el formato por su extensión"""
+        extension = os.path.splitext(ruta)[1].lower()
+        if extension == ".csv":
+            return cls.desde_csv(ruta)
+        if extension == ".json":
+            return cls.desde_json(ruta)
+        raise ValueError(f"Formato no soportado: '{extension}'. Use un archivo .csv o .json")
+
+    @classmethod
+    def desde_diccionario(cls, codigo: str, nombre: str, datos: Dict[int, float]):
+        """Construye el almacén con la serie de un solo país"""
+        return cls.desde_registros((codigo, nombre, anio, cobertura) for anio, cobertura in datos.items())
@@ -1,8 +1,33 @@
 # Importaciones necesarias
-from typing import List  # Para tipar listas
-from fastapi import FastAPI, HTTPException, Path  # Framework web, manejo de errores y validación de path
-from pydantic import BaseModel  # Para definir modelos de datos
+import csv  # Para exportar el conjunto en CSV
+import gzip  # Para comprimir las respuestas grandes
+import hashlib  # Para calcular los ETag de las respuestas
+import hmac  # Para comparar el token de administración
+import io  # Para armar los bloques CSV de la exportación
+import json  # Para serializar las respuestas una sola vez
+import os  # Para leer la configuración del conjunto de datos
+import signal  # Para detener los trabajadores del servidor de producción
+import socket  # Para compartir el puerto entre los trabajadores
+import threading  # Para vigilar el archivo de datos en segundo plano
+import time  # Para registrar cuándo se cargó cada versión de los datos
+from typing import Collection, Dict, List, Literal, Optional  # Para tipar listas y diccionarios
+from fastapi import FastAPI, Header, HTTPException, Path, Query, Request, Response  # Framework web, manejo de errores y validación de path
+from fastapi.concurrency import run_in_threadpool  # Para cargar datos sin bloquear el ciclo de eventos
+from fastapi.responses import JSONResponse, ORJSONResponse, StreamingResponse  # Clases de respuesta
+from pydantic import BaseModel, Field  # Para definir modelos de datos
 import uvicorn  # Servidor ASGI para ejecutar la aplicación
+from datos import ConjuntoVacunacion  # Almacén de coberturas por país y año
+from metricas import MiddlewareMetricas, RegistroMetricas  # Métricas en formato de Prometheus
+
+try:
+    import orjson  # Serializador JSON rápido (opcional)
+except ImportError:
+    orjson = None
+
+try:
+    import brotli  # Compresión Brotli (opcional)
+except ImportError:
+    brotli = None
 
 # --------------------- MODELOS ---------------------
 class RegistroVacunacion(BaseModel):
@@ -18,6 +43,91 @@ class RegistroVacunacion(BaseModel):
     cobertura: float
     fuente: str = "Banco Mundial - SH.IMM.MEAS"
 
+class RegistroVacunacionPais(RegistroVacunacion):
+    """
+    Registro de vacunación de un país específico.
+
+    Attributes:
+        pais: Código ISO3 del país
+        nombre_pais: Nombre del país según el Banco Mundial
+    """
+    pais: str
+    nombre_pais: str
+
+class ConsultaLote(BaseModel):
+    """
+    Consulta de varios años en una sola petición.
+
+    Attributes:
+        anios: Años a consultar (máximo 1000)
+        pais: Código ISO3 del país; si se omite, se usa el país predeterminado de la API
+    """
+    anios: List[int] = Field(..., min_items=1, max_items=1000)
+    pais: Optional[str] = None
+
+class LoteVacunacion(BaseModel):
+    """
+    Resultado de una consulta por lote.
+
+    Attributes:
+        registros: Registros encontrados, en el orden pedido (con pais y nombre_pais si se indicó un país)
+        faltantes: Años pedidos sin datos disponibles
+    """
+    registros: List[RegistroVacunacion]
+    faltantes: List[int]
+
+class PuntoSerie(BaseModel):
+    """
+    Valor de una serie de vacunación en un año.
+
+    Attributes:
+        anio: Año del valor
+        valor: Cobertura, promedio o diferencia según la serie
+    """
+    anio: int
+    valor: float
+
+class SerieVacunacion(BaseModel):
+    """
+    Serie anual de un país: coberturas, promedios móviles o variaciones.
+
+    Attributes:
+        pais: Código ISO3 del país
+        nombre_pais: Nombre del país según el Banco Mundial
+        fuente: Origen de los datos
+        datos: Valores de la serie ordenados por año
+    """
+    pais: str
+    nombre_pais: str
+    fuente: str
+    datos: List[PuntoSerie]
+
+class EstadisticasVacunacion(BaseModel):
+    """
+    Estadísticas de cobertura de un país en un rango de años.
+
+    Attributes:
+        pais: Código ISO3 del país
+        nombre_pais: Nombre del país según el Banco Mundial
+        desde, hasta: Rango de años consultado
+        anios_con_datos: Años del rango con dato
+        minimo, anio_minimo: Cobertura mínima y el año en que ocurrió
+        maximo, anio_maximo: Cobertura máxima y el año en que ocurrió
+        promedio: Cobertura promedio del rango
+        desviacion_estandar: Desviación estándar de la cobertura
+    """
+    pais: str
+    nombre_pais: str
+    desde: int
+    hasta: int
+    anios_con_datos: int
+    minimo: float
+    anio_minimo: int
+    maximo: float
+    anio_maximo: int
+    promedio: float
+    desviacion_estandar: float
+
 # --------------------- DATOS ---------------------
 # Diccionario con datos históricos de vacunación contra sarampión en Panamá
 # Clave: año (1983-2018), Valor: porcentaje de cobertura
@@ -32,14 +142,224 @@ datos_vacunacion = {
     2018: 98.0
 }
 
+# Archivo del Banco Mundial (.csv o .json) con todos los países; sin él se usan los datos de Panamá
+ARCHIVO_DATOS = os.environ.get("VACUNAS_DATOS")
+# País que sirven /vacunas y /vacunas/{anio}
+PAIS_PREDETERMINADO = os.environ.get("VACUNAS_PAIS", "PAN")
+
+def cargar_conjunto(ruta: Optional[str] = ARCHIVO_DATOS) -> ConjuntoVacunacion:
+    """Carga un archivo del Banco Mundial o, si no hay ruta, los datos integrados de Panamá"""
+    if ruta:
+        return ConjuntoVacunacion.cargar(ruta)
+    return ConjuntoVacunacion.desde_diccionario("PAN", "Panamá", datos_vacunacion)
+
+# --------------------- RESPUESTAS PRECALCULADAS ---------------------
+# Los datos solo cambian al recargar el conjunto, así que el JSON de cada endpoint
+# se serializa una sola vez por versión y se sirve como bytes. no-cache obliga a
+# revalidar con el ETag (304 sin cuerpo) para que una recarga se vea de inmediato.
+CACHE_CONTROL = "public, no-cache"
+
+# Serialización rápida con orjson si está instalado; VACUNAS_JSON_RAPIDO=0 fuerza el módulo json
+JSON_RAPIDO = orjson is not None and os.environ.get("VACUNAS_JSON_RAPIDO", "1") != "0"
+
+def serializar(contenido) -> bytes:
+    """Serializa un contenido a JSON compacto en UTF-8"""
+    if JSON_RAPIDO:
+        return orjson.dumps(contenido)
+    return json.dumps(contenido, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def calcular_etag(cuerpo: bytes) -> str:
+    """Calcula un ETag fuerte a partir del contenido de la respuesta"""
+    return f'"{hashlib.sha256(cuerpo).hexdigest()[:32]}"'
+
+# Solo se comprimen los cuerpos de al menos este tamaño; por debajo, los encabezados pesan más que el ahorro
+UMBRAL_COMPRESION = int(os.environ.get("VACUNAS_UMBRAL_COMPRESION", "1024"))
+
+# Codificaciones que el servidor puede generar, en orden de preferencia
+CODIFICACIONES = ("br", "gzip") if brotli is not None else ("gzip",)
+
+def comprimir_con(cuerpo: bytes, codificacion: str, precalculado: bool = True) -> bytes:
+    """Comprime con el nivel máximo si se precalcula una sola vez, o con uno rápido si es por petición"""
+    if codificacion == "gzip":
+        return gzip.compress(cuerpo, compresslevel=9 if precalculado else 5, mtime=0)
+    return brotli.compress(cuerpo, quality=11 if precalculado else 4)
+
+def comprimir(cuerpo: bytes) -> Dict[str, bytes]:
+    """Regresa todas las versiones comprimidas del cuerpo (codificación -> bytes) que ahorran espacio"""
+    if len(cuerpo) < UMBRAL_COMPRESION:
+        return {}
+    variantes = {codificacion: comprimir_con(cuerpo, codificacion) for codificacion in CODIFICACIONES}
+    return {codificacion: variante for codificacion, variante in variantes.items() if len(variante) < len(cuerpo)}
+
+class RespuestaSerializada:
+    """
+    Cuerpo JSON ya serializado con su ETag y sus versiones comprimidas.
+    Las precalculadas (las del conjunto, al cargarlo) comprimen todas sus variantes de una vez;
+    las que se arman por petición comprimen solo la codificación negociada y solo si hay cuerpo que enviar.
+    """
+    __slots__ = ("cuerpo", "etag", "variantes", "precalculada")
+
+    def __init__(self, cuerpo: bytes, precalculada: bool = True):
+        self.cuerpo = cuerpo
+        self.etag = calcular_etag(cuerpo)
+        self.precalculada = precalculada
+        self.variantes = comprimir(cuerpo) if precalculada else {}
+
+    def codificaciones(self) -> Collection[str]:
+        """Codificaciones en las que se puede servir esta respuesta"""
+        if self.precalculada:
+            return self.variantes
+        return CODIFICACIONES if len(self.cuerpo) >= UMBRAL_COMPRESION else ()
+
+    def variante(self, codificacion: str) -> bytes:
+        """Regresa el cuerpo en la codificación pedida, comprimiéndolo la primera vez si no se precalculó"""
+        if codificacion not in self.variantes:
+            self.variantes[codificacion] = comprimir_con(self.cuerpo, codificacion, precalculado=False)
+        return self.variantes[codificacion]
+
+def precalcular_respuestas(datos: Dict[int, float], fuente: str = "Banco Mundial - SH.IMM.MEAS") -> Dict[Optional[int], RespuestaSerializada]:
+    """
+    Valida los registros con el modelo una sola vez, serializa sus respuestas y las comprime.
+
+    Returns: dict: None -> respuesta de /vacunas; anio -> respuesta de /vacunas/{anio}
+    """
+    registros = [RegistroVacunacion(anio=anio, cobertura=datos[anio], fuente=fuente).dict() for anio in sorted(datos)]
+    respuestas = {registro["anio"]: serializar(registro) for registro in registros}
+    respuestas[None] = serializar(registros)
+    return {clave: RespuestaSerializada(cuerpo) for clave, cuerpo in respuestas.items()}
+
+def serializar_registro_pais(conjunto: ConjuntoVacunacion, fila: int, anio: int, cobertura: float) -> bytes:
+    """Serializa un registro de un país; los valores vienen del almacén ya validado al cargarlo"""
+    return serializar({
+        "anio": anio, "cobertura": cobertura, "fuente": conjunto.fuente,
+        "pais": str(conjunto.codigos[fila]), "nombre_pais": str(conjunto.nombres[fila])
+    })
+
+def etag_coincide(if_none_match: Optional[str], etag: str) -> bool:
+    """Indica si el encabezado If-None-Match del cliente incluye el ETag actual"""
+    if not if_none_match:
+        return False
+    etiquetas = [etiqueta.strip() for etiqueta in if_none_match.split(",")]
+    # If-None-Match usa comparación débil: se ignora el prefijo W/
+    return "*" in etiquetas or etag in (etiqueta[2:] if etiqueta.startswith("W/") else etiqueta for etiqueta in etiquetas)
+
+def elegir_codificacion(accept_encoding: Optional[str], variantes: Collection[str]) -> Optional[str]:
+    """Elige la mejor codificación disponible que acepte el cliente (br antes que gzip), o None"""
+    if not variantes or not accept_encoding:
+        return None
+    aceptadas = {}
+    for parte in accept_encoding.split(","):
+        nombre, _, parametro = parte.partition(";")
+        calidad = 1.0
+        if parametro.strip().startswith("q="):
+            try:
+                calidad = float(parametro.strip()[2:])
+            except ValueError:
+                calidad = 0.0
+        aceptadas[nombre.strip().lower()] = calidad
+    for codificacion in ("br", "gzip"):
+        if codificacion in variantes and aceptadas.get(codificacion, aceptadas.get("*", 0.0)) > 0:
+            return codificacion
+    return None
+
+def responder_json(request: Request, respuesta: RespuestaSerializada) -> Response:
+    """Sirve un cuerpo ya serializado en la codificación negociada, o 304 si el cliente ya tiene esa versión"""
+    codificaciones = respuesta.codificaciones()
+    codificacion = elegir_codificacion(request.headers.get("accept-encoding"), codificaciones)
+    # Cada codificación es una representación distinta y necesita su propio ETag fuerte
+    etag = respuesta.etag if codificacion is None else f'{respuesta.etag[:-1]}-{codificacion}"'
+    encabezados = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if codificaciones:
+        encabezados["Vary"] = "Accept-Encoding"
+    if etag_coincide(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=encabezados)
+    if codificacion is None:
+        return Response(content=respuesta.cuerpo, media_type="application/json", headers=encabezados)
+    encabezados["Content-Encoding"] = codificacion
+    return Response(content=respuesta.variante(codificacion), media_type="application/json", headers=encabezados)
+
+# --------------------- VERSIONES DE LOS DATOS ---------------------
+class VersionDatos:
+    """
+    Conjunto cargado junto con sus respuestas precalculadas.
+
+    Una recarga construye una versión completa nueva y la publica con una sola asignación:
+    cada petición toma la versión vigente al empezar y la usa hasta terminar, así que las
+    peticiones en curso nunca mezclan datos de dos versiones.
+    """
+    __slots__ = ("numero", "origen", "conjunto", "respuestas", "cargada_en")
+
+    def __init__(self, numero: int, conjunto: ConjuntoVacunacion, origen: str):
+        self.numero = numero
+        self.origen = origen
+        self.conjunto = conjunto
+        self.respuestas = precalcular_respuestas(conjunto.serie(PAIS_PREDETERMINADO), conjunto.fuente)
+        self.cargada_en = time.time()
+
+version_datos = VersionDatos(1, cargar_conjunto(), ARCHIVO_DATOS or "integrado")
+bloqueo_recarga = threading.Lock()
+
+def recargar_datos(ruta: Optional[str] = None) -> VersionDatos:
+    """
+    Carga el archivo y precalcula sus respuestas fuera de las peticiones, y después publica la versión.
+    Si la carga falla, la versión anterior sigue vigente.
+    """
+    global version_datos
+    ruta = ruta or ARCHIVO_DATOS
+    if not ruta:
+        raise ValueError("No hay archivo configurado en VACUNAS_DATOS para recargar")
+    with bloqueo_recarga:
+        nueva = VersionDatos(version_datos.numero + 1, cargar_conjunto(ruta), ruta)
+        version_datos = nueva
+    return nueva
+
+# Cada cuántos segundos se revisa si cambió el archivo de datos (0 = no se vigila)
+INTERVALO_VIGILANCIA = float(os.environ.get("VACUNAS_VIGILAR_SEGUNDOS", "0"))
+
+def vigilar_archivo(detener: threading.Event):
+    """Recarga el conjunto cuando el archivo cambia y deja de modificarse durante un intervalo"""
+    ultima_modificacion = None  # Si no se puede leer al iniciar, se recarga cuando vuelva a estar disponible
+    pendiente = False
+    disponible = True
+    primera_revision = True
+    while primera_revision or not detener.wait(INTERVALO_VIGILANCIA):
+        try:
+            modificacion = os.stat(ARCHIVO_DATOS).st_mtime_ns
+            disponible = True
+            if primera_revision:
+                ultima_modificacion = modificacion
+            elif modificacion != ultima_modificacion:
+                # Se espera un intervalo más para no leer un archivo que aún se está escribiendo
+                ultima_modificacion, pendiente = modificacion, True
+            elif pendiente:
+                pendiente = False
+                version = recargar_datos()
+                print(f"Conjunto recargado desde {version.origen}: versión {version.numero}")
+        except OSError as e:
+            # El archivo puede faltar un momento mientras se reemplaza; se avisa una vez y se sigue vigilando
+            if disponible:
+                print(f"No se puede leer {ARCHIVO_DATOS}, se mantiene la versión {version_datos.numero}: {e}")
+            disponible = False
+        except Exception as e:
+            # Cualquier otro error de carga no debe detener el hilo de vigilancia
+            print(f"No se pudo recargar el conjunto, se mantiene la versión {version_datos.numero}: {e}")
+        primera_revision = False
+
 # --------------------- API ---------------------
 # Inicialización de la aplicación FastAPI con metadatos
 app = FastAPI(
     title="API de Vacunación contra Sarampión en Panamá",
     description="Datos históricos sobre la vacunación contra el sarampión en niños de 12 a 23 meses en Panamá",
-    version="1.0.0"
+    version="1.0.0",
+    # Para los endpoints que regresan modelos o diccionarios (los demás sirven bytes ya serializados)
+    default_response_class=ORJSONResponse if JSON_RAPIDO else JSONResponse
 )
 
+# Métricas por ruta en /metrics; con carga alta, VACUNAS_METRICAS_MUESTREO=0.1 mide solo el 10 %
+registro_metricas = RegistroMetricas(float(os.environ.get("VACUNAS_METRICAS_MUESTREO", "1")))
+if os.environ.get("VACUNAS_METRICAS", "1") != "0":
+    app.add_middleware(MiddlewareMetricas, registro=registro_metricas)
+
 @app.get("/", tags=["Información"])
 async def raiz():
     """
@@ -51,44 +371,388 @@ async def raiz():
         "mensaje": "API de datos históricos de vacunación contra sarampión en Panamá",
         "endpoints_disponibles": [
             "/vacunas",
-            "/vacunas/{anio}"
+            "/vacunas/{anio}",
+            "/vacunas/{pais}/{anio}",
+            "/vacunas/batch",
+            "/series/{pais}",
+            "/series/{pais}/estadisticas",
+            "/series/{pais}/promedio-movil",
+            "/series/{pais}/variaciones",
+            "/exportar",
+            "/listo",
+            "/metrics",
+            "/admin/recargar"
         ]
     }
 
+# Indica si el proceso terminó de iniciar y puede recibir tráfico
+estado_servidor = {"listo": False, "detener_vigilancia": threading.Event()}
+
+@app.on_event("startup")
+async def marcar_listo():
+    """Inicia la vigilancia del archivo, si está configurada, y marca el proceso como listo"""
+    if ARCHIVO_DATOS and INTERVALO_VIGILANCIA > 0:
+        # Se inicia aquí y no al importar para que cada trabajador tenga su propio hilo
+        threading.Thread(target=vigilar_archivo, args=(estado_servidor["detener_vigilancia"],), daemon=True).start()
+    estado_servidor["listo"] = True
+
+@app.on_event("shutdown")
+async def marcar_no_listo():
+    """Deja de anunciarse como listo mientras el proceso se detiene"""
+    estado_servidor["listo"] = False
+    estado_servidor["detener_vigilancia"].set()
+
+@app.get("/listo", tags=["Información"])
+async def verificar_listo():
+    """
+    Endpoint de disponibilidad para balanceadores y orquestadores.
+
+    Returns: dict: Estado del proceso y del conjunto de datos cargado, o 503 si aún no está listo
+    """
+    if not estado_servidor["listo"]:
+        return JSONResponse(status_code=503, content={"estado": "iniciando"})
+    datos = version_datos
+    return {
+        "estado": "listo",
+        "pid": os.getpid(),
+        "version_datos": datos.numero,
+        "paises": len(datos.conjunto.codigos),
+        "anios": [datos.conjunto.anio_inicial, datos.conjunto.anio_final]
+    }
+
+@app.post("/admin/recargar", tags=["Administración"])
+async def recargar_conjunto(x_token_admin: Optional[str] = Header(None)):
+    """
+    Recarga el archivo de VACUNAS_DATOS sin reiniciar el servidor.
+    Requiere el encabezado X-Token-Admin con el valor de VACUNAS_TOKEN_ADMIN.
+    En producción solo recarga el trabajador que atiende la petición; para todos, use VACUNAS_VIGILAR_SEGUNDOS.
+
+    Returns: dict: Número y origen de la nueva versión de los datos
+
+    Raises: HTTPException: Si la recarga está deshabilitada, el token no es válido o el archivo no se pudo cargar
+    """
+    token = os.environ.get("VACUNAS_TOKEN_ADMIN")
+    if not token:
+        raise HTTPException(status_code=404, detail="La recarga por API está deshabilitada; configure VACUNAS_TOKEN_ADMIN")
+    if not hmac.compare_digest((x_token_admin or "").encode(), token.encode()):
+        raise HTTPException(status_code=403, detail="Token de administración inválido")
+    try:
+        # La carga y el precálculo corren en un hilo: las demás peticiones siguen atendiéndose
+        version = await run_in_threadpool(recargar_datos)
+    except Exception as e:
+        # Un archivo con otra forma puede fallar con KeyError, TypeError, etc.; la versión actual sigue vigente
+        raise HTTPException(status_code=500, detail=f"No se pudo recargar el conjunto, se mantiene la versión {version_datos.numero}: {e}")
+    return {
+        "version_datos": version.numero,
+        "origen": version.origen,
+        "paises": len(version.conjunto.codigos),
+        "anios": [version.conjunto.anio_inicial, version.conjunto.anio_final]
+    }
+
 @app.get("/vacunas", response_model=List[RegistroVacunacion], tags=["Vacunas"])
-async def obtener_todos_datos_vacunacion():
+async def obtener_todos_datos_vacunacion(request: Request):
     """
     Obtiene todos los registros de vacunación disponibles.
 
     Returns: List[RegistroVacunacion]: Lista ordenada cronológicamente de todos los registros
     """
-    return sorted([
-        RegistroVacunacion(anio=anio, cobertura=cobertura)
-        for anio, cobertura in datos_vacunacion.items()
-    ], key=lambda x: x.anio)
+    return responder_json(request, version_datos.respuestas[None])
 
 @app.get("/vacunas/{anio}", response_model=RegistroVacunacion, tags=["Vacunas"])
-async def obtener_vacunacion_por_anio(anio: int = Path(..., ge=1983, le=2018, description="Año entre 1983 y 2018")):
+async def obtener_vacunacion_por_anio(request: Request, anio: int = Path(..., description="Año dentro del rango del conjunto cargado")):
     """
     Obtiene el registro de vacunación para un año específico.
 
-    Args: anio: Año del que se desea obtener la información (entre 1983 y 2018)
+    Args: anio: Año del que se desea obtener la información (rango del conjunto de datos cargado)
 
     Returns: RegistroVacunacion: Datos de vacunación para el año solicitado
 
-    Raises: HTTPException: Si no existen datos para el año solicitado
+    Raises: HTTPException: Si el año está fuera del rango del conjunto o no existen datos para él
     """
-    if anio not in datos_vacunacion:
+    datos = version_datos
+    # El rango depende de la versión cargada, así que se valida aquí y no en Path
+    if not datos.conjunto.anio_inicial <= anio <= datos.conjunto.anio_final:
+        raise HTTPException(status_code=422, detail=f"El año debe estar entre {datos.conjunto.anio_inicial} y {datos.conjunto.anio_final}")
+    if anio not in datos.respuestas:
         raise HTTPException(status_code=404, detail=f"No hay datos disponibles para el año {anio}")
-    return RegistroVacunacion(anio=anio, cobertura=datos_vacunacion[anio])
+    return responder_json(request, datos.respuestas[anio])
+
+@app.get("/vacunas/{pais}/{anio}", response_model=RegistroVacunacionPais, tags=["Vacunas"])
+async def obtener_vacunacion_por_pais_y_anio(request: Request,
+                                             pais: str = Path(..., min_length=3, max_length=3, description="Código ISO3 del país, por ejemplo PAN"),
+                                             anio: int = Path(..., description="Año del registro")):
+    """
+    Obtiene el registro de vacunación de un país para un año específico.
+
+    Args: pais: Código ISO3 del país; anio: Año del que se desea obtener la información
+
+    Returns: RegistroVacunacionPais: Datos de vacunación del país en el año solicitado
+
+    Raises: HTTPException: Si el país no existe o no tiene datos para el año solicitado
+    """
+    conjunto = version_datos.conjunto
+    fila = conjunto.fila_pais(pais)
+    if fila is None:
+        raise HTTPException(status_code=404, detail=f"No existe el país {pais}")
+    cobertura = conjunto.obtener(pais, anio)
+    if cobertura is None:
+        raise HTTPException(status_code=404, detail=f"No hay datos disponibles para {pais} en el año {anio}")
+    cuerpo = serializar_registro_pais(conjunto, fila, anio, cobertura)
+    return responder_json(request, RespuestaSerializada(cuerpo, precalculada=False))
+
+@app.post("/vacunas/batch", response_model=LoteVacunacion, tags=["Vacunas"])
+async def obtener_vacunacion_por_lote(consulta: ConsultaLote):
+    """
+    Obtiene los registros de varios años en una sola petición.
+
+    Args: consulta: Años a consultar y, opcionalmente, el país
+
+    Returns: LoteVacunacion: Registros encontrados y años sin datos, sin fallar por los faltantes
+
+    Raises: HTTPException: Si el país indicado no existe
+    """
+    datos = version_datos
+    anios = list(dict.fromkeys(consulta.anios))  # Sin repetidos, en el orden pedido
+    registros, faltantes = [], []
+    if consulta.pais is None:
+        # Se reutilizan los cuerpos precalculados de /vacunas/{anio}
+        for anio in anios:
+            if anio in datos.respuestas:
+                registros.append(datos.respuestas[anio].cuerpo)
+            else:
+                faltantes.append(anio)
+    else:
+        fila = datos.conjunto.fila_pais(consulta.pais)
+        if fila is None:
+            raise HTTPException(status_code=404, detail=f"No existe el país {consulta.pais}")
+        for anio in anios:
+            cobertura = datos.conjunto.obtener(consulta.pais, anio)
+            if cobertura is None:
+                faltantes.append(anio)
+            else:
+                registros.append(serializar_registro_pais(datos.conjunto, fila, anio, cobertura))
+    # Los registros ya están serializados: se unen como bytes sin validarlos de nuevo
+    cuerpo = b'{"registros":[' + b",".join(registros) + b'],"faltantes":' + serializar(faltantes) + b"}"
+    return Response(content=cuerpo, media_type="application/json")
+
+@app.get("/metrics", include_in_schema=False)
+async def exportar_metricas():
+    """Expone las métricas de este proceso en formato de texto de Prometheus"""
+    return Response(content=registro_metricas.exportar(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+# --------------------- SERIES Y ESTADÍSTICAS ---------------------
+# Calculadas con NumPy sobre la matriz del conjunto: una petición reemplaza
+# las consultas año por año a /vacunas/{anio}.
+DESDE = Query(None, description="Primer año del rango (inclusive)")
+HASTA = Query(None, description="Último año del rango (inclusive)")
+
+def validar_consulta_serie(conjunto: ConjuntoVacunacion, pais: str, desde: Optional[int], hasta: Optional[int]) -> int:
+    """Regresa la fila del país o lanza HTTPException si el país o el rango no son válidos"""
+    if desde is not None and hasta is not None and desde > hasta:
+        raise HTTPException(status_code=400, detail=f"El rango es inválido: {desde} es posterior a {hasta}")
+    fila = conjunto.fila_pais(pais)
+    if fila is None:
+        raise HTTPException(status_code=404, detail=f"No existe el país {pais}")
+    return fila
+
+def responder_serie(request: Request, conjunto: ConjuntoVacunacion, fila: int, anios, valores) -> Response:
+    """Serializa una serie (arreglos de años y valores) sin pasar por los modelos"""
+    cuerpo = serializar({
+        "pais": str(conjunto.codigos[fila]),
+        "nombre_pais": str(conjunto.nombres[fila]),
+        "fuente": conjunto.fuente,
+        "datos": [{"anio": anio, "valor": round(valor, 2)} for anio, valor in zip(anios.tolist(), valores.tolist())]
+    })
+    return responder_json(request, RespuestaSerializada(cuerpo, precalculada=False))
+
+@app.get("/series/{pais}", response_model=SerieVacunacion, tags=["Series"])
+async def obtener_serie(request: Request, pais: str, desde: Optional[int] = DESDE, hasta: Optional[int] = HASTA):
+    """
+    Obtiene la cobertura de un país para todos los años de un rango.
+
+    Args: pais: Código ISO3 del país; desde, hasta: Rango de años (por defecto, todo el conjunto)
+
+    Returns: SerieVacunacion: Coberturas de los años del rango con dato
+    """
+    conjunto = version_datos.conjunto
+    fila = validar_consulta_serie(conjunto, pais, desde, hasta)
+    return responder_serie(request, conjunto, fila, *conjunto.rango(pais, desde, hasta))
+
+@app.get("/series/{pais}/estadisticas", response_model=EstadisticasVacunacion, tags=["Series"])
+async def obtener_estadisticas(request: Request, pais: str, desde: Optional[int] = DESDE, hasta: Optional[int] = HASTA):
+    """
+    Obtiene mínimo, máximo, promedio y desviación estándar de la cobertura en un rango.
+
+    Args: pais: Código ISO3 del país; desde, hasta: Rango de años (por defecto, todo el conjunto)
+
+    Returns: EstadisticasVacunacion: Estadísticas del rango
+
+    Raises: HTTPException: Si el país no existe o no tiene datos en el rango
+    """
+    conjunto = version_datos.conjunto
+    fila = validar_consulta_serie(conjunto, pais, desde, hasta)
+    estadisticas = conjunto.estadisticas(pais, desde, hasta)
+    if estadisticas is None:
+        raise HTTPException(status_code=404, detail=f"No hay datos disponibles para {pais} en el rango solicitado")
+    cuerpo = serializar({
+        "pais": str(conjunto.codigos[fila]),
+        "nombre_pais": str(conjunto.nombres[fila]),
+        "desde": desde if desde is not None else conjunto.anio_inicial,
+        "hasta": hasta if hasta is not None else conjunto.anio_final,
+        **{clave: round(valor, 2) if isinstance(valor, float) else valor for clave, valor in estadisticas.items()}
+    })
+    return responder_json(request, RespuestaSerializada(cuerpo, precalculada=False))
+
+@app.get("/series/{pais}/promedio-movil", response_model=SerieVacunacion, tags=["Series"])
+async def obtener_promedio_movil(request: Request, pais: str,
+                                 ventana: int = Query(3, ge=1, le=50, description="Cantidad de años de la ventana"),
+                                 desde: Optional[int] = DESDE, hasta: Optional[int] = HASTA):
+    """
+    Obtiene el promedio móvil de la cobertura para cada año con dato del rango.
+
+    Args: pais: Código ISO3 del país; ventana: Años que promedia cada valor; desde, hasta: Rango de años
+
+    Returns: SerieVacunacion: Promedio de los últimos `ventana` años para cada año
+    """
+    conjunto = version_datos.conjunto
+    fila = validar_consulta_serie(conjunto, pais, desde, hasta)
+    return responder_serie(request, conjunto, fila, *conjunto.promedio_movil(pais, ventana, desde, hasta))
+
+@app.get("/series/{pais}/variaciones", response_model=SerieVacunacion, tags=["Series"])
+async def obtener_variaciones(request: Request, pais: str, desde: Optional[int] = DESDE, hasta: Optional[int] = HASTA):
+    """
+    Obtiene la diferencia de cobertura de cada año contra el año anterior.
+
+    Args: pais: Código ISO3 del país; desde, hasta: Rango de años (por defecto, todo el conjunto)
+
+    Returns: SerieVacunacion: Diferencias en puntos porcentuales, solo donde ambos años tienen dato
+    """
+    conjunto = version_datos.conjunto
+    fila = validar_consulta_serie(conjunto, pais, desde, hasta)
+    return responder_serie(request, conjunto, fila, *conjunto.variaciones(pais, desde, hasta))
+
+# --------------------- EXPORTACIÓN ---------------------
+async def generar_ndjson(conjunto: ConjuntoVacunacion, paises, desde, hasta):
+    """Genera un bloque NDJSON por país; la memoria no depende del tamaño del conjunto"""
+    fuente = conjunto.fuente
+    for codigo, nombre, anios, coberturas in conjunto.iterar_paises(paises, desde, hasta):
+        yield b"".join(
+            serializar({"pais": codigo, "nombre_pais": nombre, "anio": anio, "cobertura": cobertura, "fuente": fuente}) + b"\n"
+            for anio, cobertura in zip(anios, coberturas)
+        )
+
+async def generar_csv(conjunto: ConjuntoVacunacion, paises, desde, hasta):
+    """Genera el encabezado y después un bloque CSV por país"""
+    bloque = io.StringIO()
+    escritor = csv.writer(bloque, lineterminator="\n")
+    escritor.writerow(["pais", "nombre_pais", "anio", "cobertura", "fuente"])
+    fuente = conjunto.fuente
+    for codigo, nombre, anios, coberturas in conjunto.iterar_paises(paises, desde, hasta):
+        escritor.writerows((codigo, nombre, anio, cobertura, fuente) for anio, cobertura in zip(anios, coberturas))
+        yield bloque.getvalue().encode("utf-8")
+        bloque.seek(0)
+        bloque.truncate()
+    if bloque.tell():
+        yield bloque.getvalue().encode("utf-8")  # Solo el encabezado si ningún país tuvo datos
+
+@app.get("/exportar", tags=["Exportación"])
+async def exportar_conjunto(formato: Literal["ndjson", "csv"] = Query("ndjson", description="Formato: ndjson o csv"),
+                            paises: Optional[str] = Query(None, description="Códigos ISO3 separados por coma (por defecto, todos)"),
+                            desde: Optional[int] = DESDE, hasta: Optional[int] = HASTA):
+    """
+    Exporta el conjunto completo o filtrado como un flujo NDJSON o CSV.
+
+    Args: formato: ndjson o csv; paises: Códigos ISO3 separados por coma; desde, hasta: Rango de años
+
+    Returns: StreamingResponse: Un registro por línea, generado país por país desde la matriz
+
+    Raises: HTTPException: Si algún país no existe o el rango es inválido
+    """
+    if desde is not None and hasta is not None and desde > hasta:
+        raise HTTPException(status_code=400, detail=f"El rango es inválido: {desde} es posterior a {hasta}")
+    # El flujo completo sale de esta versión aunque se recargue el conjunto mientras se envía
+    conjunto = version_datos.conjunto
+    lista_paises = None
+    if paises:
+        lista_paises = [pais.strip() for pais in paises.split(",") if pais.strip()]
+        desconocidos = [pais for pais in lista_paises if conjunto.fila_pais(pais) is None]
+        if desconocidos:
+            raise HTTPException(status_code=404, detail=f"No existen los países: {', '.join(desconocidos)}")
+
+    if formato == "csv":
+        return StreamingResponse(generar_csv(conjunto, lista_paises, desde, hasta), media_type="text/csv",
+                                 headers={"Content-Disposition": 'attachment; filename="vacunacion.csv"'})
+    return StreamingResponse(generar_ndjson(conjunto, lista_paises, desde, hasta), media_type="application/x-ndjson")
+
+# --------------------- SERVIDOR DE PRODUCCIÓN ---------------------
+KEEP_ALIVE_SEGUNDOS = 30  # Conexiones keep-alive de balanceadores y clientes que reutilizan la conexión
+BACKLOG = 2048  # Conexiones pendientes en cola durante ráfagas de tráfico
+
+def servir_produccion(host: str, puerto: int, trabajadores: int):
+    """
+    Sirve la API sin recarga automática y con varios procesos trabajadores.
+
+    El conjunto de datos y las respuestas precalculadas ya se cargaron al importar este
+    módulo. En sistemas con fork, los trabajadores se crean después y comparten el socket
+    y esa memoria; en los demás, uvicorn inicia cada trabajador cargando el módulo de nuevo.
+    """
+    configuracion = dict(host=host, port=puerto, access_log=False, backlog=BACKLOG,
+                         timeout_keep_alive=KEEP_ALIVE_SEGUNDOS)
+    if trabajadores == 1:
+        uvicorn.run(app, **configuracion)
+        return
+    if not hasattr(os, "fork"):
+        nombre_modulo = os.path.splitext(os.path.basename(__file__))[0]
+        uvicorn.run(f"{nombre_modulo}:app", workers=trabajadores, **configuracion)
+        return
+
+    conexion = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET)
+    conexion.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    conexion.bind((host, puerto))
+    conexion.listen(BACKLOG)
+
+    hijos = []
+    for _ in range(trabajadores):
+        pid = os.fork()
+        if pid == 0:
+            uvicorn.Server(uvicorn.Config(app, **configuracion)).run(sockets=[conexion])
+            os._exit(0)
+        hijos.append(pid)
+    print(f"Servidor de producción en http://{host}:{puerto} con {trabajadores} trabajadores (pids {hijos})")
+
+    def detener(signum, frame):
+        for pid in hijos:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, detener)
+    signal.signal(signal.SIGINT, detener)
+    for pid in hijos:
+        os.waitpid(pid, 0)
+    conexion.close()
 
 if __name__ == "__main__":
     """
     Punto de entrada para ejecutar la aplicación directamente.
-    Configura el servidor uvicorn para servir la API en http://127.0.0.1:8080
+    Por defecto configura el servidor uvicorn para servir la API en http://127.0.0.1:8080
     con recarga automática activada para facilitar el desarrollo.
+    Con --produccion usa un trabajador por núcleo y desactiva la recarga.
     """
-    import os
+    import argparse
+
+    parser = argparse.ArgumentParser(description="API de vacunación contra sarampión")
+    parser.add_argument("--produccion", action="store_true",
+                        help="Sin recarga automática y con varios trabajadores")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8080)
+    parser.add_argument("--trabajadores", type=int, default=os.cpu_count() or 1,
+                        help="Procesos trabajadores en producción (por defecto, uno por núcleo)")
+    argumentos = parser.parse_args()
 
-    nombre_modulo = os.path.splitext(os.path.basename(__file__))[0]
-    uvicorn.run(f"{nombre_modulo}:app", host="127.0.0.1", port=8080, reload=True)
\ No newline at end of file
+    if argumentos.produccion:
+        servir_produccion(argumentos.host, argumentos.puerto, max(1, argumentos.trabajadores))
+    else:
+        nombre_modulo = os.path.splitext(os.path.basename(__file__))[0]
+        uvicorn.run(f"{nombre_modulo}:app", host=argumentos.host, port=argumentos.puerto, reload=True)
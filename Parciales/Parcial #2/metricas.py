@@ -0,0 +1,148 @@
+"""
+Métricas de la API en formato de texto de Prometheus.
+
+MiddlewareMetricas es un middleware ASGI que registra, por método y ruta, la
+cantidad de peticiones por estado, histogramas de latencia y de tamaño de
+respuesta, y las peticiones en curso. Con `fraccion_muestreo` menor a 1 solo
+mide latencia y tamaño de una fracción de las peticiones; los contadores de
+peticiones y las peticiones en curso siempre son exactos.
+
+Cada proceso trabajador lleva sus propias métricas.
+"""
+import random
+import time
+from bisect import bisect_left
+
+BUCKETS_LATENCIA = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+BUCKETS_TAMANO = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+RUTA_DESCONOCIDA = "sin_ruta"
+
+
+class Histograma:
+    """Histograma acumulable con buckets fijos, como los de Prometheus"""
+
+    __slots__ = ("limites", "conteos", "suma", "total")
+
+    def __init__(self, limites):
+        self.limites = limites
+        self.conteos = [0] * (len(limites) + 1)  # El último bucket es +Inf
+        self.suma = 0.0
+        self.total = 0
+
+    def observar(self, valor):
+        self.conteos[bisect_left(self.limites, valor)] += 1
+        self.suma += valor
+        self.total += 1
+
+    def lineas(self, nombre, etiquetas):
+        """Genera las líneas _bucket (acumuladas), _sum y _count"""
+        acumulado = 0
+        for limite, conteo in zip(self.limites + ("+Inf",), self.conteos):
+            acumulado += conteo
+            yield f'{nombre}_bucket{{{etiquetas},le="{limite}"}} {acumulado}'
+        yield f"{nombre}_sum{{{etiquetas}}} {self.suma}"
+        yield f"{nombre}_count{{{etiquetas}}} {self.total}"
+
+
+class RegistroMetricas:
+    """Acumula las métricas de un proceso y las exporta en formato de texto de Prometheus"""
+
+    def __init__(self, fraccion_muestreo=1.0, prefijo="api"):
+        self.fraccion_muestreo = min(max(fraccion_muestreo, 0.0), 1.0)
+        self.prefijo = prefijo
+        self.en_curso = 0
+        self.peticiones = {}  # (método, ruta, estado) -> cantidad
+        self.latencias = {}  # (método, ruta) -> Histograma
+        self.tamanos = {}  # (método, ruta) -> Histograma
+        self.rutas_por_endpoint = None
+
+    def muestrear(self) -> bool:
+        """Decide si se mide la latencia y el tamaño de la petición actual"""
+        return self.fraccion_muestreo >= 1.0 or random.random() < self.fraccion_muestreo
+
+    def ruta_de(self, scope) -> str:
+        """Regresa la plantilla de la ruta atendida (/vacunas/{anio}), no la ruta concreta"""
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return RUTA_DESCONOCIDA
+        if self.rutas_por_endpoint is None:
+            self.rutas_por_endpoint = {
+                ruta.endpoint: ruta.path for ruta in scope["app"].routes if hasattr(ruta, "endpoint")
+            }
+        return self.rutas_por_endpoint.get(endpoint, RUTA_DESCONOCIDA)
+
+    def registrar(self, metodo, ruta, estado, segundos=None, tamano=None):
+        """Registra una petición terminada; latencia y tamaño solo si fue muestreada"""
+        clave = (metodo, ruta, estado)
+        self.peticiones[clave] = self.peticiones.get(clave, 0) + 1
+        if segundos is None:
+            return
+        clave = (metodo, ruta)
+        if clave not in self.latencias:
+            self.latencias[clave] = Histograma(BUCKETS_LATENCIA)
+            self.tamanos[clave] = Histograma(BUCKETS_TAMANO)
+        self.latencias[clave].observar(segundos)
+        self.tamanos[clave].observar(tamano)
+
+    def exportar(self) -> bytes:
+        """Genera el cuerpo de /metrics en formato de texto de Prometheus"""
+        p = self.prefijo
+        lineas = [
+            f"# HELP {p}_peticiones_total Peticiones atendidas por método, ruta y estado",
+            f"# TYPE {p}_peticiones_total counter",
+        ]
+        for (metodo, ruta, estado), cantidad in sorted(self.peticiones.items()):
+            lineas.append(f'{p}_peticiones_total{{metodo="{metodo}",ruta="{ruta}",estado="{estado}"}} {cantidad}')
+
+        for nombre, descripcion, histogramas in (
+            (f"{p}_duracion_peticion_segundos", "Latencia de las peticiones muestreadas", self.latencias),
+            (f"{p}_tamano_respuesta_bytes", "Tamaño del cuerpo de las respuestas muestreadas", self.tamanos),
+        ):
+            lineas += [f"# HELP {nombre} {descripcion}", f"# TYPE {nombre} histogram"]
+            for (metodo, ruta), histograma in sorted(histogramas.items()):
+                lineas.extend(histograma.lineas(nombre, f'metodo="{metodo}",ruta="{ruta}"'))
+
+        lineas += [
+            f"# HELP {p}_peticiones_en_curso Peticiones que se están atendiendo",
+            f"# TYPE {p}_peticiones_en_curso gauge",
+            f"{p}_peticiones_en_curso {self.en_curso}",
+            f"# HELP {p}_fraccion_muestreo Fracción de peticiones con latencia y tamaño medidos",
+            f"# TYPE {p}_fraccion_muestreo gauge",
+            f"{p}_fraccion_muestreo {self.fraccion_muestreo}",
+        ]
+        return ("\n".join(lineas) + "\n").encode("utf-8")
+
+
+class MiddlewareMetricas:
+    """Middleware ASGI que mide cada petición HTTP y la anota en un RegistroMetricas"""
+
+    def __init__(self, app, registro: RegistroMetricas):
+        self.app = app
+        self.registro = registro
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        registro = self.registro
+        muestreada = registro.muestrear()
+        estado = 500  # Si la aplicación falla sin responder, se cuenta como error del servidor
+        tamano = 0
+
+        async def enviar(mensaje):
+            nonlocal estado, tamano
+            if mensaje["type"] == "http.response.start":
+                estado = mensaje["status"]
+            elif muestreada and mensaje["type"] == "http.response.body":
+                tamano += len(mensaje.get("body", b""))
+            await send(mensaje)
+
+        registro.en_curso += 1
+        inicio = time.perf_counter() if muestreada else 0.0
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            registro.en_curso -= 1
+            segundos = time.perf_counter() - inicio if muestreada else None
+            registro.registrar(scope["method"], registro.ruta_de(scope), estado, segundos, tamano)
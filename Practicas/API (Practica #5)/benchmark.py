@@ -0,0 +1,195 @@
+"""
+Compara el rendimiento de los scripts secuenciales contra ClienteREST.
+
+Corre todo contra servidor_local.py, sin conexión a internet. Cada flujo es la
+secuencia GET, POST, PUT y DELETE de main.py. Se mide:
+
+1. Como los scripts: requests.get/post/... sueltos, una conexión nueva por petición.
+2. ClienteREST secuencial: misma secuencia reutilizando conexiones keep-alive.
+3. ClienteREST concurrente: todos los flujos en paralelo con un límite de peticiones en vuelo.
+4. Reintentos: el modo concurrente contra un servidor que responde 503 a una fracción de peticiones.
+
+Con --cache compara GET /posts sin caché contra ClienteCache (revalidación con
+ETag, respuestas vigentes por max-age y el nivel SQLite entre ejecuciones).
+
+Con --verificar comprueba con asserts que el modo concurrente se recupera de
+respuestas 503 con reintentos, que el servidor nunca atiende más de
+max_en_vuelo peticiones a la vez y que la copia del cliente en la Práctica #6
+es idéntica a la de esta práctica.
+
+Uso: python benchmark.py [flujos] [latencia_segundos] [max_en_vuelo]
+     python benchmark.py --cache [consultas] [latencia_segundos] [posts]
+     python benchmark.py --verificar
+"""
+import filecmp
+import os
+import sys
+import tempfile
+import time
+
+import requests
+
+from cache_http import ClienteCache
+from cliente_rest import ClienteREST, operaciones_crud
+from servidor_local import iniciar_servidor
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+DIRECTORIO_PRACTICA_6 = os.path.join(DIRECTORIO, "..", "Flask (Practica #6)", "APIConsumo")
+NUEVA_RESENA = {"title": "McDonalds", "body": "Excelentes nuggets", "userId": 1}
+MOD_RESENA = {"title": "KFC", "body": "Excelentes presas", "userId": 1}
+
+
+def flujos_como_scripts(url, flujos):
+    """Misma secuencia que los scripts originales, sin sesión ni timeout"""
+    for i in range(flujos):
+        id_post = i % 100 + 1
+        requests.get(url).json()
+        requests.post(url, json=NUEVA_RESENA).json()
+        requests.put(f"{url}/{id_post}", json=MOD_RESENA).json()
+        requests.delete(f"{url}/{id_post}")
+
+
+def flujos_secuenciales(url, flujos):
+    with ClienteREST(url) as cliente:
+        for i in range(flujos):
+            id_post = i % 100 + 1
+            cliente.obtener().json()
+            cliente.crear(NUEVA_RESENA).json()
+            cliente.actualizar(id_post, MOD_RESENA).json()
+            cliente.eliminar(id_post)
+
+
+def flujos_concurrentes(url, flujos, max_en_vuelo, **opciones):
+    """Regresa (respuestas exitosas, fallidas, reintentos realizados)"""
+    operaciones = [operacion for i in range(flujos)
+                   for operacion in operaciones_crud(i % 100 + 1, NUEVA_RESENA, MOD_RESENA)]
+    with ClienteREST(url, max_en_vuelo=max_en_vuelo, **opciones) as cliente:
+        resultados = cliente.ejecutar_concurrente(operaciones)
+        reintentos = cliente.reintentos_realizados
+    exitosas = sum(1 for r in resultados if isinstance(r, requests.Response) and r.ok)
+    return exitosas, len(resultados) - exitosas, reintentos
+
+
+def medir(nombre, funcion, operaciones, *args, **kwargs):
+    inicio = time.perf_counter()
+    resultado = funcion(*args, **kwargs)
+    segundos = time.perf_counter() - inicio
+    print(f"{nombre:<32} | {operaciones:>5} peticiones | {segundos:7.2f}s | {operaciones / segundos:8.1f} pet/s")
+    return resultado
+
+
+def consultas_sin_cache(url, consultas):
+    with ClienteREST(url) as cliente:
+        for _ in range(consultas):
+            cliente.obtener().json()
+
+
+def consultas_con_cache(url, consultas, ruta_sqlite=None):
+    with ClienteCache(ClienteREST(url), ruta_sqlite=ruta_sqlite) as cache:
+        for _ in range(consultas):
+            cache.obtener_json()
+        return cache.estadisticas()
+
+
+def ejecuciones_con_sqlite(url, ejecuciones, ruta_sqlite):
+    """Simula ejecuciones separadas del script: caché nueva en memoria, mismo archivo SQLite"""
+    estadisticas = {"aciertos": 0, "revalidaciones": 0, "fallos": 0}
+    for _ in range(ejecuciones):
+        for nombre, valor in consultas_con_cache(url, 1, ruta_sqlite).items():
+            if nombre in estadisticas:
+                estadisticas[nombre] += valor
+    return estadisticas
+
+
+def medir_descarga(servidor, nombre, funcion, operaciones, *args):
+    """Mide la función e imprime cuánto cuerpo envió el servidor y los contadores de la caché"""
+    servidor.bytes_enviados = 0
+    estadisticas = medir(nombre, funcion, operaciones, *args)
+    print(f"  {servidor.bytes_enviados / 1024:.0f} KiB descargados" + (f" | {estadisticas}" if estadisticas else ""))
+
+
+def benchmark_cache(consultas, latencia, total_posts):
+    print(f"{consultas} consultas GET /posts ({total_posts} posts) con {latencia * 1000:.0f} ms de latencia simulada\n")
+    servidor, url = iniciar_servidor(latencia=latencia, total_posts=total_posts)
+    medir_descarga(servidor, "Sin caché", consultas_sin_cache, consultas, url, consultas)
+    medir_descarga(servidor, "ClienteCache, revalidación (304)", consultas_con_cache, consultas, url, consultas)
+    servidor.shutdown()
+
+    servidor, url = iniciar_servidor(latencia=latencia, total_posts=total_posts, max_age=60)
+    medir_descarga(servidor, "ClienteCache, max-age=60", consultas_con_cache, consultas, url, consultas)
+    servidor.shutdown()
+
+    # Cada ejecución del script empieza con la memoria vacía; el nivel SQLite evita descargar todo otra vez
+    servidor, url = iniciar_servidor(latencia=latencia, total_posts=total_posts)
+    ejecuciones = max(consultas // 10, 2)
+    with tempfile.TemporaryDirectory() as directorio:
+        medir_descarga(servidor, "Ejecuciones sin caché", consultas_sin_cache, ejecuciones, url, ejecuciones)
+        medir_descarga(servidor, "Ejecuciones con nivel SQLite", ejecuciones_con_sqlite, ejecuciones, url, ejecuciones,
+                       os.path.join(directorio, "cache.sqlite"))
+    servidor.shutdown()
+
+
+def verificar_cliente(flujos=100, latencia=0.01, max_en_vuelo=8):
+    """Comprueba contra servidor_local.py los reintentos ante 503 y el límite de peticiones en vuelo"""
+    operaciones = flujos * 4
+
+    servidor, url = iniciar_servidor(latencia=latencia)
+    exitosas, fallidas, _ = flujos_concurrentes(url, flujos, max_en_vuelo)
+    servidor.shutdown()
+    assert (exitosas, fallidas) == (operaciones, 0), (exitosas, fallidas)
+    assert 1 < servidor.max_en_curso <= max_en_vuelo, servidor.max_en_curso
+    print(f"Sin fallos: {exitosas} exitosas, máximo en curso en el servidor {servidor.max_en_curso}/{max_en_vuelo}")
+
+    # Con 30 % de 503 y 10 reintentos, una operación agota sus intentos con probabilidad 0.3**11 (~2e-6)
+    servidor, url = iniciar_servidor(latencia=latencia, fraccion_fallos=0.3)
+    exitosas, fallidas, reintentos = flujos_concurrentes(url, flujos, max_en_vuelo, reintentos=10, backoff=0.005,
+                                                         backoff_maximo=0.05, reintentar_post=True)
+    servidor.shutdown()
+    assert (exitosas, fallidas) == (operaciones, 0), (exitosas, fallidas)
+    assert reintentos > 0 and servidor.peticiones == operaciones + reintentos, (reintentos, servidor.peticiones)
+    assert servidor.max_en_curso <= max_en_vuelo, servidor.max_en_curso
+    print(f"30 % de 503: {exitosas} exitosas con {reintentos} reintentos, "
+          f"máximo en curso en el servidor {servidor.max_en_curso}/{max_en_vuelo}")
+
+    # La Práctica #6 usa una copia de los módulos; deben seguir siendo iguales a los de esta práctica
+    for modulo in ("cliente_rest.py", "cache_http.py"):
+        copia = os.path.join(DIRECTORIO_PRACTICA_6, modulo)
+        assert filecmp.cmp(os.path.join(DIRECTORIO, modulo), copia, shallow=False), f"{copia} difiere de {modulo}"
+    print("Las copias de cliente_rest.py y cache_http.py en la Práctica #6 son idénticas")
+
+
+if __name__ == "__main__":
+    if "--verificar" in sys.argv:
+        verificar_cliente()
+        sys.exit()
+
+    if "--cache" in sys.argv:
+        sys.argv.remove("--cache")
+        benchmark_cache(int(sys.argv[1]) if len(sys.argv) > 1 else 200,
+                        float(sys.argv[2]) if len(sys.argv) > 2 else 0.01,
+                        int(sys.argv[3]) if len(sys.argv) > 3 else 1000)
+        sys.exit()
+
+    flujos = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    latencia = float(sys.argv[2]) if len(sys.argv) > 2 else 0.01
+    max_en_vuelo = int(sys.argv[3]) if len(sys.argv) > 3 else 32
+    operaciones = flujos * 4
+
+    servidor, url = iniciar_servidor(latencia=latencia)
+    print(f"{flujos} flujos CRUD contra {url} con {latencia * 1000:.0f} ms de latencia simulada\n")
+    medir("Como los scripts (sin sesión)", flujos_como_scripts, operaciones, url, flujos)
+    medir("ClienteREST secuencial", flujos_secuenciales, operaciones, url, flujos)
+    servidor.peticiones = 0
+    exitosas, fallidas, _ = medir(f"ClienteREST concurrente ({max_en_vuelo})", flujos_concurrentes, operaciones,
+                                  url, flujos, max_en_vuelo)
+    print(f"  exitosas: {exitosas}, fallidas: {fallidas}, peticiones recibidas por el servidor: {servidor.peticiones}")
+    servidor.shutdown()
+
+    # Con 20 % de respuestas 503, los reintentos con jitter deben recuperar casi todas las operaciones
+    servidor, url = iniciar_servidor(latencia=latencia, fraccion_fallos=0.2)
+    print()
+    exitosas, fallidas, reintentos = medir("Concurrente con 20 % de fallos", flujos_concurrentes, operaciones,
+                                           url, flujos, max_en_vuelo, reintentos=4, backoff=0.02,
+                                           reintentar_post=True)
+    print(f"  exitosas: {exitosas}, fallidas: {fallidas}, reintentos: {reintentos}")
+    servidor.shutdown()
@@ -0,0 +1,250 @@
+"""
+Caché HTTP para los GET de los scripts que consumen jsonplaceholder.
+
+ClienteCache guarda cada respuesta con su ETag, Last-Modified y vencimiento
+(Cache-Control: max-age) junto con el objeto ya convertido de JSON:
+
+- Mientras la respuesta está vigente, se regresa el objeto sin ir a la red.
+- Al vencer, se revalida con If-None-Match / If-Modified-Since; un 304
+  reutiliza el objeto guardado sin descargar ni convertir el cuerpo otra vez.
+- POST, PUT y DELETE pasan directo al servidor e invalidan el elemento y la
+  colección afectados.
+
+El almacén principal es un LRU en memoria. Con `ruta_sqlite` (o la variable de
+entorno CACHE_HTTP_SQLITE) se agrega un segundo nivel en disco que sobrevive
+entre ejecuciones del script: al arrancar, la primera consulta se revalida
+contra lo guardado en lugar de descargar todo. Sin ella solo se usa memoria.
+
+Los objetos regresados se comparten entre llamadas; no deben modificarse.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from cliente_rest import ClienteREST
+
+RUTA_SQLITE = os.environ.get("CACHE_HTTP_SQLITE")  # None: solo caché en memoria
+
+
+class EntradaCache:
+    """Respuesta guardada: validadores, vencimiento, cuerpo original y objeto convertido"""
+
+    __slots__ = ("etag", "ultima_modificacion", "expira", "cuerpo", "objeto")
+
+    def __init__(self, etag, ultima_modificacion, expira, cuerpo, objeto=None):
+        self.etag = etag
+        self.ultima_modificacion = ultima_modificacion
+        self.expira = expira
+        self.cuerpo = cuerpo
+        self.objeto = objeto
+
+
+class AlmacenLRU:
+    """Almacén en memoria que descarta la entrada usada hace más tiempo al llenarse"""
+
+    def __init__(self, capacidad=128):
+        self.capacidad = capacidad
+        self.entradas = OrderedDict()
+
+    def obtener(self, url):
+        entrada = self.entradas.get(url)
+        if entrada is not None:
+            self.entradas.move_to_end(url)
+        return entrada
+
+    def guardar(self, url, entrada):
+        self.entradas[url] = entrada
+        self.entradas.move_to_end(url)
+        while len(self.entradas) > self.capacidad:
+            self.entradas.popitem(last=False)
+
+    def eliminar(self, url):
+        self.entradas.pop(url, None)
+
+
+class AlmacenSQLite:
+    """Almacén en disco; guarda el cuerpo original y lo convierte de nuevo al leerlo"""
+
+    def __init__(self, ruta):
+        self.conexion = sqlite3.connect(ruta, check_same_thread=False)
+        self.conexion.execute("""
+            CREATE TABLE IF NOT EXISTS respuestas (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                ultima_modificacion TEXT,
+                expira REAL NOT NULL,
+                cuerpo BLOB NOT NULL
+            )
+        """)
+        self.conexion.commit()
+
+    def obtener(self, url):
+        fila = self.conexion.execute(
+            "SELECT etag, ultima_modificacion, expira, cuerpo FROM respuestas WHERE url = ?", (url,)
+        ).fetchone()
+        return EntradaCache(*fila) if fila else None
+
+    def guardar(self, url, entrada):
+        self.conexion.execute(
+            "INSERT OR REPLACE INTO respuestas (url, etag, ultima_modificacion, expira, cuerpo) VALUES (?, ?, ?, ?, ?)",
+            (url, entrada.etag, entrada.ultima_modificacion, entrada.expira, entrada.cuerpo)
+        )
+        self.conexion.commit()
+
+    def actualizar_vencimiento(self, url, expira):
+        self.conexion.execute("UPDATE respuestas SET expira = ? WHERE url = ?", (expira, url))
+        self.conexion.commit()
+
+    def eliminar(self, url):
+        self.conexion.execute("DELETE FROM respuestas WHERE url = ?", (url,))
+        self.conexion.commit()
+
+    def cerrar(self):
+        self.conexion.close()
+
+
+def leer_cache_control(valor):
+    """Regresa (guardable, segundos de vigencia) según el encabezado Cache-Control"""
+    directivas = {}
+    for parte in (valor or "").lower().split(","):
+        nombre, _, argumento = parte.strip().partition("=")
+        directivas[nombre] = argumento
+    if "no-store" in directivas:
+        return False, 0
+    if "no-cache" in directivas:
+        return True, 0
+    try:
+        return True, max(int(directivas.get("max-age", "0").strip('"')), 0)
+    except ValueError:
+        return True, 0
+
+
+class ClienteCache:
+    """Cliente REST que cachea los GET con validación condicional y reutiliza los objetos convertidos"""
+
+    def __init__(self, cliente=None, capacidad=128, ruta_sqlite=RUTA_SQLITE):
+        """
+        Args:
+            cliente (ClienteREST): Cliente a usar; por defecto uno nuevo con la URL de API_URL
+            capacidad (int): Respuestas que se guardan en memoria
+            ruta_sqlite (str): Archivo SQLite para el nivel en disco; None para usar solo memoria
+        """
+        self.cliente = cliente or ClienteREST()
+        self.memoria = AlmacenLRU(capacidad)
+        self.disco = AlmacenSQLite(ruta_sqlite) if ruta_sqlite else None
+        self.bloqueo = threading.Lock()
+        self.aciertos = 0  # Respondidas sin ir a la red
+        self.revalidaciones = 0  # 304: se reutilizó el objeto guardado
+        self.fallos = 0  # Respuesta completa descargada y convertida
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+
+    def cerrar(self):
+        if self.disco is not None:
+            self.disco.cerrar()
+        self.cliente.cerrar()
+
+    def buscar(self, url):
+        """Busca en memoria y luego en disco; lo encontrado en disco se convierte y sube a memoria"""
+        entrada = self.memoria.obtener(url)
+        if entrada is None and self.disco is not None:
+            entrada = self.disco.obtener(url)
+            if entrada is not None:
+                entrada.objeto = json.loads(entrada.cuerpo)
+                self.memoria.guardar(url, entrada)
+        return entrada
+
+    def obtener_json(self, ruta=""):
+        """
+        GET con caché del recurso o de un elemento.
+
+        Returns:
+            El JSON de la respuesta ya convertido (compartido: no modificarlo)
+
+        Raises:
+            requests.HTTPError: Si el servidor responde un error
+        """
+        url = self.cliente.url(ruta)
+        with self.bloqueo:
+            entrada = self.buscar(url)
+            if entrada is not None and entrada.expira > time.time():
+                self.aciertos += 1
+                return entrada.objeto
+
+        encabezados = {}
+        if entrada is not None:
+            if entrada.etag:
+                encabezados["If-None-Match"] = entrada.etag
+            if entrada.ultima_modificacion:
+                encabezados["If-Modified-Since"] = entrada.ultima_modificacion
+        respuesta = self.cliente.solicitar("GET", ruta, headers=encabezados)
+        guardable, vigencia = leer_cache_control(respuesta.headers.get("Cache-Control"))
+
+        if respuesta.status_code == 304 and entrada is not None:
+            with self.bloqueo:
+                self.revalidaciones += 1
+                entrada.expira = time.time() + vigencia
+                if self.disco is not None:
+                    self.disco.actualizar_vencimiento(url, entrada.expira)
+            return entrada.objeto
+
+        respuesta.raise_for_status()
+        objeto = respuesta.json()  # Fuera del bloqueo: la conversión es lo más costoso
+        etag = respuesta.headers.get("ETag")
+        ultima_modificacion = respuesta.headers.get("Last-Modified")
+        with self.bloqueo:
+            self.fallos += 1
+            if guardable and (etag or ultima_modificacion or vigencia):
+                nueva = EntradaCache(etag, ultima_modificacion, time.time() + vigencia, respuesta.content, objeto)
+                self.memoria.guardar(url, nueva)
+                if self.disco is not None:
+                    self.disco.guardar(url, nueva)
+            elif entrada is not None:
+                # La versión nueva no se puede guardar: la anterior ya no es válida
+                self.memoria.eliminar(url)
+                if self.disco is not None:
+                    self.disco.eliminar(url)
+            return objeto
+
+    def invalidar(self, *rutas):
+        """Elimina de ambos almacenes las respuestas guardadas de las rutas"""
+        with self.bloqueo:
+            for ruta in rutas:
+                url = self.cliente.url(ruta)
+                self.memoria.eliminar(url)
+                if self.disco is not None:
+                    self.disco.eliminar(url)
+
+    # Las escrituras no se cachean; invalidan el elemento y la colección
+    def crear(self, datos):
+        respuesta = self.cliente.crear(datos)
+        self.invalidar("")
+        return respuesta
+
+    def actualizar(self, id_recurso, datos):
+        respuesta = self.cliente.actualizar(id_recurso, datos)
+        self.invalidar("", id_recurso)
+        return respuesta
+
+    def eliminar(self, id_recurso):
+        respuesta = self.cliente.eliminar(id_recurso)
+        self.invalidar("", id_recurso)
+        return respuesta
+
+    def estadisticas(self):
+        """Contadores de aciertos, revalidaciones (304) y fallos"""
+        total = self.aciertos + self.revalidaciones + self.fallos
+        return {
+            "aciertos": self.aciertos,
+            "revalidaciones": self.revalidaciones,
+            "fallos": self.fallos,
+            "tasa_aciertos": (self.aciertos + self.revalidaciones) / total if total else 0.0,
+            "en_memoria": len(self.memoria.entradas),
+        }
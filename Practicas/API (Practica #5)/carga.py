@@ -0,0 +1,253 @@
+"""
+Generador de carga basado en el flujo CRUD de main.py (GET, POST, PUT, DELETE).
+
+Envía operaciones a una tasa objetivo (peticiones por segundo) durante un tiempo
+dado, eligiéndolas al azar según sus pesos, con un número fijo de trabajadores.
+La tasa no depende de las respuestas: si el servidor se atrasa, las peticiones
+se acumulan y la latencia se mide desde el momento en que debía salir cada una,
+así que la espera en cola también cuenta.
+
+El reporte JSON incluye por operación la cantidad, la tasa de error, los
+percentiles p50/p95/p99 y un histograma de latencia, además de las peticiones y
+errores de cada segundo. Sin --url se levanta servidor_local.py para correr sin
+conexión.
+
+Uso: python carga.py --rps 200 --duracion 30 --pesos GET=6,POST=2,PUT=1,DELETE=1 --trabajadores 32
+"""
+import argparse
+import json
+import queue
+import random
+import threading
+import time
+
+import requests
+
+from cliente_rest import ClienteREST
+from servidor_local import iniciar_servidor
+
+PESOS_PREDETERMINADOS = {"GET": 4, "POST": 2, "PUT": 2, "DELETE": 1}
+BUCKETS_LATENCIA_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+NUEVA_RESENA = {"title": "McDonalds", "body": "Excelentes nuggets", "userId": 1}
+MOD_RESENA = {"title": "KFC", "body": "Excelentes presas", "userId": 1}
+
+
+def leer_pesos(texto):
+    """Convierte 'GET=6,POST=2' en {'GET': 6.0, 'POST': 2.0}"""
+    pesos = {}
+    for parte in texto.split(","):
+        metodo, separador, peso = parte.partition("=")
+        metodo = metodo.strip().upper()
+        if metodo not in PESOS_PREDETERMINADOS:
+            raise ValueError(f"Operación desconocida '{metodo}'. Use {', '.join(PESOS_PREDETERMINADOS)}")
+        if not separador or not peso.strip():
+            raise ValueError(f"Falta el peso de {metodo}; use {metodo}=peso, por ejemplo {metodo}=2")
+        try:
+            pesos[metodo] = float(peso)
+        except ValueError:
+            raise ValueError(f"El peso de {metodo} debe ser numérico, no '{peso.strip()}'")
+        if not 0 <= pesos[metodo] < float("inf"):
+            raise ValueError(f"El peso de {metodo} debe ser un número mayor o igual a 0, no {peso}")
+    if not any(pesos.values()):
+        raise ValueError("Al menos una operación debe tener peso mayor a 0")
+    return pesos
+
+
+def percentil(ordenados, p):
+    """Percentil por rango más cercano de una lista ya ordenada"""
+    if not ordenados:
+        return None
+    return ordenados[min(len(ordenados) - 1, max(0, int(round(p / 100 * len(ordenados))) - 1))]
+
+
+def histograma(latencias_ms):
+    """Cuenta latencias por bucket (el límite superior es inclusivo; el último bucket es +Inf)"""
+    conteos = dict.fromkeys([f"<={limite}" for limite in BUCKETS_LATENCIA_MS] + ["+Inf"], 0)
+    for latencia in latencias_ms:
+        for limite in BUCKETS_LATENCIA_MS:
+            if latencia <= limite:
+                conteos[f"<={limite}"] += 1
+                break
+        else:
+            conteos["+Inf"] += 1
+    return conteos
+
+
+class GeneradorCarga:
+    """Genera tráfico CRUD a una tasa fija y acumula latencias, errores y rendimiento por segundo"""
+
+    def __init__(self, url, rps, duracion, pesos=None, trabajadores=16, timeout=10.0, semilla=None):
+        self.url = url
+        self.rps = rps
+        self.duracion = duracion
+        self.pesos = pesos or PESOS_PREDETERMINADOS
+        self.trabajadores = trabajadores
+        self.timeout = timeout
+        self.azar = random.Random(semilla)
+        self.bloqueo = threading.Lock()
+        self.latencias = {metodo: [] for metodo in self.pesos}  # ms desde la salida programada
+        self.errores = {metodo: {} for metodo in self.pesos}  # tipo de error -> cantidad
+        self.por_segundo = []  # Peticiones terminadas y errores por segundo desde el inicio
+        self.atraso_maximo = 0.0  # Cuánto llegó a atrasarse la salida de una petición respecto a lo programado
+
+    def ejecutar_operacion(self, cliente, metodo, id_post):
+        """Ejecuta una operación del flujo CRUD; regresa None si salió bien o el tipo de error"""
+        try:
+            if metodo == "GET":
+                respuesta = cliente.obtener()
+            elif metodo == "POST":
+                respuesta = cliente.crear(NUEVA_RESENA)
+            elif metodo == "PUT":
+                respuesta = cliente.actualizar(id_post, MOD_RESENA)
+            else:
+                respuesta = cliente.eliminar(id_post)
+            respuesta.content  # Se lee el cuerpo completo para medir la respuesta entera
+        except requests.RequestException as e:
+            return type(e).__name__
+        return None if respuesta.ok else f"HTTP {respuesta.status_code}"
+
+    def trabajador(self, cliente, cola, inicio):
+        while True:
+            tarea = cola.get()
+            if tarea is None:
+                return
+            programada, metodo, id_post = tarea
+            atraso = time.perf_counter() - programada
+            error = self.ejecutar_operacion(cliente, metodo, id_post)
+            fin = time.perf_counter()
+            segundo = int(fin - inicio)
+            with self.bloqueo:
+                # Si el servidor se atrasa, la prueba dura más que lo programado
+                while len(self.por_segundo) <= segundo:
+                    self.por_segundo.append({"peticiones": 0, "errores": 0})
+                self.atraso_maximo = max(self.atraso_maximo, atraso)
+                self.latencias[metodo].append((fin - programada) * 1000)
+                self.por_segundo[segundo]["peticiones"] += 1
+                if error:
+                    self.errores[metodo][error] = self.errores[metodo].get(error, 0) + 1
+                    self.por_segundo[segundo]["errores"] += 1
+
+    def ejecutar(self):
+        """Corre la prueba completa y regresa el reporte"""
+        metodos = list(self.pesos)
+        pesos = [self.pesos[metodo] for metodo in metodos]
+        total = int(self.rps * self.duracion)
+        cola = queue.Queue()
+
+        # Sin reintentos: la prueba debe ver los errores tal como ocurren
+        with ClienteREST(self.url, timeout=self.timeout, reintentos=0, max_en_vuelo=self.trabajadores) as cliente:
+            inicio = time.perf_counter()
+            hilos = [threading.Thread(target=self.trabajador, args=(cliente, cola, inicio), daemon=True)
+                     for _ in range(self.trabajadores)]
+            for hilo in hilos:
+                hilo.start()
+
+            for i in range(total):
+                programada = inicio + i / self.rps
+                espera = programada - time.perf_counter()
+                if espera > 0:
+                    time.sleep(espera)
+                # El azar se consume solo en este hilo para que la semilla repita la misma secuencia
+                cola.put((programada, self.azar.choices(metodos, pesos)[0], self.azar.randint(1, 100)))
+            for _ in hilos:
+                cola.put(None)
+            for hilo in hilos:
+                hilo.join()
+            segundos = time.perf_counter() - inicio
+
+        return self.reporte(segundos)
+
+    def reporte(self, segundos):
+        operaciones = {}
+        for metodo, latencias in self.latencias.items():
+            ordenadas = sorted(latencias)
+            errores = sum(self.errores[metodo].values())
+            operaciones[metodo] = {
+                "peticiones": len(ordenadas),
+                "errores": errores,
+                "tasa_error": errores / len(ordenadas) if ordenadas else 0.0,
+                "tipos_error": self.errores[metodo],
+                "latencia_ms": {
+                    "p50": percentil(ordenadas, 50),
+                    "p95": percentil(ordenadas, 95),
+                    "p99": percentil(ordenadas, 99),
+                    "maxima": ordenadas[-1] if ordenadas else None,
+                    "promedio": sum(ordenadas) / len(ordenadas) if ordenadas else None,
+                },
+                "histograma_ms": histograma(ordenadas),
+            }
+
+        todas = sorted(latencia for latencias in self.latencias.values() for latencia in latencias)
+        peticiones = len(todas)
+        errores = sum(operacion["errores"] for operacion in operaciones.values())
+        return {
+            "configuracion": {
+                "url": self.url, "rps_objetivo": self.rps, "duracion": self.duracion,
+                "pesos": self.pesos, "trabajadores": self.trabajadores, "timeout": self.timeout,
+            },
+            "resumen": {
+                "peticiones": peticiones,
+                "errores": errores,
+                "tasa_error": errores / peticiones if peticiones else 0.0,
+                "segundos": segundos,
+                "rps_logrado": peticiones / segundos if segundos else 0.0,
+                "atraso_maximo_ms": self.atraso_maximo * 1000,
+                "latencia_ms": {"p50": percentil(todas, 50), "p95": percentil(todas, 95), "p99": percentil(todas, 99)},
+            },
+            "operaciones": operaciones,
+            "por_segundo": [{"segundo": i, **conteos} for i, conteos in enumerate(self.por_segundo)],
+        }
+
+
+def imprimir_resumen(reporte):
+    resumen = reporte["resumen"]
+    print(f"{resumen['peticiones']} peticiones en {resumen['segundos']:.1f}s "
+          f"({resumen['rps_logrado']:.1f} pet/s, objetivo {reporte['configuracion']['rps_objetivo']}) | "
+          f"errores {resumen['tasa_error']:.2%} | atraso máximo {resumen['atraso_maximo_ms']:.1f} ms")
+    print(f"{'Operación':<8} | {'Peticiones':>10} | {'Errores':>8} | {'p50 ms':>8} | {'p95 ms':>8} | {'p99 ms':>8}")
+    for metodo, operacion in reporte["operaciones"].items():
+        latencia = operacion["latencia_ms"]
+        if not operacion["peticiones"]:
+            continue
+        print(f"{metodo:<8} | {operacion['peticiones']:>10} | {operacion['tasa_error']:>8.2%} | "
+              f"{latencia['p50']:>8.2f} | {latencia['p95']:>8.2f} | {latencia['p99']:>8.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generador de carga con el flujo CRUD de jsonplaceholder")
+    parser.add_argument("--url", help="URL del recurso /posts; sin ella se usa el servidor local")
+    parser.add_argument("--rps", type=float, default=100, help="Peticiones por segundo objetivo")
+    parser.add_argument("--duracion", type=float, default=10, help="Segundos de prueba")
+    parser.add_argument("--pesos", help="Peso de cada operación, por ejemplo GET=6,POST=2,PUT=1,DELETE=1")
+    parser.add_argument("--trabajadores", type=int, default=16, help="Hilos que envían peticiones")
+    parser.add_argument("--timeout", type=float, default=10.0, help="Timeout de cada petición en segundos")
+    parser.add_argument("--semilla", type=int, help="Semilla para repetir la misma secuencia de operaciones")
+    parser.add_argument("--reporte", default="reporte_carga.json", help="Archivo del reporte JSON")
+    parser.add_argument("--latencia-servidor", type=float, default=0.005,
+                        help="Latencia simulada del servidor local en segundos")
+    parser.add_argument("--fallos-servidor", type=float, default=0.0,
+                        help="Fracción de respuestas 503 del servidor local")
+    argumentos = parser.parse_args()
+    try:
+        # Fuera de argparse, que con type= ocultaría el mensaje del ValueError
+        pesos = leer_pesos(argumentos.pesos) if argumentos.pesos else PESOS_PREDETERMINADOS
+    except ValueError as e:
+        parser.error(str(e))
+
+    servidor = None
+    url = argumentos.url
+    if url is None:
+        servidor, url = iniciar_servidor(latencia=argumentos.latencia_servidor,
+                                         fraccion_fallos=argumentos.fallos_servidor)
+        print(f"Usando el servidor local {url}")
+
+    generador = GeneradorCarga(url, argumentos.rps, argumentos.duracion, pesos,
+                               argumentos.trabajadores, argumentos.timeout, argumentos.semilla)
+    reporte = generador.ejecutar()
+    if servidor is not None:
+        servidor.shutdown()
+
+    with open(argumentos.reporte, "w", encoding="utf-8") as archivo:
+        json.dump(reporte, archivo, ensure_ascii=False, indent=2)
+    imprimir_resumen(reporte)
+    print(f"Reporte guardado en {argumentos.reporte}")
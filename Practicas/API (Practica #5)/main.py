@@ -1,12 +1,17 @@
-import requests
+from cache_http import ClienteCache
+from cliente_rest import ClienteREST
 
-API_URL = "https://jsonplaceholder.typicode.com/posts"
+# Una sola sesión con keep-alive, timeouts y reintentos (API_URL se puede cambiar por variable de entorno)
+cliente = ClienteREST()
+# Los GET se guardan con su ETag en memoria; con CACHE_HTTP_SQLITE=archivo también en disco,
+# y la siguiente ejecución solo revalida
+cache = ClienteCache(cliente)
 
 print("\nGET:")
-res = requests.get(API_URL)
-tit = res.json()[0]['title']
+posts = cache.obtener_json()
+tit = posts[0]['title']
 print(f"Primer título: {tit}")
-print(res.json()[0])
+print(posts[0])
 print("\nPOST")
 
 nueva_resena = {
@@ -16,7 +21,7 @@ nueva_resena = {
     
 }
 
-res = requests.post(API_URL, json=nueva_resena)
+res = cliente.crear(nueva_resena)
 print(res.json())
 
 print("\nPUT")
@@ -25,9 +30,12 @@ mod_resena = {
     "body" : "Excelentes presas",
     "userid" : 1
 }
-res = requests.put(f"{API_URL}/1", json=mod_resena)
+res = cliente.actualizar(1, mod_resena)
 print(res.json())
 
 print("\nDELETE")
-res = requests.delete(f"{API_URL}/1")
+res = cliente.eliminar(1)
 print("Codigo de estado:" , res.status_code)
+# jsonplaceholder no guarda los cambios, así que las escrituras no invalidan la caché
+print("Caché:", cache.estadisticas())
+cache.cerrar()
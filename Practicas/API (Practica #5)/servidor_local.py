@@ -0,0 +1,223 @@
+"""
+Servidor local que imita el recurso /posts de jsonplaceholder.
+
+Permite correr los scripts y benchmarks sin conexión a internet. Soporta
+GET /posts, GET /posts/{id}, POST /posts, PUT /posts/{id} y DELETE /posts/{id}
+con keep-alive (HTTP/1.1). Con `latencia` simula el tiempo de red de cada
+respuesta y con `fraccion_fallos` responde 503 a una fracción de las peticiones
+para probar los reintentos. `max_en_curso` guarda el máximo de peticiones
+atendidas a la vez, para revisar el límite de peticiones en vuelo del cliente.
+
+Los GET incluyen ETag, Last-Modified y Cache-Control (max-age configurable) y
+responden 304 a If-None-Match / If-Modified-Since, como jsonplaceholder.
+
+Uso: python servidor_local.py --puerto 3000 --latencia 0.02
+"""
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from contextlib import contextmanager
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+TOTAL_POSTS = 100
+
+
+def crear_posts(total=TOTAL_POSTS):
+    """Genera posts con la misma forma que los de jsonplaceholder"""
+    return [
+        {"userId": (i - 1) // 10 + 1, "id": i, "title": f"titulo del post {i}", "body": f"contenido del post {i}"}
+        for i in range(1, total + 1)
+    ]
+
+
+class ManejadorPosts(BaseHTTPRequestHandler):
+    """Atiende el recurso /posts; la configuración vive en el servidor"""
+
+    protocol_version = "HTTP/1.1"  # Mantiene la conexión abierta entre peticiones
+    disable_nagle_algorithm = True  # Sin esto, keep-alive espera el ACK retrasado (~40 ms) en cada respuesta
+
+    def log_message(self, formato, *args):
+        pass  # Sin registro por petición: ensuciaría la salida de los benchmarks
+
+    def responder(self, estado, contenido):
+        cuerpo = json.dumps(contenido).encode("utf-8")
+        self.send_response(estado)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+        with self.server.bloqueo:
+            self.server.bytes_enviados += len(cuerpo)
+
+    def responder_cacheable(self, contenido):
+        """Responde un GET con validadores de caché, o 304 si el cliente ya tiene esta versión"""
+        cuerpo = json.dumps(contenido).encode("utf-8")
+        etag = f'"{hashlib.sha1(cuerpo).hexdigest()[:20]}"'
+        modificado = self.server.modificado
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match is not None:
+            # Las comparaciones de If-None-Match son débiles: W/"x" equivale a "x"
+            vigente = etag in [valor.strip().replace("W/", "", 1) for valor in if_none_match.split(",")]
+        else:
+            vigente = self.no_modificado_desde(modificado)
+        self.send_response(304 if vigente else 200)
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", formatdate(modificado, usegmt=True))
+        max_age = self.server.max_age
+        self.send_header("Cache-Control", f"max-age={max_age}" if max_age else "no-cache")
+        if vigente:
+            self.end_headers()
+            return
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+        with self.server.bloqueo:
+            self.server.bytes_enviados += len(cuerpo)
+
+    def no_modificado_desde(self, modificado):
+        fecha = self.headers.get("If-Modified-Since")
+        try:
+            return fecha is not None and int(modificado) <= parsedate_to_datetime(fecha).timestamp()
+        except (TypeError, ValueError):
+            return False
+
+    def leer_cuerpo(self):
+        longitud = int(self.headers.get("Content-Length") or 0)
+        if not longitud:
+            return {}
+        try:
+            return json.loads(self.rfile.read(longitud))
+        except ValueError:
+            return None
+
+    def id_post(self):
+        """Regresa el id de /posts/{id}, None para /posts o False si la ruta no existe"""
+        partes = self.path.split("?")[0].strip("/").split("/")
+        if partes[0] != "posts" or len(partes) > 2:
+            return False
+        if len(partes) == 1:
+            return None
+        return int(partes[1]) if partes[1].isdigit() else False
+
+    @contextmanager
+    def en_curso(self):
+        """Cuenta la petición como en curso desde que llega hasta que se termina de responder"""
+        servidor = self.server
+        with servidor.bloqueo:
+            servidor.en_curso += 1
+            servidor.max_en_curso = max(servidor.max_en_curso, servidor.en_curso)
+        try:
+            yield
+        finally:
+            with servidor.bloqueo:
+                servidor.en_curso -= 1
+
+    def preparar(self):
+        """Aplica la latencia y los fallos simulados; regresa False si ya respondió con error"""
+        servidor = self.server
+        if servidor.latencia:
+            time.sleep(servidor.latencia)
+        with servidor.bloqueo:
+            servidor.peticiones += 1
+        if servidor.fraccion_fallos and random.random() < servidor.fraccion_fallos:
+            self.leer_cuerpo()
+            self.responder(503, {"error": "Servicio no disponible"})
+            return False
+        return True
+
+    def do_GET(self):
+        with self.en_curso():
+            if not self.preparar():
+                return
+            id_post = self.id_post()
+            posts = self.server.posts
+            if id_post is None:
+                self.responder_cacheable(posts)
+            elif id_post and id_post <= len(posts):
+                self.responder_cacheable(posts[id_post - 1])
+            else:
+                self.responder(404, {})
+
+    def do_POST(self):
+        with self.en_curso():
+            if not self.preparar():
+                return
+            datos = self.leer_cuerpo()
+            if self.id_post() is not None:
+                self.responder(404, {})
+            elif datos is None:
+                self.responder(400, {"error": "JSON inválido"})
+            else:
+                # Igual que jsonplaceholder: responde el recurso creado sin guardarlo
+                self.responder(201, {**datos, "id": len(self.server.posts) + 1})
+
+    def do_PUT(self):
+        with self.en_curso():
+            if not self.preparar():
+                return
+            datos = self.leer_cuerpo()
+            id_post = self.id_post()
+            if not id_post:
+                self.responder(404, {})
+            elif datos is None:
+                self.responder(400, {"error": "JSON inválido"})
+            else:
+                self.responder(200, {**datos, "id": id_post})
+
+    def do_DELETE(self):
+        with self.en_curso():
+            if not self.preparar():
+                return
+            self.responder(200 if self.id_post() else 404, {})
+
+
+def iniciar_servidor(puerto=0, latencia=0.0, fraccion_fallos=0.0, max_age=0, total_posts=TOTAL_POSTS,
+                     host="127.0.0.1"):
+    """
+    Inicia el servidor en un hilo en segundo plano.
+
+    Args:
+        puerto (int): Puerto a usar; 0 elige uno libre
+        latencia (float): Segundos de espera antes de cada respuesta
+        fraccion_fallos (float): Fracción de peticiones que responden 503
+        max_age (int): Segundos de Cache-Control: max-age en los GET; 0 envía no-cache
+        total_posts (int): Cantidad de posts del recurso
+
+    Returns:
+        tuple: (servidor, url del recurso /posts). Detener con servidor.shutdown()
+    """
+    servidor = ThreadingHTTPServer((host, puerto), ManejadorPosts)
+    servidor.daemon_threads = True
+    servidor.posts = crear_posts(total_posts)
+    servidor.modificado = time.time()
+    servidor.max_age = max_age
+    servidor.latencia = latencia
+    servidor.fraccion_fallos = fraccion_fallos
+    servidor.peticiones = 0
+    servidor.bytes_enviados = 0  # Solo cuerpos, para comparar cuánto se descarga con y sin caché
+    servidor.en_curso = 0
+    servidor.max_en_curso = 0
+    servidor.bloqueo = threading.Lock()
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor, f"http://{host}:{servidor.server_address[1]}/posts"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor local que imita /posts de jsonplaceholder")
+    parser.add_argument("--puerto", type=int, default=3000)
+    parser.add_argument("--latencia", type=float, default=0.0, help="Segundos de espera por respuesta")
+    parser.add_argument("--fallos", type=float, default=0.0, help="Fracción de respuestas 503")
+    parser.add_argument("--max-age", type=int, default=0, help="Segundos de max-age en Cache-Control")
+    argumentos = parser.parse_args()
+
+    servidor, url = iniciar_servidor(argumentos.puerto, argumentos.latencia, argumentos.fallos, argumentos.max_age)
+    print(f"Sirviendo {url} (Ctrl+C para detener)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        servidor.shutdown()
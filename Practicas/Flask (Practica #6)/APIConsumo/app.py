@@ -1,11 +1,13 @@
-import requests
+from cache_http import ClienteCache
+from cliente_rest import ClienteREST
 
-API_URL = "https://jsonplaceholder.typicode.com/posts"
+cliente = ClienteREST()
+cache = ClienteCache(cliente)  # Con CACHE_HTTP_SQLITE=archivo también guarda en disco
 
 print("\nGET:")
-res = requests.get(API_URL)
-titulo = res.json()[0]['title']
-print(res.json()[0])
+posts = cache.obtener_json()
+titulo = posts[0]['title']
+print(posts[0])
 print("Titulo: " + titulo)
 
 print("\nPOST:")
@@ -14,7 +16,7 @@ nueva_resena = {
     "body": "Excelentes nuggets",
     "userId": 1
 }
-res = requests.post(API_URL, json=nueva_resena)
+res = cliente.crear(nueva_resena)
 print(res.json())
 
 print("\nPUT:")
@@ -23,9 +25,11 @@ mod_resena = {
     "body": "Excelentes presas",
     "userId": 1
 }
-res = requests.put(f"{API_URL}/1", json=mod_resena)
+res = cliente.actualizar(1, mod_resena)
 print(res.json())
 
 print("\nDELETE:")
-res = requests.delete(f"{API_URL}/1")
-print("Codigo de estado:", res.status_code)
\ No newline at end of file
+res = cliente.eliminar(1)
+print("Codigo de estado:", res.status_code)
+print("Caché:", cache.estadisticas())
+cache.cerrar()
\ No newline at end of file
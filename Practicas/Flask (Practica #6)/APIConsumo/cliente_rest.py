@@ -0,0 +1,164 @@
+"""
+Cliente REST reutilizable para los scripts que consumen jsonplaceholder.
+
+- Una sola requests.Session con pool de conexiones keep-alive: las peticiones
+  reutilizan la conexión en lugar de abrir una nueva cada vez.
+- Timeouts de conexión y de lectura en todas las peticiones.
+- Reintentos con backoff exponencial y jitter ante errores de red y estados
+  429/5xx. POST no es idempotente, así que solo se reintenta si se pide.
+- Modo concurrente: ejecutar_concurrente() corre muchas operaciones en un
+  ThreadPoolExecutor con un máximo de peticiones en vuelo.
+
+La URL se puede cambiar con la variable de entorno API_URL, por ejemplo para
+correr sin conexión contra servidor_local.py de la Práctica #5
+(API_URL=http://127.0.0.1:3000/posts). La Práctica #6 usa una copia idéntica
+de este módulo y de cache_http.py; benchmark.py --verificar revisa que no difieran.
+"""
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+API_URL = os.environ.get("API_URL", "https://jsonplaceholder.typicode.com/posts")
+TIMEOUT = (3.05, 10.0)  # Segundos (conexión, lectura)
+ESTADOS_REINTENTABLES = {429, 500, 502, 503, 504}
+METODOS_IDEMPOTENTES = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+
+class ClienteREST:
+    """Cliente con pool de conexiones, timeouts y reintentos para un recurso REST"""
+
+    def __init__(self, url_base=API_URL, timeout=TIMEOUT, reintentos=3, backoff=0.1, backoff_maximo=5.0,
+                 max_en_vuelo=32, reintentar_post=False):
+        """
+        Args:
+            url_base (str): URL del recurso, por ejemplo .../posts
+            timeout (float | tuple): Timeout de cada petición, o (conexión, lectura)
+            reintentos (int): Reintentos después del primer intento
+            backoff (float): Espera base; el intento n espera al azar entre 0 y backoff * 2**n
+            backoff_maximo (float): Tope de la espera entre intentos
+            max_en_vuelo (int): Peticiones simultáneas en el modo concurrente (y tamaño del pool)
+            reintentar_post (bool): Si también se reintentan las peticiones POST
+        """
+        self.url_base = url_base.rstrip("/")
+        self.timeout = timeout
+        self.reintentos = reintentos
+        self.backoff = backoff
+        self.backoff_maximo = backoff_maximo
+        self.max_en_vuelo = max_en_vuelo
+        self.reintentar_post = reintentar_post
+        self.reintentos_realizados = 0
+
+        self.sesion = requests.Session()
+        # pool_block evita abrir más conexiones que el pool si hay más hilos que conexiones
+        adaptador = HTTPAdapter(pool_connections=4, pool_maxsize=max_en_vuelo, pool_block=True)
+        self.sesion.mount("http://", adaptador)
+        self.sesion.mount("https://", adaptador)
+        self.ejecutor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+
+    def cerrar(self):
+        """Cierra el pool de hilos y las conexiones abiertas"""
+        if self.ejecutor is not None:
+            self.ejecutor.shutdown(wait=True)
+            self.ejecutor = None
+        self.sesion.close()
+
+    def url(self, ruta=""):
+        ruta = str(ruta)
+        return f"{self.url_base}/{ruta.lstrip('/')}" if ruta else self.url_base
+
+    def espera(self, intento, respuesta=None):
+        """Segundos antes del siguiente intento: Retry-After si el servidor lo indica, si no backoff con jitter"""
+        if respuesta is not None and respuesta.headers.get("Retry-After", "").isdigit():
+            return min(float(respuesta.headers["Retry-After"]), self.backoff_maximo)
+        return random.uniform(0, min(self.backoff_maximo, self.backoff * 2 ** intento))
+
+    def solicitar(self, metodo, ruta="", **kwargs):
+        """
+        Envía una petición con timeout y reintentos.
+
+        Returns:
+            requests.Response: La última respuesta, aunque sea un error reintentable agotado
+
+        Raises:
+            requests.RequestException: Si el error de red persiste después de los reintentos
+        """
+        metodo = metodo.upper()
+        kwargs.setdefault("timeout", self.timeout)
+        reintentable = metodo in METODOS_IDEMPOTENTES or self.reintentar_post
+        intentos = self.reintentos + 1 if reintentable else 1
+        url = self.url(ruta)
+
+        for intento in range(intentos):
+            try:
+                respuesta = self.sesion.request(metodo, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if intento == intentos - 1:
+                    raise
+                respuesta = None
+            else:
+                if respuesta.status_code not in ESTADOS_REINTENTABLES or intento == intentos - 1:
+                    return respuesta
+                respuesta.close()  # Devuelve la conexión al pool antes de esperar
+            self.reintentos_realizados += 1
+            time.sleep(self.espera(intento, respuesta))
+
+    # --------------------- OPERACIONES CRUD ---------------------
+    def obtener(self, id_recurso=""):
+        """GET del recurso completo o de un elemento"""
+        return self.solicitar("GET", id_recurso)
+
+    def crear(self, datos):
+        """POST de un elemento nuevo"""
+        return self.solicitar("POST", json=datos)
+
+    def actualizar(self, id_recurso, datos):
+        """PUT de un elemento existente"""
+        return self.solicitar("PUT", id_recurso, json=datos)
+
+    def eliminar(self, id_recurso):
+        """DELETE de un elemento"""
+        return self.solicitar("DELETE", id_recurso)
+
+    # --------------------- MODO CONCURRENTE ---------------------
+    def ejecutar_concurrente(self, operaciones):
+        """
+        Ejecuta operaciones en paralelo con a lo sumo max_en_vuelo peticiones simultáneas.
+
+        Args:
+            operaciones (iterable): Tuplas (método, ruta, kwargs); kwargs puede omitirse
+
+        Returns:
+            list: Por operación y en el mismo orden, la respuesta o la excepción que la hizo fallar
+        """
+        if self.ejecutor is None:
+            self.ejecutor = ThreadPoolExecutor(max_workers=self.max_en_vuelo, thread_name_prefix="cliente_rest")
+
+        def ejecutar(operacion):
+            metodo, ruta, *resto = operacion
+            try:
+                return self.solicitar(metodo, ruta, **(resto[0] if resto else {}))
+            except requests.RequestException as e:
+                return e
+
+        # map mantiene el orden; el tamaño del pool limita las peticiones en vuelo
+        return list(self.ejecutor.map(ejecutar, operaciones))
+
+
+def operaciones_crud(id_recurso, datos_nuevos, datos_modificados):
+    """Secuencia GET, POST, PUT y DELETE de los scripts, como operaciones para ejecutar_concurrente"""
+    return [
+        ("GET", ""),
+        ("POST", "", {"json": datos_nuevos}),
+        ("PUT", id_recurso, {"json": datos_modificados}),
+        ("DELETE", id_recurso),
+    ]